@@ -10,6 +10,8 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 
+from app.models.task import TaskPriority, TaskStatus
+
 # revision identifiers, used by Alembic.
 revision: str = '001'
 down_revision: Union[str, None] = None
@@ -31,15 +33,16 @@ def upgrade() -> None:
     )
     op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
     op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
-
+    
     # Create tasks table
     op.create_table(
         'tasks',
         sa.Column('id', sa.Integer(), nullable=False),
         sa.Column('title', sa.String(length=255), nullable=False),
         sa.Column('description', sa.Text(), nullable=True),
-        sa.Column('status', sa.Enum('todo', 'in_progress', 'done', name='taskstatus'), nullable=False),
-        sa.Column('priority', sa.Enum('low', 'medium', 'high', name='taskpriority'), nullable=False),
+        # Labels are the enum member names, which is what the ORM stores
+        sa.Column('status', sa.Enum(TaskStatus, name='taskstatus'), nullable=False),
+        sa.Column('priority', sa.Enum(TaskPriority, name='taskpriority'), nullable=False),
         sa.Column('due_date', sa.DateTime(), nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=False),
         sa.Column('updated_at', sa.DateTime(), nullable=False),
@@ -0,0 +1,54 @@
+"""Add composite task indexes matching list and analytics queries
+
+Revision ID: 002
+Revises: 001
+Create Date: 2024-02-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.task import Task, TaskStatus
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Task list: owner filter + created_at DESC, id DESC ordering / keyset seek
+    op.create_index(
+        'ix_tasks_owner_id_created_at',
+        'tasks',
+        ['owner_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+    # Status / priority filters and per-status analytics counts
+    op.create_index(
+        'ix_tasks_owner_id_status_priority',
+        'tasks',
+        ['owner_id', 'status', 'priority'],
+        unique=False
+    )
+    # Overdue analytics: only open tasks carry a meaningful due date
+    op.create_index(
+        'ix_tasks_owner_id_due_date_open',
+        'tasks',
+        ['owner_id', 'due_date'],
+        unique=False,
+        postgresql_where=Task.status != TaskStatus.DONE,
+        sqlite_where=Task.status != TaskStatus.DONE
+    )
+    # Superseded by the composite indexes above, which all lead with owner_id
+    op.drop_index(op.f('ix_tasks_owner_id'), table_name='tasks')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_tasks_owner_id'), 'tasks', ['owner_id'], unique=False)
+    op.drop_index('ix_tasks_owner_id_due_date_open', table_name='tasks')
+    op.drop_index('ix_tasks_owner_id_status_priority', table_name='tasks')
+    op.drop_index('ix_tasks_owner_id_created_at', table_name='tasks')
@@ -0,0 +1,41 @@
+"""Add indexed full-text search for tasks
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-02-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.ddl import search_ddl
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    # Postgres: weighted tsvector kept up to date by Postgres itself, plus
+    # trigram indexes; SQLite: FTS5 shadow table synchronised by triggers
+    for statement in search_ddl(dialect):
+        op.execute(statement)
+    if dialect != 'postgresql':
+        op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_tasks_description_trgm')
+        op.execute('DROP INDEX IF EXISTS ix_tasks_title_trgm')
+        op.execute('DROP INDEX IF EXISTS ix_tasks_search_vector')
+        op.execute('ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector')
+    else:
+        op.execute('DROP TRIGGER IF EXISTS tasks_fts_au')
+        op.execute('DROP TRIGGER IF EXISTS tasks_fts_ad')
+        op.execute('DROP TRIGGER IF EXISTS tasks_fts_ai')
+        op.execute('DROP TABLE IF EXISTS tasks_fts')
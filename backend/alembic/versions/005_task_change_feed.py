@@ -0,0 +1,64 @@
+"""Add task change sequence and tombstones for the change feed
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-03-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.ddl import tombstone_ddl
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'tasks',
+        sa.Column('change_seq', sa.Integer(), server_default='0', nullable=False)
+    )
+    op.create_index(
+        'ix_tasks_owner_id_change_seq',
+        'tasks',
+        ['owner_id', 'change_seq', 'id'],
+        unique=False
+    )
+    op.create_table(
+        'task_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('change_seq', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_task_tombstones_owner_id_change_seq',
+        'task_tombstones',
+        ['owner_id', 'change_seq', 'task_id'],
+        unique=False
+    )
+    
+    # Deletes record a tombstone stamped with the owner's (already bumped)
+    # task_version
+    for statement in tombstone_ddl(op.get_bind().dialect.name):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS tasks_tombstone ON tasks')
+        op.execute('DROP FUNCTION IF EXISTS record_task_tombstone()')
+    else:
+        op.execute('DROP TRIGGER IF EXISTS tasks_tombstone')
+    op.drop_index('ix_task_tombstones_owner_id_change_seq', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
+    op.drop_index('ix_tasks_owner_id_change_seq', table_name='tasks')
+    op.drop_column('tasks', 'change_seq')
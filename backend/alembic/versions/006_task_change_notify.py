@@ -0,0 +1,32 @@
+"""Notify stream relays of task version bumps
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-04-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.ddl import task_notify_ddl
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # LISTEN/NOTIFY only exists on Postgres; other databases run a single
+    # worker that publishes its own writes
+    for statement in task_notify_ddl(op.get_bind().dialect.name):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('DROP TRIGGER IF EXISTS users_task_change_notify ON users')
+    op.execute('DROP FUNCTION IF EXISTS notify_task_change()')
@@ -0,0 +1,28 @@
+"""Add per-task version for optimistic concurrency
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-04-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'tasks',
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'version')
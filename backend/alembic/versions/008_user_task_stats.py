@@ -0,0 +1,72 @@
+"""Add trigger-maintained per-user task counts for analytics
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-05-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.db.ddl import task_stats_ddl
+from app.models.task import Task, TaskPriority, TaskStatus
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_task_stats',
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column(
+            'status',
+            postgresql.ENUM(TaskStatus, name='taskstatus', create_type=False),
+            nullable=False
+        ),
+        sa.Column(
+            'priority',
+            postgresql.ENUM(TaskPriority, name='taskpriority', create_type=False),
+            nullable=False
+        ),
+        sa.Column('task_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('owner_id', 'status', 'priority')
+    )
+    # Completed this week: the one status-dependent range analytics still scans
+    op.create_index(
+        'ix_tasks_owner_id_updated_at_done',
+        'tasks',
+        ['owner_id', 'updated_at'],
+        unique=False,
+        postgresql_where=Task.status == TaskStatus.DONE,
+        sqlite_where=Task.status == TaskStatus.DONE
+    )
+    
+    # Writers keep the counts in step with tasks in their own transaction
+    for statement in task_stats_ddl(op.get_bind().dialect.name):
+        op.execute(statement)
+    
+    # Backfill existing tasks (the triggers only see later writes)
+    op.execute(
+        "INSERT INTO user_task_stats (owner_id, status, priority, task_count) "
+        "SELECT owner_id, status, priority, count(*) FROM tasks "
+        "GROUP BY owner_id, status, priority"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in ('tasks_stats_insert', 'tasks_stats_update', 'tasks_stats_delete'):
+            op.execute(f'DROP TRIGGER IF EXISTS {name} ON tasks')
+        op.execute('DROP FUNCTION IF EXISTS apply_task_stats()')
+    else:
+        for name in ('tasks_stats_insert', 'tasks_stats_update', 'tasks_stats_delete'):
+            op.execute(f'DROP TRIGGER IF EXISTS {name}')
+    op.drop_index('ix_tasks_owner_id_updated_at_done', table_name='tasks')
+    op.drop_table('user_task_stats')
@@ -0,0 +1,58 @@
+"""Add the trigger-maintained daily task rollup for analytics time series
+
+Revision ID: 009
+Revises: 008
+Create Date: 2024-05-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.ddl import (
+    ROLLUP_COUNTERS,
+    UPDATED_AT,
+    task_rollup_contributions,
+    task_rollup_ddl,
+    task_rollup_upsert,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGERS = ('tasks_rollup_insert', 'tasks_rollup_update', 'tasks_rollup_delete')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'task_daily_rollup',
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        *(sa.Column(counter, sa.Integer(), nullable=False) for counter in ROLLUP_COUNTERS),
+        sa.PrimaryKeyConstraint('owner_id', 'day')
+    )
+    
+    # Completions are counted on the updated_at day of done tasks until 010
+    dialect = op.get_bind().dialect.name
+    for statement in task_rollup_ddl(dialect, UPDATED_AT):
+        op.execute(statement)
+    
+    # Backfill history from the existing tasks
+    op.execute(task_rollup_upsert(
+        task_rollup_contributions(dialect, 'tasks', completion=UPDATED_AT)
+    ))
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in TRIGGERS:
+            op.execute(f'DROP TRIGGER IF EXISTS {name} ON tasks')
+        op.execute('DROP FUNCTION IF EXISTS apply_task_rollup()')
+    else:
+        for name in TRIGGERS:
+            op.execute(f'DROP TRIGGER IF EXISTS {name}')
+    op.drop_table('task_daily_rollup')
@@ -0,0 +1,114 @@
+"""Add completed_at, the task status event log and completion-based rollups
+
+Revision ID: 010
+Revises: 009
+Create Date: 2024-05-29 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.db.ddl import (
+    COMPLETED_AT,
+    UPDATED_AT,
+    status_event_ddl,
+    status_is,
+    task_rollup_contributions,
+    task_rollup_ddl,
+    task_rollup_upsert,
+)
+from app.models.task import Task, TaskStatus
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_TRIGGERS = ('tasks_rollup_insert', 'tasks_rollup_update', 'tasks_rollup_delete')
+EVENT_TRIGGERS = ('tasks_status_event_insert', 'tasks_status_event_update')
+
+
+def drop_triggers(names) -> None:
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    for name in names:
+        op.execute(f'DROP TRIGGER IF EXISTS {name}' + (' ON tasks' if postgres else ''))
+
+
+def create_rollup_triggers(completion) -> None:
+    """(Re)create the rollup triggers counting completions by ``completion``."""
+    dialect = op.get_bind().dialect.name
+    for statement in task_rollup_ddl(dialect, completion):
+        op.execute(statement)
+    
+    # Recount history by the new completion day
+    op.execute('DELETE FROM task_daily_rollup')
+    op.execute(task_rollup_upsert(
+        task_rollup_contributions(dialect, 'tasks', completion=completion)
+    ))
+
+
+def upgrade() -> None:
+    # Rollup triggers go first so the backfill below doesn't feed them
+    drop_triggers(ROLLUP_TRIGGERS)
+    
+    op.add_column('tasks', sa.Column('completed_at', sa.DateTime(), nullable=True))
+    # Best available completion time for tasks already done
+    op.execute(
+        f"UPDATE tasks SET completed_at = updated_at WHERE {status_is(TaskStatus.DONE)}"
+    )
+    op.drop_index('ix_tasks_owner_id_updated_at_done', table_name='tasks')
+    op.create_index(
+        'ix_tasks_owner_id_completed_at',
+        'tasks',
+        ['owner_id', 'completed_at'],
+        unique=False
+    )
+    
+    # Status history starts here; earlier transitions were never recorded
+    status = postgresql.ENUM(TaskStatus, name='taskstatus', create_type=False)
+    op.create_table(
+        'task_status_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('from_status', status, nullable=True),
+        sa.Column('to_status', status, nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_task_status_events_task_id_to_status',
+        'task_status_events',
+        ['task_id', 'to_status', 'changed_at'],
+        unique=False
+    )
+    
+    for statement in status_event_ddl(op.get_bind().dialect.name):
+        op.execute(statement)
+    
+    create_rollup_triggers(COMPLETED_AT)
+
+
+def downgrade() -> None:
+    drop_triggers(EVENT_TRIGGERS + ROLLUP_TRIGGERS)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP FUNCTION IF EXISTS record_task_status_event()')
+    op.drop_index('ix_task_status_events_task_id_to_status', table_name='task_status_events')
+    op.drop_table('task_status_events')
+    
+    op.drop_index('ix_tasks_owner_id_completed_at', table_name='tasks')
+    op.create_index(
+        'ix_tasks_owner_id_updated_at_done',
+        'tasks',
+        ['owner_id', 'updated_at'],
+        unique=False,
+        postgresql_where=Task.status == TaskStatus.DONE,
+        sqlite_where=Task.status == TaskStatus.DONE
+    )
+    op.drop_column('tasks', 'completed_at')
+    
+    create_rollup_triggers(UPDATED_AT)
@@ -0,0 +1,32 @@
+"""Notify relays of changes to user principals
+
+Revision ID: 011
+Revises: 010
+Create Date: 2024-06-12 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.ddl import user_notify_ddl
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lets every worker drop a deactivated or edited user's cached principal
+    # at commit; like 006 this is Postgres only
+    for statement in user_notify_ddl(op.get_bind().dialect.name):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('DROP TRIGGER IF EXISTS users_principal_notify ON users')
+    op.execute('DROP FUNCTION IF EXISTS notify_user_change()')
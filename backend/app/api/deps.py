@@ -1,27 +1,43 @@
 """API dependencies for dependency injection."""
 
-from typing import Generator
-
-from fastapi import Depends, Header
+from fastapi import Depends, Header, Query, WebSocketException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import (
+    AsyncSessionRunner,
+    SessionRunner,
+    ThreadedSessionRunner,
+    get_async_db,
+    get_db,
+)
 from app.core.exceptions import UnauthorizedException
 from app.core.security import decode_token
 from app.models.user import User
-from app.services.user_service import UserService
+from app.services.user_service import AsyncUserService, Principal
 
 # HTTP Bearer security scheme
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user from JWT token."""
-    token = credentials.credentials
+async def get_threaded_db_runner(db: Session = Depends(get_db)) -> SessionRunner:
+    """Session runner over a sync session (queries run in the threadpool)."""
+    return ThreadedSessionRunner(db)
+
+
+async def get_async_db_runner(db: AsyncSession = Depends(get_async_db)) -> SessionRunner:
+    """Session runner over an async session (queries run on the event loop)."""
+    return AsyncSessionRunner(db)
+
+
+# Database access for async handlers, chosen by the DATABASE_ASYNC setting
+get_db_runner = get_async_db_runner if settings.DATABASE_ASYNC else get_threaded_db_runner
+
+
+def _token_user_id(token: str) -> int:
+    """Return the user id of a valid access token."""
     payload = decode_token(token)
     
     if payload is None:
@@ -35,21 +51,77 @@ def get_current_user(
     if user_id is None:
         raise UnauthorizedException("Invalid token payload")
     
-    user_service = UserService(db)
-    user = user_service.get_by_id(int(user_id))
-    
+    return int(user_id)
+
+
+def _check_active(user: User | Principal | None) -> None:
+    """Reject tokens of deleted or deactivated users."""
     if user is None:
         raise UnauthorizedException("User not found")
     
     if not user.is_active:
         raise UnauthorizedException("Inactive user")
+
+
+async def authenticate_token(token: str, db: SessionRunner) -> User:
+    """Resolve an access token to its active user."""
+    user_service = AsyncUserService(db)
+    user = await user_service.get_by_id(_token_user_id(token))
+    _check_active(user)
+    return user
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: SessionRunner = Depends(get_db_runner)
+) -> User:
+    """
+    Get the current authenticated user from JWT token.
+    
+    Loads the full user row, task version included; routes that only need
+    who is calling depend on get_current_principal instead.
+    """
+    return await authenticate_token(credentials.credentials, db)
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: SessionRunner = Depends(get_db_runner)
+) -> Principal:
+    """
+    Get the current authenticated principal from JWT token.
+    
+    Served from the principal cache, so most requests make no users query.
+    """
+    user_service = AsyncUserService(db)
+    principal = await user_service.get_principal(_token_user_id(credentials.credentials))
+    _check_active(principal)
+    return principal
+
+
+async def get_websocket_user(
+    token: str = Query(..., description="Access token"),
+    db: SessionRunner = Depends(get_db_runner)
+) -> User:
+    """
+    Get the user of a WebSocket from the ``token`` query parameter.
     
+    Browsers cannot set headers on WebSocket requests, so the token travels
+    in the URL instead of an Authorization header.
+    """
+    try:
+        user = await authenticate_token(token, db)
+    except UnauthorizedException as exc:
+        raise WebSocketException(status.WS_1008_POLICY_VIOLATION, exc.detail)
+    # Give the connection back to the pool instead of holding it for as
+    # long as the socket stays open
+    await db.run(lambda session: session.close())
     return user
 
 
-def get_optional_user(
+async def get_optional_user(
     authorization: str = Header(None),
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_db_runner)
 ) -> User | None:
     """Get the current user if authenticated, otherwise None."""
     if not authorization or not authorization.startswith("Bearer "):
@@ -65,6 +137,6 @@ def get_optional_user(
     if user_id is None:
         return None
     
-    user_service = UserService(db)
-    return user_service.get_by_id(int(user_id))
+    user_service = AsyncUserService(db)
+    return await user_service.get_by_id(int(user_id))
 
@@ -1,13 +1,26 @@
 """Analytics endpoints."""
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import time
+from datetime import date, datetime
+from typing import Dict, Optional
 
-from app.api.deps import get_current_user
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+
+from app.api.deps import get_current_user, get_db_runner
+from app.core.config import settings
+from app.core.database import SessionRunner
+from app.core.etag import conditional_get
 from app.models.user import User
-from app.schemas.analytics import AnalyticsSummary
-from app.services.analytics_service import AnalyticsService
+from app.schemas.analytics import (
+    AnalyticsSummary,
+    AnalyticsTimeseries,
+    DurationMetric,
+    DurationPercentiles,
+    TimeseriesGranularity,
+    TimeseriesMetric,
+)
+from app.services.analytics_service import AsyncAnalyticsService
 
 router = APIRouter()
 
@@ -17,8 +30,10 @@ router = APIRouter()
     response_model=AnalyticsSummary,
     summary="Get task analytics summary"
 )
-def get_analytics_summary(
-    db: Session = Depends(get_db),
+async def get_analytics_summary(
+    request: Request,
+    response: Response,
+    db: SessionRunner = Depends(get_db_runner),
     current_user: User = Depends(get_current_user)
 ) -> AnalyticsSummary:
     """
@@ -31,7 +46,183 @@ def get_analytics_summary(
     - Tasks completed this week
     - High priority pending tasks
     - Overall completion rate
+    
+    Responses carry a weak ETag that changes with your tasks and at least
+    every `ANALYTICS_ETAG_TTL_SECONDS`, since some figures depend on the
+    current time.
+    """
+    not_modified = conditional_get(
+        request,
+        response,
+        "analytics",
+        current_user.id,
+        current_user.task_version,
+        int(time.time()) // settings.ANALYTICS_ETAG_TTL_SECONDS
+    )
+    if not_modified:
+        return not_modified
+    
+    analytics_service = AsyncAnalyticsService(db)
+    summary = await analytics_service.get_summary(
+        current_user.id, current_user.task_version
+    )
+    # Already validated by the service; skip the response_model round trip
+    return ORJSONResponse(summary.model_dump(), headers=response.headers)
+
+
+@router.get(
+    "/metrics",
+    response_model=Dict[str, int],
+    summary="Get selected task counts"
+)
+async def get_analytics_metrics(
+    request: Request,
+    response: Response,
+    names: Optional[str] = Query(
+        None, description="Comma-separated metric names (default: all)"
+    ),
+    db: SessionRunner = Depends(get_db_runner),
+    current_user: User = Depends(get_current_user)
+) -> Dict[str, int]:
+    """
+    Get only the task counts a widget needs, e.g.
+    `?names=overdue_tasks,high_priority_pending`.
+    
+    Metric names are the count fields of `/analytics/summary`. Conditional
+    requests work as for the summary.
+    """
+    selected = [name.strip() for name in names.split(",") if name.strip()] if names else None
+    not_modified = conditional_get(
+        request,
+        response,
+        "analytics-metrics",
+        current_user.id,
+        current_user.task_version,
+        int(time.time()) // settings.ANALYTICS_ETAG_TTL_SECONDS,
+        selected
+    )
+    if not_modified:
+        return not_modified
+    
+    analytics_service = AsyncAnalyticsService(db)
+    metrics = await analytics_service.get_metrics(
+        current_user.id, selected, current_user.task_version
+    )
+    return ORJSONResponse(metrics, headers=response.headers)
+
+
+@router.get(
+    "/timeseries",
+    response_model=AnalyticsTimeseries,
+    summary="Get a task metric over time"
+)
+async def get_analytics_timeseries(
+    request: Request,
+    response: Response,
+    metric: TimeseriesMetric = Query(..., description="created, completed or overdue"),
+    granularity: TimeseriesGranularity = Query(TimeseriesGranularity.DAY),
+    start: Optional[date] = Query(None, alias="from", description="First day (UTC)"),
+    end: Optional[date] = Query(None, alias="to", description="Last day (default: today)"),
+    db: SessionRunner = Depends(get_db_runner),
+    current_user: User = Depends(get_current_user)
+) -> AnalyticsTimeseries:
     """
-    analytics_service = AnalyticsService(db)
-    return analytics_service.get_summary(current_user.id)
+    Get tasks created, completed or overdue per day or week, e.g.
+    `?metric=completed&granularity=week`.
+    
+    Defaults to the last 90 days. Every bucket in the range has a point,
+    zero if nothing happened, so charts can plot the array directly.
+    Overdue counts the open tasks past due at the end of each day.
+    """
+    not_modified = conditional_get(
+        request,
+        response,
+        "analytics-timeseries",
+        current_user.id,
+        current_user.task_version,
+        datetime.utcnow().date(),
+        metric.value,
+        granularity.value,
+        start,
+        end
+    )
+    if not_modified:
+        return not_modified
+    
+    analytics_service = AsyncAnalyticsService(db)
+    timeseries = await analytics_service.get_timeseries(
+        current_user.id, metric, granularity, start, end
+    )
+    return ORJSONResponse(timeseries.model_dump(mode="json"), headers=response.headers)
+
+
+async def _duration_percentiles(
+    metric: DurationMetric,
+    days: int,
+    request: Request,
+    response: Response,
+    db: SessionRunner,
+    current_user: User
+) -> DurationPercentiles:
+    """Shared handler of the lead and cycle time endpoints."""
+    not_modified = conditional_get(
+        request,
+        response,
+        "analytics-durations",
+        current_user.id,
+        current_user.task_version,
+        datetime.utcnow().date(),
+        metric.value,
+        days
+    )
+    if not_modified:
+        return not_modified
+    
+    analytics_service = AsyncAnalyticsService(db)
+    percentiles = await analytics_service.get_duration_percentiles(
+        current_user.id, metric, days
+    )
+    return ORJSONResponse(percentiles.model_dump(mode="json"), headers=response.headers)
+
 
+@router.get(
+    "/lead-time",
+    response_model=DurationPercentiles,
+    summary="Get lead time percentiles"
+)
+async def get_lead_time(
+    request: Request,
+    response: Response,
+    days: int = Query(90, ge=1, le=settings.ANALYTICS_TIMESERIES_MAX_DAYS),
+    db: SessionRunner = Depends(get_db_runner),
+    current_user: User = Depends(get_current_user)
+) -> DurationPercentiles:
+    """
+    Get p50, p90 and p99 of the time from creation to completion, in
+    seconds, over the tasks completed in the last `days` days.
+    """
+    return await _duration_percentiles(
+        DurationMetric.LEAD_TIME, days, request, response, db, current_user
+    )
+
+
+@router.get(
+    "/cycle-time",
+    response_model=DurationPercentiles,
+    summary="Get cycle time percentiles"
+)
+async def get_cycle_time(
+    request: Request,
+    response: Response,
+    days: int = Query(90, ge=1, le=settings.ANALYTICS_TIMESERIES_MAX_DAYS),
+    db: SessionRunner = Depends(get_db_runner),
+    current_user: User = Depends(get_current_user)
+) -> DurationPercentiles:
+    """
+    Get p50, p90 and p99 of the time from a task's first move to in
+    progress to its completion, in seconds, over the tasks completed in the
+    last `days` days. Tasks completed without being started are left out.
+    """
+    return await _duration_percentiles(
+        DurationMetric.CYCLE_TIME, days, request, response, db, current_user
+    )
@@ -1,9 +1,11 @@
 """Authentication endpoints."""
 
 from fastapi import APIRouter, Depends, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.api.deps import get_current_principal, get_db_runner, security
+from app.core.database import SessionRunner, get_db
 from app.core.exceptions import UnauthorizedException, BadRequestException
 from app.core.security import (
     create_access_token,
@@ -12,7 +14,7 @@ from app.core.security import (
 )
 from app.schemas.auth import Token, LoginRequest, RefreshRequest
 from app.schemas.user import UserCreate, UserResponse
-from app.services.user_service import UserService
+from app.services.user_service import AsyncUserService, Principal, UserService
 
 router = APIRouter()
 
@@ -23,9 +25,9 @@ router = APIRouter()
     status_code=status.HTTP_201_CREATED,
     summary="Register a new user"
 )
-def register(
+async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_db_runner)
 ) -> UserResponse:
     """
     Register a new user account.
@@ -33,9 +35,11 @@ def register(
     - **email**: Valid email address
     - **password**: Password (min 8 characters)
     - **full_name**: Optional full name
+    
+    Returns 503 with Retry-After when too many passwords are being hashed.
     """
-    user_service = UserService(db)
-    user = user_service.create(user_data)
+    user_service = AsyncUserService(db)
+    user = await user_service.create(user_data)
     return user
 
 
@@ -44,18 +48,20 @@ def register(
     response_model=Token,
     summary="Login to get access token"
 )
-def login(
+async def login(
     login_data: LoginRequest,
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_db_runner)
 ) -> Token:
     """
     Authenticate user and return JWT tokens.
     
     - **email**: Registered email address
     - **password**: User password
+    
+    Returns 503 with Retry-After when too many passwords are being checked.
     """
-    user_service = UserService(db)
-    user = user_service.authenticate(login_data.email, login_data.password)
+    user_service = AsyncUserService(db)
+    user = await user_service.authenticate(login_data.email, login_data.password)
     
     if not user:
         raise UnauthorizedException("Incorrect email or password")
@@ -113,3 +119,22 @@ def refresh_token(
         refresh_token=new_refresh_token
     )
 
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke the access token"
+)
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: SessionRunner = Depends(get_db_runner),
+    current_user: Principal = Depends(get_current_principal)
+) -> None:
+    """
+    Revoke the presented access token for the rest of its lifetime.
+    
+    On Postgres every worker rejects it once the revocation commits (with
+    TASK_STREAM_RELAY on); elsewhere only this worker does, so run a single
+    worker there or rely on the token's short lifetime.
+    """
+    await AsyncUserService(db).revoke_token(credentials.credentials)
@@ -1,32 +1,96 @@
 """Task CRUD endpoints."""
 
-from typing import Optional
+import asyncio
+import io
+from typing import AsyncIterator, Optional, Tuple
 
-from fastapi import APIRouter, Depends, Query, status
+from anyio import from_thread
+from fastapi import (
+    APIRouter, Depends, Header, Query, Request, Response, WebSocket, status
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user
-from app.core.database import get_db
+from app.api.deps import (
+    get_current_principal,
+    get_current_user,
+    get_db_runner,
+    get_websocket_user,
+)
+from app.core.config import settings
+from app.core.database import SessionRunner, get_db
+from app.core.etag import check_etag, conditional_get, if_match_version, task_etag
+from app.core.events import broker
+from app.core.exceptions import BadRequestException
+from app.core.serialization import rows_as_dicts
 from app.models.task import TaskStatus, TaskPriority
 from app.models.user import User
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskListResponse
-from app.services.task_service import TaskService
+from app.schemas.task import (
+    TASK_CHANGE_FIELDS,
+    TASK_FIELDS,
+    SyncStatus,
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkResponse,
+    TaskBulkUpdate,
+    TaskChangesResponse,
+    TaskCreate,
+    TaskImportResult,
+    TaskListResponse,
+    TaskResponse,
+    TaskSyncRequest,
+    TaskSyncResponse,
+    TaskUpdate,
+    TotalMode,
+)
+from app.services.export_service import ENCODERS, MEDIA_TYPES, ExportFormat
+from app.services.import_service import TaskImportService
+from app.services.sync_service import AsyncTaskSyncService
+from app.services.task_service import AsyncTaskService, TaskService
+from app.services.user_service import Principal
 
 router = APIRouter()
 
 
+def get_task_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated task fields to return, e.g. title,status "
+                    "(id is always included)"
+    )
+) -> Optional[Tuple[str, ...]]:
+    """Parse the sparse fieldset parameter into an ordered tuple of field names."""
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(TASK_FIELDS)
+    if unknown:
+        raise BadRequestException(f"Unknown task fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in TASK_FIELDS if name in requested or name == "id")
+
+
 @router.get(
     "",
     response_model=TaskListResponse,
     summary="Get all tasks for current user"
 )
-def get_tasks(
+async def get_tasks(
+    request: Request,
+    response: Response,
     status: Optional[TaskStatus] = Query(None, description="Filter by status"),
     priority: Optional[TaskPriority] = Query(None, description="Filter by priority"),
     search: Optional[str] = Query(None, description="Search in title/description"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from a previous response's next_cursor"
+    ),
+    total_mode: Optional[TotalMode] = Query(
+        None, description="How to compute the total: exact, estimated or none"
+    ),
+    fields: Optional[Tuple[str, ...]] = Depends(get_task_fields),
+    db: SessionRunner = Depends(get_db_runner),
     current_user: User = Depends(get_current_user)
 ) -> TaskListResponse:
     """
@@ -36,25 +100,63 @@ def get_tasks(
     - **status**: todo, in_progress, done
     - **priority**: low, medium, high
     - **search**: Text search in title and description
+    
+    Pagination:
+    - **page** / **page_size**: Offset pagination (compatibility mode)
+    - **cursor**: Keyset pagination; pass the previous response's
+      `next_cursor` to fetch the following page at constant cost
+    - **total_mode**: `exact`, `estimated` or `none`; with `none` no total is
+      computed and `has_more` tells whether another page follows
+    
+    Sparse fieldsets:
+    - **fields**: Only select and return these task fields
+      (e.g. `title,status,priority,due_date`)
+    
+    Responses carry a weak ETag; send it back in `If-None-Match` to get a
+    304 while none of your tasks have changed.
     """
-    task_service = TaskService(db)
-    tasks, total = task_service.get_tasks(
+    not_modified = conditional_get(
+        request,
+        response,
+        "tasks",
+        current_user.id,
+        current_user.task_version,
+        sorted(request.query_params.multi_items())
+    )
+    if not_modified:
+        return not_modified
+    
+    task_service = AsyncTaskService(db)
+    result = await task_service.get_tasks(
         user_id=current_user.id,
         status=status,
         priority=priority,
         search=search,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
+        total_mode=total_mode,
+        fields=fields,
+        as_rows=True
     )
     
-    total_pages = (total + page_size - 1) // page_size
+    total_pages = None
+    if result.total is not None:
+        total_pages = (result.total + page_size - 1) // page_size
     
-    return TaskListResponse(
-        items=tasks,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
+    # Rows are encoded as they come from SQL; response_model only documents
+    # the shape and is not re-validated
+    return ORJSONResponse(
+        {
+            "items": rows_as_dicts(result.items, fields or TASK_FIELDS),
+            "total": result.total,
+            "page": None if cursor else page,
+            "page_size": page_size,
+            "total_pages": total_pages,
+            "has_more": result.has_more,
+            "next_cursor": result.next_cursor,
+        },
+        headers=response.headers
     )
 
 
@@ -64,10 +166,10 @@ def get_tasks(
     status_code=status.HTTP_201_CREATED,
     summary="Create a new task"
 )
-def create_task(
+async def create_task(
     task_data: TaskCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: SessionRunner = Depends(get_db_runner),
+    current_user: Principal = Depends(get_current_principal)
 ) -> TaskResponse:
     """
     Create a new task for the authenticated user.
@@ -78,25 +180,360 @@ def create_task(
     - **priority**: Task priority (default: medium)
     - **due_date**: Optional due date
     """
-    task_service = TaskService(db)
-    task = task_service.create(task_data, current_user.id)
+    task_service = AsyncTaskService(db)
+    task = await task_service.create(task_data, current_user.id)
     return task
 
 
+@router.get(
+    "/changes",
+    response_model=TaskChangesResponse,
+    summary="Get task changes since a sync token"
+)
+async def get_task_changes(
+    request: Request,
+    response: Response,
+    since: Optional[str] = Query(
+        None, description="next_since from the previous call; omit for a full sync"
+    ),
+    limit: int = Query(500, ge=1, le=1000, description="Maximum changes per page"),
+    db: SessionRunner = Depends(get_db_runner),
+    current_user: User = Depends(get_current_user)
+) -> TaskChangesResponse:
+    """
+    Incremental sync feed for keeping a local copy of your tasks.
+    
+    Returns tasks created or updated after `since` in `changes`, and ids of
+    tasks deleted after it in `deleted`. Store `next_since` and pass it on
+    the next call; while `has_more` is true, call again right away.
+    """
+    not_modified = conditional_get(
+        request,
+        response,
+        "changes",
+        current_user.id,
+        current_user.task_version,
+        since,
+        limit
+    )
+    if not_modified:
+        return not_modified
+    
+    task_service = AsyncTaskService(db)
+    result = await task_service.get_changes(current_user.id, since, limit)
+    return ORJSONResponse(
+        {
+            "changes": rows_as_dicts(result.changes, TASK_CHANGE_FIELDS),
+            "deleted": result.deleted,
+            "next_since": result.next_since,
+            "has_more": result.has_more,
+        },
+        headers=response.headers
+    )
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    """Read (and ignore) client messages until the client goes away."""
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@router.websocket("/stream")
+async def stream_task_changes(
+    websocket: WebSocket,
+    current_user: User = Depends(get_websocket_user)
+) -> None:
+    """
+    Push a message whenever the current user's tasks change.
+    
+    Connect with `?token=<access token>`. The first message is
+    `{"type": "hello", "change_seq": ...}`; after it, every write sends
+    `{"type": "tasks_changed", "change_seq": ..., "changes": ...}`, where
+    `changes` counts the writes folded into the message. Writes within
+    `TASK_STREAM_COALESCE_SECONDS` of each other arrive as one message, and
+    writes made while a message is being delivered are folded into the next
+    one, so a slow client never builds up a queue. A client that takes longer
+    than `TASK_STREAM_SEND_TIMEOUT_SECONDS` to accept a message is
+    disconnected. On each message, pull `/tasks/changes` (and refresh
+    analytics) instead of polling.
+    """
+    await websocket.accept()
+    subscription = broker.subscribe(current_user.id)
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(websocket))
+    try:
+        await websocket.send_json(
+            {"type": "hello", "change_seq": current_user.task_version}
+        )
+        while True:
+            batch = asyncio.ensure_future(
+                subscription.next_batch(settings.TASK_STREAM_COALESCE_SECONDS)
+            )
+            await asyncio.wait({batch, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnect.done():
+                batch.cancel()
+                break
+            change_seq, count = batch.result()
+            try:
+                await asyncio.wait_for(
+                    websocket.send_json(
+                        {"type": "tasks_changed", "change_seq": change_seq, "changes": count}
+                    ),
+                    settings.TASK_STREAM_SEND_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                await websocket.close(status.WS_1013_TRY_AGAIN_LATER)
+                break
+    finally:
+        disconnect.cancel()
+        broker.unsubscribe(subscription)
+
+
+@router.post(
+    "/sync",
+    response_model=TaskSyncResponse,
+    summary="Push queued offline edits"
+)
+async def sync_tasks(
+    payload: TaskSyncRequest,
+    db: SessionRunner = Depends(get_db_runner),
+    current_user: Principal = Depends(get_current_principal)
+) -> TaskSyncResponse:
+    """
+    Apply a batch of creates, updates and deletes made while offline.
+    
+    Each operation is `{"op": "create" | "update" | "delete", "id", "base_seq",
+    "modified_at", "client_id", "data", "base"}`, where `base_seq` is the
+    task's `change_seq` from the change feed and `base` holds the values the
+    edited fields had then. All operations are applied in one transaction.
+    If the task changed on the server since `base_seq`, only fields the
+    server changed too conflict; the rest of `data` applies. Conflicting
+    fields keep the server value with `policy=reject`, listed in the
+    result's `conflicts`; with `policy=lww` the client's value wins if it
+    was edited after the server's last write.
+    """
+    sync_service = AsyncTaskSyncService(db)
+    results = await sync_service.push(payload.operations, payload.policy, current_user.id)
+    counts = {status: 0 for status in SyncStatus}
+    for result in results:
+        counts[result.status] += 1
+    return TaskSyncResponse(
+        results=results,
+        applied=counts[SyncStatus.APPLIED],
+        conflicts=counts[SyncStatus.CONFLICT],
+        failed=counts[SyncStatus.ERROR]
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Export all tasks for current user"
+)
+def export_tasks(
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson or csv"),
+    status: Optional[TaskStatus] = Query(None, description="Filter by status"),
+    priority: Optional[TaskPriority] = Query(None, description="Filter by priority"),
+    search: Optional[str] = Query(None, description="Search in title/description"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+) -> StreamingResponse:
+    """
+    Stream every matching task as NDJSON or CSV.
+    
+    Accepts the same filters as the task list. Rows are read from a
+    server-side cursor and written as they arrive, so the whole account is
+    never held in memory.
+    """
+    task_service = TaskService(db)
+    rows = task_service.export_rows(
+        user_id=current_user.id,
+        status=status,
+        priority=priority,
+        search=search
+    )
+    
+    def stream():
+        # The get_db dependency has already closed the session by the time
+        # the body is streamed; the reopened session is closed here instead.
+        try:
+            yield from ENCODERS[format](rows)
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        stream(),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="tasks.{format.value}"'
+        }
+    )
+
+
+class _RequestBodyStream(io.RawIOBase):
+    """
+    Blocking, file-like view of an ASGI request body for worker threads.
+    
+    Each read pulls the next body chunk from the event loop, so the body is
+    consumed incrementally instead of being buffered in full.
+    """
+    
+    def __init__(self, chunks: AsyncIterator[bytes]) -> None:
+        self._chunks = chunks
+        self._pending = b""
+    
+    def readable(self) -> bool:
+        return True
+    
+    async def _next_chunk(self) -> bytes:
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+    
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = from_thread.run(self._next_chunk)
+            if not chunk:
+                return 0
+            self._pending = chunk
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+@router.post(
+    "/import",
+    response_model=TaskImportResult,
+    summary="Import tasks from a streamed file"
+)
+async def import_tasks(
+    request: Request,
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson or csv"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+) -> TaskImportResult:
+    """
+    Import tasks from an NDJSON or CSV request body.
+    
+    Rows use the same fields as task creation (CSV needs a header line).
+    The body is read as a stream and loaded in chunks of
+    `TASK_IMPORT_CHUNK_SIZE` rows (COPY on Postgres), each committed on its
+    own. The response reports the number of rows imported and the line and
+    reason of every rejected row.
+    """
+    body = io.TextIOWrapper(
+        io.BufferedReader(_RequestBodyStream(request.stream().__aiter__())),
+        encoding="utf-8",
+        newline=""
+    )
+    import_service = TaskImportService(db)
+    return await run_in_threadpool(
+        import_service.import_stream, body, format, current_user.id
+    )
+
+
+def _bulk_response(results) -> TaskBulkResponse:
+    """Wrap per-item bulk results with success/failure counts."""
+    failed = sum(1 for result in results if result.error is not None)
+    return TaskBulkResponse(
+        results=results,
+        succeeded=len(results) - failed,
+        failed=failed
+    )
+
+
+@router.post(
+    "/bulk",
+    response_model=TaskBulkResponse,
+    summary="Create many tasks"
+)
+async def bulk_create_tasks(
+    payload: TaskBulkCreate,
+    db: SessionRunner = Depends(get_db_runner),
+    current_user: Principal = Depends(get_current_principal)
+) -> TaskBulkResponse:
+    """
+    Create up to `TASK_BULK_MAX_ITEMS` tasks in one transaction.
+    
+    Each item has the same shape as the single create body. Invalid items
+    are reported with `status_code` 422 and do not prevent the others from
+    being created.
+    """
+    task_service = AsyncTaskService(db)
+    return _bulk_response(await task_service.bulk_create(payload.items, current_user.id))
+
+
+@router.patch(
+    "/bulk",
+    response_model=TaskBulkResponse,
+    summary="Update many tasks"
+)
+async def bulk_update_tasks(
+    payload: TaskBulkUpdate,
+    db: SessionRunner = Depends(get_db_runner),
+    current_user: Principal = Depends(get_current_principal)
+) -> TaskBulkResponse:
+    """
+    Update many tasks in one transaction.
+    
+    Each item is `{"id": ..., <fields to change>}`. Unknown or foreign task
+    ids and invalid fields are reported per item.
+    """
+    task_service = AsyncTaskService(db)
+    return _bulk_response(await task_service.bulk_update(payload.items, current_user.id))
+
+
+@router.delete(
+    "/bulk",
+    response_model=TaskBulkResponse,
+    summary="Delete many tasks"
+)
+async def bulk_delete_tasks(
+    payload: TaskBulkDelete,
+    db: SessionRunner = Depends(get_db_runner),
+    current_user: Principal = Depends(get_current_principal)
+) -> TaskBulkResponse:
+    """Delete many tasks by ID in one transaction."""
+    task_service = AsyncTaskService(db)
+    return _bulk_response(await task_service.bulk_delete(payload.ids, current_user.id))
+
+
 @router.get(
     "/{task_id}",
     response_model=TaskResponse,
     summary="Get a specific task"
 )
-def get_task(
+async def get_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    fields: Optional[Tuple[str, ...]] = Depends(get_task_fields),
+    db: SessionRunner = Depends(get_db_runner),
+    current_user: Principal = Depends(get_current_principal)
 ) -> TaskResponse:
-    """Get a specific task by ID."""
-    task_service = TaskService(db)
-    task = task_service.get_user_task(task_id, current_user.id)
-    return task
+    """
+    Get a specific task by ID.
+    
+    Supports `If-None-Match` and the `fields` sparse fieldset parameter. The
+    ETag is the task's version; send it as `If-Match` on PUT or DELETE to
+    avoid overwriting someone else's edit.
+    """
+    task_service = AsyncTaskService(db)
+    if request.headers.get("if-none-match"):
+        # Revalidation reads the version alone; the task is loaded only if it changed
+        version = await task_service.get_user_task_version(task_id, current_user.id)
+        not_modified = check_etag(request, response, task_etag(version, fields))
+        if not_modified:
+            return not_modified
+    row = await task_service.get_user_task_row(task_id, current_user.id, fields)
+    
+    not_modified = check_etag(request, response, task_etag(row.version, fields))
+    if not_modified:
+        return not_modified
+    return ORJSONResponse(
+        rows_as_dicts([row], fields or TASK_FIELDS)[0], headers=response.headers
+    )
 
 
 @router.put(
@@ -104,19 +541,26 @@ def get_task(
     response_model=TaskResponse,
     summary="Update a task"
 )
-def update_task(
+async def update_task(
     task_id: int,
     task_data: TaskUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: SessionRunner = Depends(get_db_runner),
+    current_user: Principal = Depends(get_current_principal)
 ) -> TaskResponse:
     """
     Update an existing task.
     
-    Only provided fields will be updated.
+    Only provided fields will be updated. With `If-Match: <ETag>` the update
+    only applies if the task is still at that version, and fails with 412
+    otherwise.
     """
-    task_service = TaskService(db)
-    task = task_service.update(task_id, task_data, current_user.id)
+    task_service = AsyncTaskService(db)
+    task = await task_service.update(
+        task_id, task_data, current_user.id, if_match_version(if_match)
+    )
+    response.headers["ETag"] = task_etag(task.version)
     return task
 
 
@@ -125,12 +569,17 @@ def update_task(
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete a task"
 )
-def delete_task(
+async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    if_match: Optional[str] = Header(None),
+    db: SessionRunner = Depends(get_db_runner),
+    current_user: Principal = Depends(get_current_principal)
 ) -> None:
-    """Delete a task by ID."""
-    task_service = TaskService(db)
-    task_service.delete(task_id, current_user.id)
+    """
+    Delete a task by ID.
+    
+    Supports `If-Match` like PUT.
+    """
+    task_service = AsyncTaskService(db)
+    await task_service.delete(task_id, current_user.id, if_match_version(if_match))
 
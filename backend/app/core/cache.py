@@ -0,0 +1,247 @@
+"""Per-user result caches invalidated by task writes or user changes."""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Set, Tuple
+
+
+class CacheEntry(NamedTuple):
+    """A cached result and what it is valid for."""
+    
+    # The user's task_version the result was computed at
+    version: int
+    # Wall-clock time (time.time()) after which the result may be wrong
+    expires_at: float
+    value: Any
+
+
+class CacheBackend(ABC):
+    """
+    Storage shared between workers (e.g. Redis) behind the in-process LRU.
+    
+    Entries are grouped per user so that one write drops all of them.
+    """
+    
+    @abstractmethod
+    def get(self, namespace: str, user_id: int, key: str) -> Optional[CacheEntry]:
+        ...
+    
+    @abstractmethod
+    def set(
+        self, namespace: str, user_id: int, key: str, entry: CacheEntry
+    ) -> None:
+        ...
+    
+    @abstractmethod
+    def delete_user(self, namespace: str, user_id: int) -> None:
+        ...
+
+
+class MemoryBackend(CacheBackend):
+    """Process-local stand-in for a shared backend (single worker, tests)."""
+    
+    def __init__(self) -> None:
+        self._data: Dict[Tuple[str, int], Dict[str, CacheEntry]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, namespace: str, user_id: int, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            return self._data.get((namespace, user_id), {}).get(key)
+    
+    def set(
+        self, namespace: str, user_id: int, key: str, entry: CacheEntry
+    ) -> None:
+        with self._lock:
+            self._data.setdefault((namespace, user_id), {})[key] = entry
+    
+    def delete_user(self, namespace: str, user_id: int) -> None:
+        with self._lock:
+            self._data.pop((namespace, user_id), None)
+
+
+class RedisBackend(CacheBackend):
+    """
+    Redis hash per user and namespace, holding JSON entries.
+    
+    The hash expires with its latest entry; older entries carry their own
+    expiry and are checked on read.
+    """
+    
+    def __init__(self, url: str) -> None:
+        import redis
+        
+        self.client = redis.Redis.from_url(url)
+    
+    def get(self, namespace: str, user_id: int, key: str) -> Optional[CacheEntry]:
+        raw = self.client.hget(f"{namespace}:{user_id}", key)
+        return CacheEntry(*json.loads(raw)) if raw is not None else None
+    
+    def set(
+        self, namespace: str, user_id: int, key: str, entry: CacheEntry
+    ) -> None:
+        name = f"{namespace}:{user_id}"
+        ttl = max(1, int(entry.expires_at - time.time()) + 1)
+        with self.client.pipeline() as pipe:
+            pipe.hset(name, key, json.dumps(entry))
+            pipe.expire(name, ttl)
+            pipe.execute()
+    
+    def delete_user(self, namespace: str, user_id: int) -> None:
+        self.client.delete(f"{namespace}:{user_id}")
+
+
+class ResultCache:
+    """
+    Bounded LRU of per-user results in front of an optional shared backend.
+    
+    An entry is only served to a request whose user is at the entry's task
+    version (or older) and before its expiry, so a missed invalidation
+    costs a recomputation, never a stale answer. Writes also drop the user's
+    entries on commit to free the space early.
+    
+    ``scope`` is what invalidates the cache: "tasks" for writes to the
+    user's tasks, "user" for changes to the user row itself. With
+    ``maxsize`` 0 entries live in the backend only, so an invalidation
+    reaches every worker at once.
+    """
+    
+    def __init__(
+        self,
+        namespace: str,
+        maxsize: int,
+        backend: Optional[CacheBackend] = None,
+        scope: str = "tasks"
+    ) -> None:
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.backend = backend
+        self.scope = scope
+        self._entries: "OrderedDict[Tuple[int, str], CacheEntry]" = OrderedDict()
+        self._keys: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        caches[namespace] = self
+    
+    def get(self, user_id: int, key: str, version: int) -> Optional[Any]:
+        """Return the cached result for ``key`` if valid at ``version``."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is not None and self._valid(entry, version, now):
+                self._entries.move_to_end((user_id, key))
+                self.hits += 1
+                return entry.value
+        
+        if self.backend is not None:
+            entry = self.backend.get(self.namespace, user_id, key)
+            if entry is not None and self._valid(entry, version, now):
+                with self._lock:
+                    self._store(user_id, key, entry)
+                    self.hits += 1
+                return entry.value
+        
+        with self._lock:
+            self.misses += 1
+        return None
+    
+    def set(
+        self,
+        user_id: int,
+        key: str,
+        version: int,
+        value: Any,
+        ttl: float,
+        invalidations: Optional[int] = None
+    ) -> None:
+        """
+        Cache ``value``, computed at task ``version``, for ``ttl`` seconds.
+        
+        ``invalidations`` is the counter as read before computing ``value``;
+        if an invalidation came in since, ``value`` may predate it and is
+        not cached.
+        """
+        if ttl <= 0:
+            return
+        entry = CacheEntry(version, time.time() + ttl, value)
+        with self._lock:
+            if invalidations is not None and invalidations != self.invalidations:
+                return
+            self._store(user_id, key, entry)
+        if self.backend is not None:
+            self.backend.set(self.namespace, user_id, key, entry)
+            # An invalidation may have cleared the backend just before this set
+            if invalidations is not None and invalidations != self.invalidations:
+                self.backend.delete_user(self.namespace, user_id)
+    
+    def invalidate(self, user_id: int, shared: bool = True) -> None:
+        """Drop a user's results (also from the shared backend if ``shared``)."""
+        with self._lock:
+            for key in self._keys.pop(user_id, ()):
+                del self._entries[(user_id, key)]
+            self.invalidations += 1
+        if shared and self.backend is not None:
+            self.backend.delete_user(self.namespace, user_id)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+    
+    @staticmethod
+    def _valid(entry: CacheEntry, version: int, now: float) -> bool:
+        return entry.version >= version and entry.expires_at > now
+    
+    def _store(self, user_id: int, key: str, entry: CacheEntry) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[(user_id, key)] = entry
+        self._entries.move_to_end((user_id, key))
+        self._keys.setdefault(user_id, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            (old_user_id, old_key), _ = self._entries.popitem(last=False)
+            keys = self._keys[old_user_id]
+            keys.discard(old_key)
+            if not keys:
+                del self._keys[old_user_id]
+            self.evictions += 1
+
+
+# Every ResultCache by namespace, for invalidation and stats
+caches: Dict[str, ResultCache] = {}
+
+
+def invalidate_user(user_id: int, shared: bool = True, scope: str = "tasks") -> None:
+    """Drop a user's entries from the caches of ``scope`` after it changed."""
+    for cache in caches.values():
+        if cache.scope == scope:
+            cache.invalidate(user_id, shared)
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    return {namespace: cache.stats() for namespace, cache in caches.items()}
+
+
+def create_backend(url: Optional[str]) -> Optional[CacheBackend]:
+    """Shared backend for a URL: ``redis://...`` or ``memory://``, else none."""
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return MemoryBackend()
+    return RedisBackend(url)
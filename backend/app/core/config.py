@@ -1,7 +1,7 @@
 """Application configuration settings."""
 
 from functools import lru_cache
-from typing import List
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -17,11 +17,84 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "postgresql://taskflow:taskflow@db:5432/taskflow"
     
+    # Serve the API through an async engine (asyncpg / aiosqlite, derived
+    # from DATABASE_URL) instead of sync sessions in the threadpool
+    DATABASE_ASYNC: bool = False
+    DATABASE_ASYNC_POOL_SIZE: int = 20
+    DATABASE_ASYNC_MAX_OVERFLOW: int = 30
+    
+    # Read replicas for task list, detail and analytics reads. A user's reads
+    # stay on the primary for this many seconds after they write, which
+    # must exceed the replication lag.
+    DATABASE_REPLICA_URLS: List[str] = []
+    DATABASE_REPLICA_STICKY_SECONDS: float = 5
+    
+    # Search ("fulltext" uses the indexed engine of the database, "ilike" the
+    # unindexed substring scan)
+    SEARCH_BACKEND: str = "fulltext"
+    
+    # Task list totals: "exact", "estimated" (planner statistics) or "none"
+    TASK_LIST_TOTAL_MODE: str = "exact"
+    
+    # Maximum number of items accepted by one bulk task request
+    TASK_BULK_MAX_ITEMS: int = 5000
+    
+    # Streaming task import: rows validated and loaded per chunk, and the
+    # maximum number of per-row errors echoed back
+    TASK_IMPORT_CHUNK_SIZE: int = 1000
+    TASK_IMPORT_MAX_REPORTED_ERRORS: int = 1000
+    
+    # Analytics ETags also change every this many seconds, so time-dependent
+    # figures (overdue, completed this week) are never staler than this
+    ANALYTICS_ETAG_TTL_SECONDS: int = 60
+    
+    # Analytics result cache: entries kept per worker (0 disables it), the
+    # longest they live, and an optional shared backend ("redis://..." or
+    # "memory://" for a process-local stand-in). Entries also expire when a
+    # due date passes and on every write to the user's tasks.
+    ANALYTICS_CACHE_SIZE: int = 10000
+    ANALYTICS_CACHE_TTL_SECONDS: float = 300
+    ANALYTICS_CACHE_URL: Optional[str] = None
+    
+    # Authenticated principals (id, email, name, active flag) cached by user
+    # id so requests skip the users lookup: seconds an entry lives (0
+    # disables the cache), entries kept per worker, and an optional shared
+    # backend as above. With a Redis backend entries are kept there only, so
+    # deactivating a user takes effect on every worker at once; "memory://"
+    # is per process. Otherwise the Postgres LISTEN/NOTIFY relay (see
+    # TASK_STREAM_RELAY) drops the entry on every worker at commit, and
+    # without it other workers notice within the TTL.
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_URL: Optional[str] = None
+    
+    # Analytics time series: default and longest range in days
+    ANALYTICS_TIMESERIES_DEFAULT_DAYS: int = 90
+    ANALYTICS_TIMESERIES_MAX_DAYS: int = 731
+    
+    # Task change stream: how long to gather a burst of changes into one
+    # message, and how long a client may take to accept one before it is
+    # disconnected. The Postgres LISTEN/NOTIFY relay spreads changes (and
+    # principal invalidations and token revocations) across workers.
+    TASK_STREAM_COALESCE_SECONDS: float = 0.25
+    TASK_STREAM_SEND_TIMEOUT_SECONDS: float = 10
+    TASK_STREAM_RELAY: bool = True
+    
     # JWT Settings
     SECRET_KEY: str = "change-me"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Password hashing: bcrypt cost (hashes of another cost are upgraded on
+    # the user's next login), threads hashing at once per worker, and how
+    # many more requests may wait for one before they get a 503
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE: int = 32
+    
+    # Verified access tokens kept per worker so repeat presentations skip
+    # the signature check (0 disables the cache)
+    TOKEN_CACHE_SIZE: int = 10000
     
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:5173"]
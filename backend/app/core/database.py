@@ -1,12 +1,35 @@
 """Database configuration and session management."""
 
-from typing import Generator
+import functools
+import inspect
+from abc import ABC, abstractmethod
+import random
+import time
+from contextlib import contextmanager
+from typing import (
+    AsyncGenerator, Callable, Dict, Generator, Iterator, List, Optional, TypeVar
+)
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+)
 from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 
+T = TypeVar("T")
+
+# Async drivers used for each sync driver when DATABASE_ASYNC is enabled
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
@@ -15,13 +38,202 @@ engine = create_engine(
     max_overflow=20
 )
 
+# Read replicas for read-only service methods (see replica_read)
+replica_engines: List[Engine] = [
+    create_engine(url, pool_pre_ping=True, pool_size=10, max_overflow=20)
+    for url in settings.DATABASE_REPLICA_URLS
+]
+
+
+class RoutingSession(Session):
+    """
+    Session that sends the statements of ``replica_read`` methods to a replica.
+    
+    Everything else, and every statement of a transaction that has already
+    written, goes to the primary bind. Replicas come from the session's
+    ``info["replicas"]``.
+    """
+    
+    def get_bind(self, mapper=None, **kwargs):
+        replica = self.info.get("replica")
+        if replica is not None and not self._flushing and not self.info.get("wrote"):
+            return replica
+        return super().get_bind(mapper, **kwargs)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _track_writes(execute_state) -> None:
+    if not execute_state.is_select:
+        execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_writes(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("wrote", None)
+
+
+class WriteClock:
+    """Remembers when each user last wrote their tasks."""
+    
+    # Forget writes older than the stickiness window once this many are kept
+    PRUNE_SIZE = 10000
+    
+    def __init__(self) -> None:
+        self._writes: Dict[int, float] = {}
+    
+    def record(self, user_id: int) -> None:
+        now = time.monotonic()
+        if len(self._writes) >= self.PRUNE_SIZE:
+            cutoff = now - settings.DATABASE_REPLICA_STICKY_SECONDS
+            self._writes = {
+                key: written for key, written in self._writes.items() if written > cutoff
+            }
+        self._writes[user_id] = now
+    
+    def wrote_recently(self, user_id: int) -> bool:
+        written = self._writes.get(user_id)
+        return written is not None and (
+            time.monotonic() - written < settings.DATABASE_REPLICA_STICKY_SECONDS
+        )
+
+
+# Fed by committed task writes of this worker and, through the Postgres
+# NOTIFY relay, of every other worker
+write_clock = WriteClock()
+
+
+@contextmanager
+def replica_reads(session: Session, user_id: Optional[int] = None) -> Iterator[None]:
+    """
+    Route the session's reads to a replica inside the block.
+    
+    Reads stay on the primary when no replica is configured or when
+    ``user_id`` wrote within ``DATABASE_REPLICA_STICKY_SECONDS``, so users
+    always see their own writes.
+    """
+    replicas = session.info.get("replicas")
+    if (
+        not replicas
+        or "replica" in session.info
+        or (user_id is not None and write_clock.wrote_recently(user_id))
+    ):
+        yield
+        return
+    # One replica for the whole block, so a count and its page agree
+    session.info["replica"] = random.choice(replicas)
+    try:
+        yield
+    finally:
+        del session.info["replica"]
+
+
+def replica_read(method: Callable[..., T]) -> Callable[..., T]:
+    """
+    Mark a read-only service method as safe to serve from a replica.
+    
+    The method's ``user_id`` argument, if any, decides read-your-writes
+    stickiness.
+    """
+    signature = inspect.signature(method)
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        user_id = signature.bind(self, *args, **kwargs).arguments.get("user_id")
+        with replica_reads(self.db, user_id):
+            return method(self, *args, **kwargs)
+    
+    return wrapper
+
+
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=RoutingSession,
+    info={"replicas": replica_engines}
+)
 
 # Base class for models
 Base = declarative_base()
 
 
+def get_async_database_url(url: str) -> str:
+    """Swap the driver of a sync database URL for its async counterpart."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def create_async_session_factory(
+    async_engine: AsyncEngine, replicas: Optional[List[AsyncEngine]] = None
+) -> async_sessionmaker:
+    """
+    Session factory for the async engine.
+    
+    Objects stay loaded after commit: touching an expired attribute outside
+    ``run_sync`` would need IO the event loop cannot do implicitly.
+    """
+    return async_sessionmaker(
+        async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+        sync_session_class=RoutingSession,
+        info={"replicas": [replica.sync_engine for replica in replicas or []]}
+    )
+
+
+# Async engines and session factory (only built when the async stack is enabled)
+async_engine: Optional[AsyncEngine] = None
+async_replica_engines: List[AsyncEngine] = []
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+if settings.DATABASE_ASYNC:
+    async_engine, *async_replica_engines = [
+        create_async_engine(
+            get_async_database_url(url),
+            pool_pre_ping=True,
+            pool_size=settings.DATABASE_ASYNC_POOL_SIZE,
+            max_overflow=settings.DATABASE_ASYNC_MAX_OVERFLOW
+        )
+        for url in [settings.DATABASE_URL, *settings.DATABASE_REPLICA_URLS]
+    ]
+    AsyncSessionLocal = create_async_session_factory(async_engine, async_replica_engines)
+
+
+class SessionRunner(ABC):
+    """Runs ORM code against a request's session from async handlers."""
+    
+    @abstractmethod
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Call ``fn(session, *args, **kwargs)`` without blocking the event loop."""
+
+
+class ThreadedSessionRunner(SessionRunner):
+    """Sync engine: ORM code runs in the threadpool on a sync session."""
+    
+    def __init__(self, session: Session) -> None:
+        self.session = session
+    
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+class AsyncSessionRunner(SessionRunner):
+    """Async engine: ORM code runs on the event loop via ``run_sync``."""
+    
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+    
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        return await self.session.run_sync(fn, *args, **kwargs)
+
+
 def get_db() -> Generator[Session, None, None]:
     """Dependency that provides a database session."""
     db = SessionLocal()
@@ -30,3 +242,8 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency that provides an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
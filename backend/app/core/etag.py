@@ -0,0 +1,78 @@
+"""ETag helpers for conditional requests."""
+
+import hashlib
+import re
+from typing import Any, Optional, Sequence
+
+from fastapi import Request, Response, status
+
+from app.core.exceptions import PreconditionFailedException
+
+# Strong task ETag: the task version, plus a fieldset hash for sparse fieldsets
+TASK_ETAG_PATTERN = re.compile(r'^"(\d+)(?:-[0-9a-f]+)?"$')
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from the values a response depends on."""
+    raw = "|".join(str(part) for part in parts)
+    return 'W/"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def task_etag(version: int, fields: Optional[Sequence[str]] = None) -> str:
+    """
+    Build the strong ETag of a single task from its version.
+    
+    Each sparse fieldset is its own representation, so it gets its own tag;
+    any of them is accepted by If-Match.
+    """
+    if not fields:
+        return f'"{version}"'
+    return f'"{version}-' + hashlib.sha1(",".join(fields).encode()).hexdigest()[:8] + '"'
+
+
+def if_match_version(if_match: Optional[str]) -> Optional[int]:
+    """
+    Task version an If-Match header requires, or None when there is none.
+    
+    ``*`` only requires the task to exist. Weak or foreign tags can never
+    match (If-Match uses strong comparison), so they fail with 412.
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    for candidate in if_match.split(","):
+        match = TASK_ETAG_PATTERN.match(candidate.strip())
+        if match:
+            return int(match.group(1))
+    raise PreconditionFailedException()
+
+
+def conditional_get(request: Request, response: Response, *parts: Any) -> Optional[Response]:
+    """
+    Tag a response with an ETag built from ``parts``.
+    
+    Returns a ready 304 response when the client already holds the current
+    representation, so the caller can skip loading and serializing it.
+    """
+    return check_etag(request, response, make_etag(*parts))
+
+
+def check_etag(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Tag a response with ``etag``, or return a 304 if the client has it."""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
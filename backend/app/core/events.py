@@ -0,0 +1,232 @@
+"""Push notifications of task changes to connected clients."""
+
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.cache import invalidate_user
+from app.core.database import write_clock
+from app.core.security import token_cache
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel the users trigger notifies with "<user_id>:<task_version>"
+TASK_CHANGES_CHANNEL = "task_changes"
+# ... and with "<user_id>" when a user's principal fields change
+USER_CHANGES_CHANNEL = "user_changes"
+# Logouts notify "<sha256 hex digest>:<exp>" of the revoked token
+TOKEN_REVOCATIONS_CHANNEL = "token_revocations"
+
+
+class TaskChangeSubscription:
+    """
+    One stream connection's view of its user's task changes.
+    
+    Pending changes collapse into a single slot holding the newest version
+    and the number of changes folded into it, so a slow client costs
+    constant memory and catches up with one message.
+    """
+    
+    def __init__(self, user_id: int) -> None:
+        self.user_id = user_id
+        self._change_seq = 0
+        self._count = 0
+        self._ready = asyncio.Event()
+    
+    def push(self, change_seq: int) -> None:
+        self._change_seq = max(self._change_seq, change_seq)
+        self._count += 1
+        self._ready.set()
+    
+    async def next_batch(self, window: float = 0) -> Tuple[int, int]:
+        """
+        Wait for changes and return ``(newest change_seq, change count)``.
+        
+        After the first change arrives, waits ``window`` seconds more so the
+        rest of a burst lands in the same batch.
+        """
+        await self._ready.wait()
+        if window:
+            await asyncio.sleep(window)
+        self._ready.clear()
+        batch = (self._change_seq, self._count)
+        self._count = 0
+        return batch
+
+
+class TaskChangeBroker:
+    """
+    In-process fan-out of task changes to this worker's subscriptions.
+    
+    ``publish`` may be called from any thread; delivery always happens on
+    the event loop the subscriptions live on.
+    """
+    
+    def __init__(self) -> None:
+        self._subscriptions: Dict[int, Set[TaskChangeSubscription]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        # Set while a relay feeds the broker from the database, in which case
+        # committed sessions leave publishing to it
+        self.relay_active = False
+    
+    def subscribe(self, user_id: int) -> TaskChangeSubscription:
+        """Start receiving changes for a user (call on the event loop)."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        subscription = TaskChangeSubscription(user_id)
+        self._subscriptions[user_id].add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: TaskChangeSubscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.user_id]
+    
+    def publish(self, user_id: int, change_seq: int) -> None:
+        """Notify the user's subscriptions that their tasks reached ``change_seq``."""
+        loop = self._loop
+        if loop is None or user_id not in self._subscriptions or loop.is_closed():
+            return
+        if threading.get_ident() == self._loop_thread:
+            self._deliver(user_id, change_seq)
+        else:
+            loop.call_soon_threadsafe(self._deliver, user_id, change_seq)
+    
+    def _deliver(self, user_id: int, change_seq: int) -> None:
+        for subscription in self._subscriptions.get(user_id, ()):
+            subscription.push(change_seq)
+
+
+broker = TaskChangeBroker()
+
+
+def record_task_change(session: Session, user_id: int, change_seq: int) -> None:
+    """Queue a change notification, sent once the session commits."""
+    pending = session.info.setdefault("task_changes", {})
+    pending[user_id] = max(pending.get(user_id, 0), change_seq)
+
+
+def record_user_change(session: Session, user_id: int) -> None:
+    """Queue the invalidation of a user's cached principal, done on commit."""
+    session.info.setdefault("user_changes", set()).add(user_id)
+
+
+def announce_token_revocation(session: Session, digest: bytes, expires_at: float) -> None:
+    """
+    Pass a revoked token on to the other workers once ``session`` commits.
+    
+    Only Postgres relays changes across workers; elsewhere revocation stays
+    with the worker that made it.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(
+            select(func.pg_notify(TOKEN_REVOCATIONS_CHANNEL, f"{digest.hex()}:{expires_at}"))
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_changes(session: Session) -> None:
+    for user_id in session.info.pop("user_changes", ()):
+        invalidate_user(user_id, scope="user")
+    pending = session.info.pop("task_changes", None)
+    if not pending:
+        return
+    for user_id, change_seq in pending.items():
+        write_clock.record(user_id)
+        invalidate_user(user_id)
+        if not broker.relay_active:
+            broker.publish(user_id, change_seq)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_changes(session: Session) -> None:
+    session.info.pop("task_changes", None)
+    session.info.pop("user_changes", None)
+
+
+class PostgresNotifyRelay:
+    """
+    Feeds the broker (and the replica write clock and result caches) from
+    Postgres NOTIFY so every worker sees every write.
+    
+    Triggers on ``users`` notify on each task version bump and on each
+    change to a principal (email, name, active flag, deletion), and logouts
+    on each revoked token, delivered by Postgres at commit. Each worker
+    holds one LISTEN connection and reconnects when it drops; until then,
+    writes made by this worker are still published locally.
+    """
+    
+    RETRY_SECONDS = 5
+    
+    def __init__(self, database_url: str) -> None:
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self) -> None:
+        import asyncpg
+        
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.get_running_loop().create_future()
+                connection.add_termination_listener(
+                    lambda _: closed.done() or closed.set_result(None)
+                )
+                await connection.add_listener(TASK_CHANGES_CHANNEL, self._on_notify)
+                await connection.add_listener(USER_CHANGES_CHANNEL, self._on_user_notify)
+                await connection.add_listener(TOKEN_REVOCATIONS_CHANNEL, self._on_revocation)
+                broker.relay_active = True
+                await closed
+                logger.warning("Task change relay connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Task change relay failed, retrying")
+            finally:
+                broker.relay_active = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.RETRY_SECONDS)
+    
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        user_id, change_seq = (int(part) for part in payload.split(":"))
+        # Writes on other workers also keep this user's reads on the primary
+        write_clock.record(user_id)
+        # The writing worker already cleared the shared cache backend
+        invalidate_user(user_id, shared=False)
+        broker.publish(user_id, change_seq)
+    
+    def _on_user_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        # e.g. a deactivation on another worker; its cached principal goes now
+        # rather than when the entry's TTL runs out. The shared backend is
+        # cleared again too, in case a load on this worker that read the row
+        # before the change stored it after the writer cleared it.
+        invalidate_user(int(payload), scope="user")
+    
+    def _on_revocation(self, connection, pid: int, channel: str, payload: str) -> None:
+        digest, expires_at = payload.split(":")
+        token_cache.revoke(bytes.fromhex(digest), float(expires_at))
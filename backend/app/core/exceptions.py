@@ -67,3 +67,25 @@ class ConflictException(TaskFlowException):
             detail=detail
         )
 
+
+class PreconditionFailedException(TaskFlowException):
+    """Exception raised when an If-Match precondition does not hold."""
+    
+    def __init__(self, detail: str = "Resource has been modified") -> None:
+        super().__init__(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=detail
+        )
+
+
+class ServiceUnavailableException(TaskFlowException):
+    """Exception raised when the server sheds load it cannot take on."""
+    
+    def __init__(
+        self, detail: str = "Server is busy, retry shortly", retry_after: int = 1
+    ) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
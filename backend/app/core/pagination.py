@@ -0,0 +1,46 @@
+"""Keyset pagination cursor and sync token helpers."""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Tuple
+
+from app.core.exceptions import BadRequestException
+
+
+def _encode(payload: Any) -> str:
+    raw = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(token: str) -> Any:
+    padded = token + "=" * (-len(token) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """Encode a (created_at, id) seek position as an opaque cursor."""
+    return _encode([created_at.isoformat(), item_id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode an opaque cursor back into its (created_at, id) seek position."""
+    try:
+        created_at, item_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError):
+        raise BadRequestException("Invalid cursor")
+
+
+def encode_sync_token(change_seq: int, item_id: int) -> str:
+    """Encode a (change_seq, id) change feed position as an opaque token."""
+    return _encode([change_seq, item_id])
+
+
+def decode_sync_token(token: str) -> Tuple[int, int]:
+    """Decode a change feed token back into its (change_seq, id) position."""
+    try:
+        change_seq, item_id = _decode(token)
+        return int(change_seq), int(item_id)
+    except (ValueError, TypeError):
+        raise BadRequestException("Invalid sync token")
@@ -1,15 +1,26 @@
 """Security utilities for password hashing and JWT tokens."""
 
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# Password hashing context; hashes of another cost count as outdated
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -22,6 +33,61 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if its hash uses an outdated cost, rehash it.
+    
+    Returns whether the password matches and the new hash to store, if any.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on dedicated threads, away from the request threadpool.
+    
+    bcrypt releases the GIL, so the threads hash in parallel while task
+    endpoints keep their threadpool. At most ``workers`` hashes run and
+    ``queue`` more wait; beyond that requests are turned away with 503
+    instead of piling up behind a login burst.
+    """
+    
+    def __init__(self, workers: int, queue: int) -> None:
+        self.capacity = workers + queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+    
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func(*args)`` on a hashing thread, or reject it when full."""
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise ServiceUnavailableException("Too many sign-ins in progress, retry shortly")
+            self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, func, *args
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+    
+    async def hash(self, password: str) -> str:
+        return await self.run(get_password_hash, password)
+    
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await self.run(verify_and_update_password, plain_password, hashed_password)
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE)
+
+
 def create_access_token(
     subject: str | int,
     expires_delta: Optional[timedelta] = None
@@ -60,13 +126,132 @@ def create_refresh_token(
     return encoded_jwt
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified access tokens, keyed by their SHA-256 digest.
+    
+    A token presented again within its lifetime is answered from here
+    without the signature check and JSON parsing. Entries are dropped once
+    their ``exp`` passes, so the cache never extends a token's life, and
+    ``revoke`` rejects a token until it expires whether or not it is cached.
+    Both are per process; the Postgres relay in app.core.events passes
+    revocations on to the other workers.
+    """
+    
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # Digests of revoked tokens and when they expire anyway
+        self._revoked: Dict[bytes, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, digest: bytes) -> Optional[Dict[str, Any]]:
+        """Claims of a cached, unexpired token."""
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims = entry
+            if expires_at <= time.time():
+                del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return dict(claims)
+    
+    def set(self, digest: bytes, claims: Dict[str, Any]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[digest] = (float(claims["exp"]), dict(claims))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def is_revoked(self, digest: bytes) -> bool:
+        # revoke() swaps in a new dict, so this read needs no lock
+        return digest in self._revoked
+    
+    def revoke(self, digest: bytes, expires_at: float) -> None:
+        """Reject the token with ``digest`` until it expires, e.g. after logout."""
+        now = time.time()
+        with self._lock:
+            self._entries.pop(digest, None)
+            # Forget revocations of tokens that have expired meanwhile
+            revoked = {
+                key: until for key, until in self._revoked.items() if until > now
+            }
+            if expires_at > now:
+                revoked[digest] = expires_at
+            self._revoked = revoked
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._revoked.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "revoked": len(self._revoked),
+            }
+
+
+token_cache = VerifiedTokenCache(settings.TOKEN_CACHE_SIZE)
+
+
 def decode_token(token: str) -> Optional[dict[str, Any]]:
-    """Decode and validate a JWT token."""
+    """
+    Decode and validate a JWT token.
+    
+    Access tokens verified before are answered from ``token_cache``.
+    """
+    digest = token_cache.digest(token)
+    if token_cache.is_revoked(digest):
+        return None
+    cached = token_cache.get(digest)
+    if cached is not None:
+        return cached
+    
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        return payload
     except JWTError:
         return None
+    # Refresh tokens are presented once per access token lifetime; not
+    # worth a slot
+    if payload.get("type") == "access" and "exp" in payload:
+        token_cache.set(digest, payload)
+    return payload
+
 
+def revoke_token(token: str) -> Optional[Tuple[bytes, float]]:
+    """
+    Reject a token for the rest of its lifetime on this worker.
+    
+    Returns the token's digest and expiry to pass on to other workers, or
+    None if it was not valid anyway.
+    """
+    claims = decode_token(token)
+    if claims is None or "exp" not in claims:
+        return None
+    digest = token_cache.digest(token)
+    expires_at = float(claims["exp"])
+    token_cache.revoke(digest, expires_at)
+    return digest, expires_at
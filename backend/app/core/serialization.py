@@ -0,0 +1,21 @@
+"""Helpers for encoding query rows straight to JSON."""
+
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy.engine import Row
+
+
+def rows_as_dicts(rows: Sequence[Row], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Turn result rows into plain dicts holding only ``fields``.
+    
+    The dicts go to orjson as they are (it encodes enums and datetimes
+    natively), so no Pydantic model is built per row.
+    """
+    if not rows:
+        return []
+    positions = [rows[0]._fields.index(field) for field in fields]
+    return [
+        {field: row[position] for field, position in zip(fields, positions)}
+        for row in rows
+    ]
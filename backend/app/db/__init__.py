@@ -0,0 +1 @@
+"""Database objects managed outside the ORM models."""
@@ -0,0 +1,371 @@
+"""
+Raw DDL for the search, change feed and analytics objects.
+
+Triggers, trigger functions and the search structures have no ORM
+representation, so each is written once here: the Alembic migrations
+execute these builders, and the hooks at the bottom create the same objects
+under ``Base.metadata.create_all`` in development and tests.
+"""
+
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import DDL, Table, event, literal_column
+
+from app.core.events import TASK_CHANGES_CHANNEL, USER_CHANGES_CHANNEL
+from app.models.task import Task, TaskStatus
+from app.models.user import User
+
+
+def status_is(status: TaskStatus, column: str = "status") -> str:
+    """SQL testing ``column`` for ``status`` as the status column stores it.
+    
+    For raw DDL (triggers, migrations) that can't take a bound parameter.
+    """
+    clause = literal_column(column, Task.__table__.c.status.type) == status
+    return str(clause.compile(compile_kwargs={"literal_binds": True}))
+
+
+# Search infrastructure (see app/services/search_service.py)
+def search_ddl(dialect: str) -> List[str]:
+    """Generated tsvector and trigram indexes, or an FTS5 table and its triggers."""
+    if dialect == "postgresql":
+        return [
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+            ") STORED",
+            "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING gin (search_vector)",
+            # Trigram indexes make ILIKE '%term%' substring matches indexable
+            "CREATE INDEX IF NOT EXISTS ix_tasks_title_trgm "
+            "ON tasks USING gin (title gin_trgm_ops)",
+            "CREATE INDEX IF NOT EXISTS ix_tasks_description_trgm "
+            "ON tasks USING gin (description gin_trgm_ops)",
+        ]
+    return [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+        "title, description, content='tasks', content_rowid='id', tokenize='trigram')",
+        "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+        "INSERT INTO tasks_fts(rowid, title, description) "
+        "VALUES (new.id, new.title, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+        "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); END",
+        "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description "
+        "ON tasks BEGIN "
+        "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO tasks_fts(rowid, title, description) "
+        "VALUES (new.id, new.title, new.description); END",
+    ]
+
+
+# Tombstones for deleted tasks. The deleting transaction has already bumped
+# the owner's task_version, so the trigger stamps the tombstone with it.
+def tombstone_ddl(dialect: str) -> List[str]:
+    """Trigger recording a tombstone for every deleted task."""
+    if dialect == "postgresql":
+        return [
+            "CREATE OR REPLACE FUNCTION record_task_tombstone() RETURNS trigger AS $$ "
+            "BEGIN "
+            "INSERT INTO task_tombstones (task_id, owner_id, change_seq, deleted_at) "
+            "SELECT OLD.id, OLD.owner_id, users.task_version, timezone('utc', now()) "
+            "FROM users WHERE users.id = OLD.owner_id; "
+            "RETURN OLD; "
+            "END; $$ LANGUAGE plpgsql",
+            "CREATE TRIGGER tasks_tombstone AFTER DELETE ON tasks "
+            "FOR EACH ROW EXECUTE FUNCTION record_task_tombstone()",
+        ]
+    return [
+        "CREATE TRIGGER IF NOT EXISTS tasks_tombstone AFTER DELETE ON tasks BEGIN "
+        "INSERT INTO task_tombstones (task_id, owner_id, change_seq, deleted_at) "
+        "SELECT old.id, old.owner_id, users.task_version, CURRENT_TIMESTAMP "
+        "FROM users WHERE users.id = old.owner_id; END",
+    ]
+
+
+# Every task version bump is announced to the stream relays of all workers.
+# Postgres delivers notifications at commit and drops them on rollback; other
+# databases run a single worker that publishes its own writes.
+def task_notify_ddl(dialect: str) -> List[str]:
+    """Trigger notifying TASK_CHANGES_CHANNEL of task version bumps."""
+    if dialect != "postgresql":
+        return []
+    return [
+        "CREATE OR REPLACE FUNCTION notify_task_change() RETURNS trigger AS $$ "
+        "BEGIN "
+        f"PERFORM pg_notify('{TASK_CHANGES_CHANNEL}', NEW.id || ':' || NEW.task_version); "
+        "RETURN NULL; "
+        "END; $$ LANGUAGE plpgsql",
+        "CREATE TRIGGER users_task_change_notify AFTER UPDATE OF task_version ON users "
+        "FOR EACH ROW WHEN (NEW.task_version IS DISTINCT FROM OLD.task_version) "
+        "EXECUTE FUNCTION notify_task_change()",
+    ]
+
+
+# Changes to a user's principal fields reach the principal caches of all
+# workers the same way.
+def user_notify_ddl(dialect: str) -> List[str]:
+    """Trigger notifying USER_CHANGES_CHANNEL of principal changes and deletes."""
+    if dialect != "postgresql":
+        return []
+    return [
+        "CREATE OR REPLACE FUNCTION notify_user_change() RETURNS trigger AS $$ "
+        "BEGIN "
+        f"PERFORM pg_notify('{USER_CHANGES_CHANNEL}', OLD.id::text); "
+        "RETURN NULL; "
+        "END; $$ LANGUAGE plpgsql",
+        "CREATE TRIGGER users_principal_notify "
+        "AFTER UPDATE OF email, full_name, is_active OR DELETE ON users "
+        "FOR EACH ROW EXECUTE FUNCTION notify_user_change()",
+    ]
+
+
+# Per-user counts for analytics. Postgres applies each statement's changes
+# at once through transition tables, so a bulk write or import touches each
+# counter row once; SQLite applies them row by row.
+TASK_STATS_UPSERT = (
+    "INSERT INTO user_task_stats (owner_id, status, priority, task_count) "
+    "{rows} "
+    "ON CONFLICT (owner_id, status, priority) "
+    "DO UPDATE SET task_count = user_task_stats.task_count + excluded.task_count"
+)
+
+
+def task_stats_ddl(dialect: str) -> List[str]:
+    """Triggers keeping user_task_stats in step with tasks."""
+    if dialect == "postgresql":
+        return [
+            "CREATE OR REPLACE FUNCTION apply_task_stats() RETURNS trigger AS $$ "
+            "BEGIN "
+            "IF TG_OP = 'INSERT' THEN "
+            + TASK_STATS_UPSERT.format(
+                rows="SELECT owner_id, status, priority, count(*) FROM new_rows "
+                "GROUP BY owner_id, status, priority"
+            ) + "; "
+            "ELSIF TG_OP = 'DELETE' THEN "
+            + TASK_STATS_UPSERT.format(
+                rows="SELECT owner_id, status, priority, -count(*) FROM old_rows "
+                "GROUP BY owner_id, status, priority"
+            ) + "; "
+            "ELSE "
+            + TASK_STATS_UPSERT.format(
+                rows="SELECT owner_id, status, priority, sum(delta) FROM ("
+                "SELECT owner_id, status, priority, -1 AS delta FROM old_rows "
+                "UNION ALL SELECT owner_id, status, priority, 1 FROM new_rows"
+                ") changes GROUP BY owner_id, status, priority HAVING sum(delta) <> 0"
+            ) + "; "
+            "END IF; "
+            "RETURN NULL; "
+            "END; $$ LANGUAGE plpgsql",
+            "CREATE TRIGGER tasks_stats_insert AFTER INSERT ON tasks "
+            "REFERENCING NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_task_stats()",
+            # Transition tables rule out a column list; rows whose counted
+            # columns didn't change cancel out in the HAVING above
+            "CREATE TRIGGER tasks_stats_update AFTER UPDATE ON tasks "
+            "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_task_stats()",
+            "CREATE TRIGGER tasks_stats_delete AFTER DELETE ON tasks "
+            "REFERENCING OLD TABLE AS old_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_task_stats()",
+        ]
+    return [
+        "CREATE TRIGGER IF NOT EXISTS tasks_stats_insert AFTER INSERT ON tasks BEGIN "
+        + TASK_STATS_UPSERT.format(rows="VALUES (new.owner_id, new.status, new.priority, 1)")
+        + "; END",
+        "CREATE TRIGGER IF NOT EXISTS tasks_stats_update "
+        "AFTER UPDATE OF owner_id, status, priority ON tasks "
+        "WHEN old.owner_id IS NOT new.owner_id OR old.status IS NOT new.status "
+        "OR old.priority IS NOT new.priority BEGIN "
+        "UPDATE user_task_stats SET task_count = task_count - 1 "
+        "WHERE owner_id = old.owner_id AND status = old.status AND priority = old.priority; "
+        + TASK_STATS_UPSERT.format(rows="VALUES (new.owner_id, new.status, new.priority, 1)")
+        + "; END",
+        "CREATE TRIGGER IF NOT EXISTS tasks_stats_delete AFTER DELETE ON tasks BEGIN "
+        "UPDATE user_task_stats SET task_count = task_count - 1 "
+        "WHERE owner_id = old.owner_id AND status = old.status AND priority = old.priority; "
+        "END",
+    ]
+
+
+# Daily rollup. Each task contributes to up to four (day, counter) cells;
+# writes subtract the old row's contributions and add the new row's.
+ROLLUP_COUNTERS = ("created_count", "completed_count", "due_count", "resolved_count")
+
+# Completion day of a task and the condition for having one: completed_at
+# since migration 010, the updated_at of done tasks before it
+COMPLETED_AT: Tuple[str, str] = ("completed_at", "completed_at IS NOT NULL")
+UPDATED_AT: Tuple[str, str] = ("updated_at", status_is(TaskStatus.DONE))
+
+
+def task_rollup_contributions(
+    dialect: str, rows: str, sign: int = 1, completion: Tuple[str, str] = COMPLETED_AT
+) -> str:
+    """SQL selecting the rollup contributions (times ``sign``) of ``rows``."""
+    if dialect == "postgresql":
+        day, later = "CAST({} AS date)", "GREATEST({}, {})"
+    else:
+        day, later = "date({})", "max({}, {})"
+    completed, done = completion
+    return " UNION ALL ".join([
+        f"SELECT owner_id, {day.format('created_at')} AS day, {sign} AS created_count, "
+        f"0 AS completed_count, 0 AS due_count, 0 AS resolved_count FROM {rows}",
+        f"SELECT owner_id, {day.format(completed)}, 0, {sign}, 0, 0 FROM {rows} "
+        f"WHERE {done}",
+        f"SELECT owner_id, {day.format('due_date')}, 0, 0, {sign}, 0 FROM {rows} "
+        f"WHERE due_date IS NOT NULL",
+        f"SELECT owner_id, {later.format(day.format('due_date'), day.format(completed))}, "
+        f"0, 0, 0, {sign} FROM {rows} WHERE {done} AND due_date IS NOT NULL",
+    ])
+
+
+def task_rollup_upsert(contributions: str) -> str:
+    """SQL adding summed ``contributions`` to task_daily_rollup."""
+    sums = ", ".join(f"sum({counter})" for counter in ROLLUP_COUNTERS)
+    return (
+        f"INSERT INTO task_daily_rollup (owner_id, day, {', '.join(ROLLUP_COUNTERS)}) "
+        f"SELECT owner_id, day, {sums} FROM ({contributions}) contributions "
+        "GROUP BY owner_id, day "
+        f"HAVING {' OR '.join(f'sum({counter}) <> 0' for counter in ROLLUP_COUNTERS)} "
+        "ON CONFLICT (owner_id, day) DO UPDATE SET "
+        + ", ".join(
+            f"{counter} = task_daily_rollup.{counter} + excluded.{counter}"
+            for counter in ROLLUP_COUNTERS
+        )
+    )
+
+
+def task_rollup_ddl(dialect: str, completion: Tuple[str, str] = COMPLETED_AT) -> List[str]:
+    """Triggers keeping task_daily_rollup in step with tasks."""
+    if completion == COMPLETED_AT:
+        columns = ("owner_id", "created_at", "completed_at", "due_date")
+        changed = " OR ".join(f"old.{column} IS NOT new.{column}" for column in columns)
+    else:
+        # A done task's completion day moves with its updated_at
+        columns = ("owner_id", "status", "created_at", "updated_at", "due_date")
+        changed = " OR ".join(
+            f"old.{column} IS NOT new.{column}" for column in columns if column != "updated_at"
+        ) + (
+            f" OR ({status_is(TaskStatus.DONE, 'new.status')} "
+            "AND date(old.updated_at) IS NOT date(new.updated_at))"
+        )
+    
+    if dialect == "postgresql":
+        def contributions(rows: str, sign: int = 1) -> str:
+            return task_rollup_contributions(dialect, rows, sign, completion)
+        
+        return [
+            "CREATE OR REPLACE FUNCTION apply_task_rollup() RETURNS trigger AS $$ "
+            "BEGIN "
+            "IF TG_OP = 'INSERT' THEN "
+            + task_rollup_upsert(contributions("new_rows")) + "; "
+            "ELSIF TG_OP = 'DELETE' THEN "
+            + task_rollup_upsert(contributions("old_rows", -1)) + "; "
+            "ELSE "
+            + task_rollup_upsert(
+                contributions("old_rows", -1) + " UNION ALL " + contributions("new_rows")
+            ) + "; "
+            "END IF; "
+            "RETURN NULL; "
+            "END; $$ LANGUAGE plpgsql",
+            "CREATE TRIGGER tasks_rollup_insert AFTER INSERT ON tasks "
+            "REFERENCING NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_task_rollup()",
+            # No column list with transition tables; unchanged rows cancel
+            # out in task_rollup_upsert's HAVING
+            "CREATE TRIGGER tasks_rollup_update AFTER UPDATE ON tasks "
+            "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_task_rollup()",
+            "CREATE TRIGGER tasks_rollup_delete AFTER DELETE ON tasks "
+            "REFERENCING OLD TABLE AS old_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_task_rollup()",
+        ]
+    
+    # The changed row's columns as a one-row table
+    def contributions(row: str, sign: int = 1) -> str:
+        selected = ", ".join(f"{row}.{column} AS {column}" for column in columns)
+        return task_rollup_contributions(
+            dialect, f"(SELECT {selected}) AS {row}_task", sign, completion
+        )
+    
+    return [
+        "CREATE TRIGGER IF NOT EXISTS tasks_rollup_insert AFTER INSERT ON tasks BEGIN "
+        + task_rollup_upsert(contributions("new")) + "; END",
+        "CREATE TRIGGER IF NOT EXISTS tasks_rollup_update "
+        f"AFTER UPDATE OF {', '.join(columns)} ON tasks WHEN {changed} BEGIN "
+        + task_rollup_upsert(
+            contributions("old", -1) + " UNION ALL " + contributions("new")
+        ) + "; END",
+        "CREATE TRIGGER IF NOT EXISTS tasks_rollup_delete AFTER DELETE ON tasks BEGIN "
+        + task_rollup_upsert(contributions("old", -1)) + "; END",
+    ]
+
+
+# Status change log. Creation and update times are the ones the application
+# stamps on the task, so events line up with created_at and completed_at.
+STATUS_EVENT_INSERT = (
+    "INSERT INTO task_status_events (task_id, owner_id, from_status, to_status, changed_at) "
+)
+
+
+def status_event_ddl(dialect: str) -> List[str]:
+    """Triggers logging task creation and every status change."""
+    if dialect == "postgresql":
+        return [
+            "CREATE OR REPLACE FUNCTION record_task_status_event() RETURNS trigger AS $$ "
+            "BEGIN "
+            "IF TG_OP = 'INSERT' THEN "
+            + STATUS_EVENT_INSERT
+            + "VALUES (NEW.id, NEW.owner_id, NULL, NEW.status, NEW.created_at); "
+            "ELSE "
+            + STATUS_EVENT_INSERT
+            + "VALUES (NEW.id, NEW.owner_id, OLD.status, NEW.status, NEW.updated_at); "
+            "END IF; "
+            "RETURN NULL; "
+            "END; $$ LANGUAGE plpgsql",
+            "CREATE TRIGGER tasks_status_event_insert AFTER INSERT ON tasks "
+            "FOR EACH ROW EXECUTE FUNCTION record_task_status_event()",
+            "CREATE TRIGGER tasks_status_event_update AFTER UPDATE OF status ON tasks "
+            "FOR EACH ROW WHEN (OLD.status IS DISTINCT FROM NEW.status) "
+            "EXECUTE FUNCTION record_task_status_event()",
+        ]
+    return [
+        "CREATE TRIGGER IF NOT EXISTS tasks_status_event_insert AFTER INSERT ON tasks BEGIN "
+        + STATUS_EVENT_INSERT
+        + "VALUES (new.id, new.owner_id, NULL, new.status, new.created_at); END",
+        "CREATE TRIGGER IF NOT EXISTS tasks_status_event_update AFTER UPDATE OF status ON tasks "
+        "WHEN old.status IS NOT new.status BEGIN "
+        + STATUS_EVENT_INSERT
+        + "VALUES (new.id, new.owner_id, old.status, new.status, new.updated_at); END",
+    ]
+
+
+def _attach(
+    table: Table, build: Callable[[str], List[str]], function: Optional[str] = None
+) -> None:
+    """Create ``build``'s objects along with ``table`` (and drop its trigger function)."""
+    for dialect in ("postgresql", "sqlite"):
+        for statement in build(dialect):
+            event.listen(table, "after_create", DDL(statement).execute_if(dialect=dialect))
+    if function is not None:
+        event.listen(
+            table,
+            "after_drop",
+            DDL(f"DROP FUNCTION IF EXISTS {function}()").execute_if(dialect="postgresql")
+        )
+
+
+_attach(Task.__table__, search_ddl)
+event.listen(
+    Task.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite")
+)
+_attach(Task.__table__, tombstone_ddl, "record_task_tombstone")
+_attach(Task.__table__, task_stats_ddl, "apply_task_stats")
+_attach(Task.__table__, task_rollup_ddl, "apply_task_rollup")
+_attach(Task.__table__, status_event_ddl, "record_task_status_event")
+_attach(User.__table__, task_notify_ddl, "notify_task_change")
+_attach(User.__table__, user_notify_ddl, "notify_user_change")
@@ -6,8 +6,13 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routers import api_router
+from app.core.cache import cache_stats
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import (
+    Base, async_engine, async_replica_engines, engine, replica_engines
+)
+from app.core.events import PostgresNotifyRelay
+from app.core.security import token_cache
 
 
 @asynccontextmanager
@@ -16,8 +21,21 @@ async def lifespan(app: FastAPI):
     # Startup: Create database tables (for development)
     # In production, use Alembic migrations
     Base.metadata.create_all(bind=engine)
+    # Fan task changes out across workers
+    relay = None
+    if settings.TASK_STREAM_RELAY and engine.dialect.name == "postgresql":
+        relay = PostgresNotifyRelay(settings.DATABASE_URL)
+        relay.start()
     yield
-    # Shutdown: Clean up resources if needed
+    # Shutdown: Stop the relay and release pooled connections
+    if relay is not None:
+        await relay.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
+    for replica in replica_engines:
+        replica.dispose()
 
 
 app = FastAPI(
@@ -58,3 +76,9 @@ def health_check():
     """Health check endpoint for container orchestration."""
     return {"status": "healthy"}
 
+
+@app.get("/health/cache", tags=["Health"])
+def cache_health():
+    """Hit, miss and eviction counters of this worker's caches."""
+    return {**cache_stats(), "tokens": token_cache.stats()}
+
@@ -1,7 +1,26 @@
 """Database models."""
 
 from app.models.user import User
-from app.models.task import Task, TaskStatus, TaskPriority
+from app.models.task import (
+    Task,
+    TaskDailyRollup,
+    TaskPriority,
+    TaskStatus,
+    TaskStatusEvent,
+    TaskTombstone,
+    UserTaskStats,
+)
+# Attaches the trigger and search DDL to the tables for create_all
+from app.db import ddl  # noqa: F401
 
-__all__ = ["User", "Task", "TaskStatus", "TaskPriority"]
+__all__ = [
+    "User",
+    "Task",
+    "TaskStatus",
+    "TaskPriority",
+    "TaskTombstone",
+    "UserTaskStats",
+    "TaskDailyRollup",
+    "TaskStatusEvent",
+]
 
@@ -1,10 +1,12 @@
 """Task database model."""
 
 import enum
-from datetime import datetime
+from datetime import date, datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import String, Text, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import (
+    Date, Integer, String, Text, DateTime, ForeignKey, Index, Enum as SQLEnum
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -27,6 +29,13 @@ class TaskPriority(str, enum.Enum):
     HIGH = "high"
 
 
+def _default_completed_at(context) -> Optional[datetime]:
+    """Stamp tasks inserted as done (updates set it in TaskService)."""
+    if context.get_current_parameters().get("status") == TaskStatus.DONE:
+        return datetime.utcnow()
+    return None
+
+
 class Task(Base):
     """Task model for managing user tasks."""
     
@@ -48,10 +57,24 @@ class Task(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
+    # When the task last became done; None while it is not done
+    completed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, default=_default_completed_at, nullable=True
+    )
+    
+    # Incremented by every update; clients send it back in If-Match
+    version: Mapped[int] = mapped_column(
+        Integer, default=1, server_default="1", nullable=False
+    )
+    
+    # Owner's task_version at the task's last write (drives the change feed)
+    change_seq: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
     
     # Foreign keys
     owner_id: Mapped[int] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     
     # Relationships
@@ -60,3 +83,122 @@ class Task(Base):
     def __repr__(self) -> str:
         return f"<Task(id={self.id}, title={self.title}, status={self.status})>"
 
+
+class TaskTombstone(Base):
+    """
+    Record of a deleted task for the change feed.
+    
+    Rows are written by a database trigger on ``tasks`` deletes, so every
+    delete path is covered. There is no foreign key to ``users``: deleting a
+    user cascades to their tasks, and those deletes must not be blocked.
+    """
+    
+    __tablename__ = "task_tombstones"
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    task_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    owner_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    change_seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+
+class TaskStatusEvent(Base):
+    """
+    Append-only log of task status changes, including the initial status.
+    
+    Written by triggers on ``tasks`` for every write path; cycle time is
+    measured from a task's first move to in progress. Like tombstones,
+    rows have no foreign keys and outlive their task.
+    """
+    
+    __tablename__ = "task_status_events"
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    task_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    owner_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # None for the status a task was created with
+    from_status: Mapped[Optional[TaskStatus]] = mapped_column(
+        SQLEnum(TaskStatus), nullable=True
+    )
+    to_status: Mapped[TaskStatus] = mapped_column(SQLEnum(TaskStatus), nullable=False)
+    changed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class UserTaskStats(Base):
+    """
+    Number of a user's tasks per (status, priority), for analytics.
+    
+    Maintained by database triggers on ``tasks`` in the writing transaction,
+    so every write path (bulk, import, cascades) keeps it exact. Like
+    tombstones, rows have no foreign key to ``users``. Rebuild and check it
+    with ``scripts/reconcile_task_stats.py``.
+    """
+    
+    __tablename__ = "user_task_stats"
+    
+    owner_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    status: Mapped[TaskStatus] = mapped_column(SQLEnum(TaskStatus), primary_key=True)
+    priority: Mapped[TaskPriority] = mapped_column(SQLEnum(TaskPriority), primary_key=True)
+    task_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class TaskDailyRollup(Base):
+    """
+    A user's task activity per UTC day, for the analytics time series.
+    
+    Counts tasks by created day, by completion day (``completed_at``), by
+    due day, and by the day a done task stopped counting as overdue (the
+    later of its due and completion days), so overdue on a day is a running
+    sum of ``due_count - resolved_count``. Maintained by triggers on
+    ``tasks`` like UserTaskStats; rebuilt by ``scripts/backfill_task_rollup.py``.
+    """
+    
+    __tablename__ = "task_daily_rollup"
+    
+    owner_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    created_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    due_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    resolved_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# Composite indexes matching the task list and analytics query shapes.
+# Every query is scoped by owner_id, so it leads each index.
+Index(
+    "ix_tasks_owner_id_created_at",
+    Task.owner_id,
+    Task.created_at.desc(),
+    Task.id.desc(),
+)
+Index(
+    "ix_tasks_owner_id_status_priority",
+    Task.owner_id,
+    Task.status,
+    Task.priority,
+)
+Index(
+    "ix_tasks_owner_id_due_date_open",
+    Task.owner_id,
+    Task.due_date,
+    postgresql_where=Task.status != TaskStatus.DONE,
+    sqlite_where=Task.status != TaskStatus.DONE,
+)
+Index("ix_tasks_owner_id_completed_at", Task.owner_id, Task.completed_at)
+# Change feed: everything a user changed after a given sequence number
+Index("ix_tasks_owner_id_change_seq", Task.owner_id, Task.change_seq, Task.id)
+Index(
+    "ix_task_tombstones_owner_id_change_seq",
+    TaskTombstone.owner_id,
+    TaskTombstone.change_seq,
+    TaskTombstone.task_id,
+)
+# Cycle time: a task's first move to a status
+Index(
+    "ix_task_status_events_task_id_to_status",
+    TaskStatusEvent.task_id,
+    TaskStatusEvent.to_status,
+    TaskStatusEvent.changed_at,
+)
@@ -3,10 +3,11 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, List
 
-from sqlalchemy import String, DateTime
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, DateTime, Integer, event
+from sqlalchemy.orm import Mapped, mapped_column, object_session, relationship
 
 from app.core.database import Base
+from app.core.events import record_user_change
 
 if TYPE_CHECKING:
     from app.models.task import Task
@@ -27,6 +28,10 @@ class User(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, nullable=False
     )
+    # Incremented by every write to the user's tasks (drives task ETags)
+    task_version: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
     
     # Relationships
     tasks: Mapped[List["Task"]] = relationship(
@@ -36,3 +41,11 @@ class User(Base):
     def __repr__(self) -> str:
         return f"<User(id={self.id}, email={self.email})>"
 
+
+# Any ORM change to a user (e.g. deactivation) drops their cached principal
+# once committed. Core UPDATEs such as task version bumps don't; they touch
+# no principal field.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal(mapper, connection, target: User) -> None:
+    record_user_change(object_session(target), target.id)
@@ -1,5 +1,9 @@
 """Analytics-related Pydantic schemas."""
 
+import enum
+from datetime import date
+from typing import List, Optional
+
 from pydantic import BaseModel
 
 
@@ -15,3 +19,52 @@ class AnalyticsSummary(BaseModel):
     high_priority_pending: int
     completion_rate: float
 
+
+class TimeseriesMetric(str, enum.Enum):
+    """Task figures available as a time series."""
+    CREATED = "created"
+    COMPLETED = "completed"
+    # Open tasks past their due date at the end of each day
+    OVERDUE = "overdue"
+
+
+class TimeseriesGranularity(str, enum.Enum):
+    """Bucket size of a time series (weeks start on Monday)."""
+    DAY = "day"
+    WEEK = "week"
+
+
+class TimeseriesPoint(BaseModel):
+    """Value of one bucket, dated by its first day."""
+    
+    date: date
+    value: int
+
+
+class AnalyticsTimeseries(BaseModel):
+    """Schema for a time series response, with one point per bucket."""
+    
+    metric: TimeseriesMetric
+    granularity: TimeseriesGranularity
+    start: date
+    end: date
+    points: List[TimeseriesPoint]
+
+
+class DurationMetric(str, enum.Enum):
+    """Task durations available as distributions."""
+    # From creation to completion
+    LEAD_TIME = "lead_time"
+    # From the first move to in progress to completion
+    CYCLE_TIME = "cycle_time"
+
+
+class DurationPercentiles(BaseModel):
+    """Duration percentiles in seconds over tasks completed in the last ``days`` days."""
+    
+    metric: DurationMetric
+    days: int
+    count: int
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
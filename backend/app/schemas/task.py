@@ -1,13 +1,22 @@
 """Task-related Pydantic schemas."""
 
+import enum
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
+from app.core.config import settings
 from app.models.task import TaskStatus, TaskPriority
 
 
+class TotalMode(str, enum.Enum):
+    """How the total of a task list is computed."""
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
 class TaskBase(BaseModel):
     """Base task schema with common fields."""
     
@@ -31,6 +40,14 @@ class TaskUpdate(BaseModel):
     status: Optional[TaskStatus] = None
     priority: Optional[TaskPriority] = None
     due_date: Optional[datetime] = None
+    
+    @field_validator("title", "status", "priority")
+    @classmethod
+    def not_null(cls, value: Any) -> Any:
+        # Omit these to leave them unchanged; the columns can't be cleared
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
 
 
 class TaskResponse(TaskBase):
@@ -40,6 +57,8 @@ class TaskResponse(TaskBase):
     owner_id: int
     created_at: datetime
     updated_at: datetime
+    completed_at: Optional[datetime] = None
+    version: int
     
     class Config:
         from_attributes = True
@@ -49,10 +68,168 @@ class TaskListResponse(BaseModel):
     """Schema for paginated task list response."""
     
     items: List[TaskResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+
+
+class TaskChange(TaskResponse):
+    """Task plus its version, the ``base_seq`` to send with offline edits."""
+    
+    change_seq: int
+
+
+class TaskChangesResponse(BaseModel):
+    """Schema for a page of the task change feed."""
+    
+    changes: List[TaskChange]
+    deleted: List[int]
+    next_since: str
+    has_more: bool = False
+
+
+# Fields selectable with the ``fields`` query parameter, in response order
+TASK_FIELDS = tuple(TaskResponse.model_fields)
+# Fields of change feed entries
+TASK_CHANGE_FIELDS = tuple(TaskChange.model_fields)
+
+
+class TaskBulkCreate(BaseModel):
+    """Schema for creating many tasks in one request.
+    
+    Items are validated one by one against ``TaskCreate`` so that invalid
+    items are reported individually instead of rejecting the whole batch.
+    """
+    
+    items: List[Any] = Field(..., min_length=1, max_length=settings.TASK_BULK_MAX_ITEMS)
+
+
+class TaskBulkUpdate(BaseModel):
+    """Schema for updating many tasks in one request.
+    
+    Each item carries the task ``id`` plus the ``TaskUpdate`` fields to change.
+    """
+    
+    items: List[Any] = Field(..., min_length=1, max_length=settings.TASK_BULK_MAX_ITEMS)
+
+
+class TaskBulkDelete(BaseModel):
+    """Schema for deleting many tasks in one request."""
+    
+    ids: List[int] = Field(..., min_length=1, max_length=settings.TASK_BULK_MAX_ITEMS)
+
+
+class SyncPolicy(str, enum.Enum):
+    """How a sync push resolves edits to tasks changed on the server."""
+    REJECT = "reject"
+    LAST_WRITER_WINS = "lww"
+
+
+class SyncOperationType(str, enum.Enum):
+    """Kinds of queued offline edits."""
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class SyncStatus(str, enum.Enum):
+    """Outcome of a sync operation."""
+    APPLIED = "applied"
+    CONFLICT = "conflict"
+    ERROR = "error"
+
+
+class TaskSyncOperation(BaseModel):
+    """A single queued offline edit.
+    
+    Updates and deletes carry ``base_seq``, the ``change_seq`` of the task
+    as the client last saw it. Updates send only the fields that were
+    edited in ``data``, and in ``base`` the values those fields had at
+    ``base_seq``, so edits to other fields on the server don't conflict;
+    creates send ``TaskCreate`` fields.
+    """
+    
+    op: SyncOperationType
+    id: Optional[int] = None
+    client_id: Optional[str] = Field(None, max_length=64)
+    base_seq: Optional[int] = None
+    modified_at: Optional[datetime] = None
+    data: Dict[str, Any] = Field(default_factory=dict)
+    base: Dict[str, Any] = Field(default_factory=dict)
+
+
+class TaskSyncRequest(BaseModel):
+    """Schema for pushing a batch of offline edits.
+    
+    Operations are validated one by one so that invalid ones are reported
+    individually instead of rejecting the whole batch.
+    """
+    
+    policy: SyncPolicy = SyncPolicy.REJECT
+    operations: List[Any] = Field(
+        ..., min_length=1, max_length=settings.TASK_BULK_MAX_ITEMS
+    )
+
+
+class TaskSyncResult(BaseModel):
+    """Outcome of a single operation of a sync push."""
+    
+    index: int
+    op: Optional[SyncOperationType] = None
+    id: Optional[int] = None
+    client_id: Optional[str] = None
+    status: SyncStatus
+    error: Optional[str] = None
+    task: Optional[TaskChange] = None
+    # Server values of the edited fields that conflicted and were kept
+    conflicts: Optional[Dict[str, Any]] = None
+
+
+class TaskSyncResponse(BaseModel):
+    """Schema for sync push responses, one result per submitted operation."""
+    
+    results: List[TaskSyncResult]
+    applied: int
+    conflicts: int
+    failed: int
+
+
+class TaskBulkItemResult(BaseModel):
+    """Outcome of a single item of a bulk request."""
+    
+    index: int
+    id: Optional[int] = None
+    status_code: int
+    error: Optional[str] = None
+    task: Optional[TaskResponse] = None
+
+
+class TaskBulkResponse(BaseModel):
+    """Schema for bulk request responses, one result per submitted item."""
+    
+    results: List[TaskBulkItemResult]
+    succeeded: int
+    failed: int
+
+
+class TaskImportError(BaseModel):
+    """A row of an import file that could not be imported."""
+    
+    line: int
+    error: str
+
+
+class TaskImportResult(BaseModel):
+    """Summary of a streamed task import."""
+    
+    imported: int
+    failed: int
+    chunks: int
+    errors: List[TaskImportError]
+    errors_truncated: bool = False
 
 
 class TaskFilters(BaseModel):
@@ -61,4 +238,3 @@ class TaskFilters(BaseModel):
     status: Optional[TaskStatus] = None
     priority: Optional[TaskPriority] = None
     search: Optional[str] = None
-
@@ -1,12 +1,154 @@
 """Analytics service for generating task statistics."""
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
 
-from sqlalchemy import func
+from sqlalchemy import and_, case, func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
 
-from app.models.task import Task, TaskStatus, TaskPriority
-from app.schemas.analytics import AnalyticsSummary
+from app.core.cache import ResultCache, create_backend
+from app.core.config import settings
+from app.core.database import SessionRunner, replica_read
+from app.core.exceptions import BadRequestException
+from app.models.task import (
+    Task, TaskDailyRollup, TaskStatus, TaskStatusEvent, TaskPriority, UserTaskStats
+)
+from app.models.user import User
+from app.schemas.analytics import (
+    AnalyticsSummary,
+    AnalyticsTimeseries,
+    DurationMetric,
+    DurationPercentiles,
+    TimeseriesGranularity,
+    TimeseriesMetric,
+    TimeseriesPoint,
+)
+
+
+# Condition a row must meet to count towards a metric, given the current
+# time (None counts every task)
+MetricCondition = Optional[Callable[[datetime], ColumnElement]]
+
+
+class MetricExpiry(NamedTuple):
+    """
+    When a time-dependent metric next changes without any write: the
+    earliest ``column`` of the user's tasks meeting ``condition`` (given the
+    current time), plus ``offset``.
+    """
+    
+    column: ColumnElement
+    condition: Callable[[datetime], ColumnElement]
+    offset: timedelta = timedelta(0)
+
+
+class Metric(NamedTuple):
+    """
+    A registered task count.
+    
+    Counter conditions filter user_task_stats rows by status and priority.
+    Time-dependent conditions change with the clock rather than with writes,
+    so they filter the user's tasks and need an index to count from.
+    """
+    
+    condition: MetricCondition
+    time_dependent: bool
+    # Caps how long a cached value of a time-dependent metric is kept
+    expiry: Optional[MetricExpiry] = None
+
+
+# Metric registry: name -> metric. All requested metrics are computed by one
+# statement reading the user's few user_task_stats rows, with a subquery per
+# time-dependent metric.
+METRICS: Dict[str, Metric] = {}
+
+
+def register_metric(
+    name: str,
+    condition: MetricCondition = None,
+    *,
+    time_dependent: bool = False,
+    expiry: Optional[MetricExpiry] = None
+) -> None:
+    """Make a task count available to AnalyticsService.get_metrics."""
+    METRICS[name] = Metric(condition, time_dependent, expiry)
+
+
+register_metric("total_tasks")
+register_metric("completed_tasks", lambda now: UserTaskStats.status == TaskStatus.DONE)
+register_metric("pending_tasks", lambda now: UserTaskStats.status == TaskStatus.TODO)
+register_metric(
+    "in_progress_tasks", lambda now: UserTaskStats.status == TaskStatus.IN_PROGRESS
+)
+register_metric(
+    "high_priority_pending",
+    lambda now: and_(
+        UserTaskStats.status != TaskStatus.DONE,
+        UserTaskStats.priority == TaskPriority.HIGH
+    )
+)
+# Not done and past due date (ix_tasks_owner_id_due_date_open)
+register_metric(
+    "overdue_tasks",
+    lambda now: and_(
+        Task.status != TaskStatus.DONE,
+        Task.due_date.isnot(None),
+        Task.due_date < now
+    ),
+    time_dependent=True,
+    # The next open task to fall due
+    expiry=MetricExpiry(
+        Task.due_date,
+        lambda now: and_(Task.status != TaskStatus.DONE, Task.due_date >= now)
+    )
+)
+# Done within the last week (ix_tasks_owner_id_completed_at)
+register_metric(
+    "completed_this_week",
+    lambda now: Task.completed_at >= now - timedelta(days=7),
+    time_dependent=True,
+    # The oldest completion of the week dropping out of it
+    expiry=MetricExpiry(
+        Task.completed_at,
+        lambda now: Task.completed_at >= now - timedelta(days=7),
+        timedelta(days=7)
+    )
+)
+
+# Counts reported by get_summary
+SUMMARY_METRICS = (
+    "total_tasks",
+    "completed_tasks",
+    "pending_tasks",
+    "in_progress_tasks",
+    "overdue_tasks",
+    "completed_this_week",
+    "high_priority_pending",
+)
+
+
+# Percentiles reported for task durations
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> Optional[float]:
+    """Linearly interpolated percentile of sorted values, as percentile_cont."""
+    if not ordered:
+        return None
+    position = fraction * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+# Metric results per user and selection, kept until the user's tasks change
+# or a time-dependent metric would change
+analytics_cache = ResultCache(
+    "analytics",
+    settings.ANALYTICS_CACHE_SIZE,
+    create_backend(settings.ANALYTICS_CACHE_URL)
+) if settings.ANALYTICS_CACHE_SIZE > 0 else None
 
 
 class AnalyticsService:
@@ -15,79 +157,305 @@ class AnalyticsService:
     def __init__(self, db: Session) -> None:
         self.db = db
     
-    def get_summary(self, user_id: int) -> AnalyticsSummary:
-        """Get analytics summary for a user's tasks."""
-        # Base query for user's tasks
-        base_query = self.db.query(Task).filter(Task.owner_id == user_id)
+    @replica_read
+    def get_metrics(
+        self,
+        user_id: int,
+        names: Optional[Sequence[str]] = None,
+        version: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Count the user's tasks for each requested metric (default: all).
         
-        # Total tasks
-        total_tasks = base_query.count()
+        Counters come from the user's user_task_stats rows (at most one
+        per status and priority), so their cost does not grow with the
+        number of tasks; only time-dependent metrics count tasks.
         
-        # Tasks by status
-        completed_tasks = (
-            base_query
-            .filter(Task.status == TaskStatus.DONE)
-            .count()
-        )
+        With the user's current task ``version``, results are served from
+        and stored in the analytics cache.
+        """
+        names = list(names or METRICS)
+        unknown = [name for name in names if name not in METRICS]
+        if unknown:
+            raise BadRequestException(f"Unknown metrics: {', '.join(unknown)}")
         
-        pending_tasks = (
-            base_query
-            .filter(Task.status == TaskStatus.TODO)
-            .count()
-        )
+        if version is None or analytics_cache is None:
+            return self._compute(user_id, names)[0]
         
-        in_progress_tasks = (
-            base_query
-            .filter(Task.status == TaskStatus.IN_PROGRESS)
-            .count()
-        )
+        key = ",".join(names)
+        metrics = analytics_cache.get(user_id, key, version)
+        if metrics is None:
+            metrics, computed_version, ttl = self._compute(user_id, names, for_cache=True)
+            analytics_cache.set(user_id, key, computed_version, metrics, ttl)
+        return dict(metrics)
+    
+    def _compute(
+        self, user_id: int, names: Sequence[str], for_cache: bool = False
+    ) -> Tuple[Dict[str, int], int, float]:
+        """
+        Run the metrics statement.
         
-        # Overdue tasks (not done and past due date)
+        For the cache it also reads, in the same snapshot, the task version
+        the counts belong to and how long they stay right (the default TTL,
+        capped at the next time a time-dependent metric changes).
+        """
         now = datetime.utcnow()
-        overdue_tasks = (
-            base_query
-            .filter(
-                Task.status != TaskStatus.DONE,
-                Task.due_date.isnot(None),
-                Task.due_date < now
+        dialect = self.db.get_bind().dialect.name
+        columns = [
+            self._aggregate(METRICS[name], user_id, now, dialect).label(name)
+            for name in names
+        ]
+        expiries = [
+            METRICS[name].expiry for name in names if METRICS[name].expiry is not None
+        ] if for_cache else []
+        if for_cache:
+            columns.append(
+                select(User.task_version).where(User.id == user_id)
+                .scalar_subquery().label("version")
             )
-            .count()
-        )
+            columns.extend(
+                select(func.min(expiry.column))
+                .where(Task.owner_id == user_id, expiry.condition(now))
+                .scalar_subquery().label(f"expiry_{index}")
+                for index, expiry in enumerate(expiries)
+            )
+        statement = select(*columns)
+        if not all(METRICS[name].time_dependent for name in names):
+            # Aggregating the stats rows always yields exactly one row
+            statement = statement.select_from(UserTaskStats).where(
+                UserTaskStats.owner_id == user_id
+            )
+        row = self.db.execute(statement).one()
         
-        # Completed this week
-        week_ago = now - timedelta(days=7)
-        completed_this_week = (
-            base_query
-            .filter(
-                Task.status == TaskStatus.DONE,
-                Task.updated_at >= week_ago
+        metrics = {name: row[index] for index, name in enumerate(names)}
+        if not for_cache:
+            return metrics, 0, 0
+        ttl = settings.ANALYTICS_CACHE_TTL_SECONDS
+        for expiry, earliest in zip(expiries, row[len(names) + 1:]):
+            if earliest is not None:
+                ttl = min(ttl, (earliest + expiry.offset - now).total_seconds())
+        return metrics, row.version, ttl
+    
+    @staticmethod
+    def _aggregate(
+        metric: Metric, user_id: int, now: datetime, dialect: str
+    ) -> ColumnElement:
+        """The value of ``metric`` as an expression over user_task_stats rows."""
+        if metric.time_dependent:
+            return (
+                select(func.count())
+                .select_from(Task)
+                .where(Task.owner_id == user_id, metric.condition(now))
+                .scalar_subquery()
             )
-            .count()
+        if metric.condition is None:
+            total = func.sum(UserTaskStats.task_count)
+        elif dialect == "postgresql":
+            total = func.sum(UserTaskStats.task_count).filter(metric.condition(now))
+        else:
+            total = func.sum(
+                case((metric.condition(now), UserTaskStats.task_count), else_=0)
+            )
+        # SUM is NULL over no rows, where a count is 0
+        return func.coalesce(total, 0)
+    
+    @replica_read
+    def get_summary(self, user_id: int, version: Optional[int] = None) -> AnalyticsSummary:
+        """Get analytics summary for a user's tasks (cached given ``version``)."""
+        metrics = self.get_metrics(user_id, SUMMARY_METRICS, version)
+        
+        # Completion rate
+        total_tasks = metrics["total_tasks"]
+        completion_rate = (
+            (metrics["completed_tasks"] / total_tasks * 100) if total_tasks > 0 else 0.0
         )
         
-        # High priority pending tasks
-        high_priority_pending = (
-            base_query
-            .filter(
-                Task.status != TaskStatus.DONE,
-                Task.priority == TaskPriority.HIGH
+        return AnalyticsSummary(**metrics, completion_rate=round(completion_rate, 1))
+    
+    @replica_read
+    def get_timeseries(
+        self,
+        user_id: int,
+        metric: TimeseriesMetric,
+        granularity: TimeseriesGranularity = TimeseriesGranularity.DAY,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> AnalyticsTimeseries:
+        """
+        Get ``metric`` per day or week from ``start`` to ``end`` (default: the
+        last ANALYTICS_TIMESERIES_DEFAULT_DAYS days, ending today in UTC).
+        
+        Reads the user's task_daily_rollup rows in the range (and, for
+        overdue, one sum of the rows before it) instead of the tasks, and
+        returns a point for every bucket, including empty ones. Weekly
+        series start on the Monday of ``start``'s week; weekly overdue is
+        the value on the last day of each week.
+        """
+        end = end or datetime.utcnow().date()
+        start = start or end - timedelta(days=settings.ANALYTICS_TIMESERIES_DEFAULT_DAYS - 1)
+        if granularity == TimeseriesGranularity.WEEK:
+            start -= timedelta(days=start.weekday())
+        if start > end:
+            raise BadRequestException("'from' must not be after 'to'")
+        if (end - start).days >= settings.ANALYTICS_TIMESERIES_MAX_DAYS:
+            raise BadRequestException(
+                f"Time series cover at most {settings.ANALYTICS_TIMESERIES_MAX_DAYS} days"
             )
-            .count()
+        
+        rollup = TaskDailyRollup
+        running = metric == TimeseriesMetric.OVERDUE
+        if metric == TimeseriesMetric.CREATED:
+            value = rollup.created_count
+        elif metric == TimeseriesMetric.COMPLETED:
+            value = rollup.completed_count
+        else:
+            value = rollup.due_count - rollup.resolved_count
+        
+        total = self.db.scalar(
+            select(func.coalesce(func.sum(value), 0))
+            .where(rollup.owner_id == user_id, rollup.day < start)
+        ) if running else 0
+        daily = dict(self.db.execute(
+            select(rollup.day, value)
+            .where(rollup.owner_id == user_id, rollup.day >= start, rollup.day <= end)
+        ).all())
+        
+        points: List[TimeseriesPoint] = []
+        day = start
+        while day <= end:
+            if running:
+                total += daily.get(day, 0)
+                day_value = total
+            else:
+                day_value = daily.get(day, 0)
+            bucket = day
+            if granularity == TimeseriesGranularity.WEEK:
+                bucket = day - timedelta(days=day.weekday())
+            if points and points[-1].date == bucket:
+                points[-1].value = day_value if running else points[-1].value + day_value
+            else:
+                points.append(TimeseriesPoint(date=bucket, value=day_value))
+            day += timedelta(days=1)
+        
+        return AnalyticsTimeseries(
+            metric=metric, granularity=granularity, start=start, end=end, points=points
         )
+    
+    @replica_read
+    def get_duration_percentiles(
+        self, user_id: int, metric: DurationMetric, days: int = 90
+    ) -> DurationPercentiles:
+        """
+        Get p50/p90/p99 of lead or cycle time over the tasks completed in
+        the last ``days`` days.
         
-        # Completion rate
-        completion_rate = (
-            (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0.0
+        Completed tasks are found through ix_tasks_owner_id_completed_at
+        and cycle starts through the status event index. Postgres computes
+        the percentiles with percentile_cont; other databases return the
+        sorted durations and interpolate the same way.
+        """
+        since = datetime.utcnow() - timedelta(days=days)
+        if metric == DurationMetric.LEAD_TIME:
+            started = Task.created_at
+        else:
+            started = (
+                select(func.min(TaskStatusEvent.changed_at))
+                .where(
+                    TaskStatusEvent.task_id == Task.id,
+                    TaskStatusEvent.to_status == TaskStatus.IN_PROGRESS,
+                    TaskStatusEvent.changed_at <= Task.completed_at
+                )
+                .correlate(Task)
+                .scalar_subquery()
+            )
+        
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            seconds = func.extract("epoch", Task.completed_at - started)
+        else:
+            seconds = (func.julianday(Task.completed_at) - func.julianday(started)) * 86400
+        durations = (
+            select(seconds.label("seconds"))
+            .where(Task.owner_id == user_id, Task.completed_at >= since)
+            .subquery()
         )
         
-        return AnalyticsSummary(
-            total_tasks=total_tasks,
-            completed_tasks=completed_tasks,
-            pending_tasks=pending_tasks,
-            in_progress_tasks=in_progress_tasks,
-            overdue_tasks=overdue_tasks,
-            completed_this_week=completed_this_week,
-            high_priority_pending=high_priority_pending,
-            completion_rate=round(completion_rate, 1)
+        if dialect == "postgresql":
+            count, *values = self.db.execute(
+                select(
+                    func.count(durations.c.seconds),
+                    *(
+                        func.percentile_cont(fraction).within_group(durations.c.seconds)
+                        for fraction in PERCENTILES.values()
+                    )
+                )
+            ).one()
+        else:
+            ordered = self.db.scalars(
+                select(durations.c.seconds)
+                .where(durations.c.seconds.isnot(None))
+                .order_by(durations.c.seconds)
+            ).all()
+            count = len(ordered)
+            values = [_percentile(ordered, fraction) for fraction in PERCENTILES.values()]
+        
+        return DurationPercentiles(
+            metric=metric,
+            days=days,
+            count=count,
+            **{
+                name: round(value, 3) if value is not None else None
+                for name, value in zip(PERCENTILES, values)
+            }
         )
 
+
+class AsyncAnalyticsService:
+    """Async facade over AnalyticsService for async handlers."""
+    
+    def __init__(self, db: SessionRunner) -> None:
+        self.db = db
+    
+    async def get_metrics(
+        self,
+        user_id: int,
+        names: Optional[Sequence[str]] = None,
+        version: Optional[int] = None
+    ) -> Dict[str, int]:
+        """Count the user's tasks for each requested metric."""
+        return await self.db.run(
+            lambda session: AnalyticsService(session).get_metrics(user_id, names, version)
+        )
+    
+    async def get_summary(
+        self, user_id: int, version: Optional[int] = None
+    ) -> AnalyticsSummary:
+        """Get analytics summary for a user's tasks."""
+        return await self.db.run(
+            lambda session: AnalyticsService(session).get_summary(user_id, version)
+        )
+    
+    async def get_timeseries(
+        self,
+        user_id: int,
+        metric: TimeseriesMetric,
+        granularity: TimeseriesGranularity = TimeseriesGranularity.DAY,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> AnalyticsTimeseries:
+        """Get a task metric per day or week."""
+        return await self.db.run(
+            lambda session: AnalyticsService(session).get_timeseries(
+                user_id, metric, granularity, start, end
+            )
+        )
+    
+    async def get_duration_percentiles(
+        self, user_id: int, metric: DurationMetric, days: int = 90
+    ) -> DurationPercentiles:
+        """Get lead or cycle time percentiles."""
+        return await self.db.run(
+            lambda session: AnalyticsService(session).get_duration_percentiles(
+                user_id, metric, days
+            )
+        )
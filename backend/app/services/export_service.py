@@ -0,0 +1,84 @@
+"""Encoders that turn streamed task rows into NDJSON or CSV chunks."""
+
+import csv
+import enum
+import io
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Sequence
+
+import orjson
+
+# Column order of exported rows (matches TaskService.EXPORT_COLUMNS)
+EXPORT_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "status",
+    "priority",
+    "due_date",
+    "created_at",
+    "updated_at",
+    "owner_id",
+)
+
+
+class ExportFormat(str, enum.Enum):
+    """Supported task export (and import) file formats."""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def _plain(value: Any) -> Any:
+    """Convert enum and datetime values to their CSV representation."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _batched(rows: Iterable[Sequence[Any]], batch_size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def encode_ndjson(rows: Iterable[Sequence[Any]], batch_size: int = 500) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON objects, one chunk per batch."""
+    for batch in _batched(rows, batch_size):
+        # orjson encodes enums and datetimes itself, so rows need no _plain()
+        yield b"".join(
+            orjson.dumps(dict(zip(EXPORT_FIELDS, row)), option=orjson.OPT_APPEND_NEWLINE)
+            for row in batch
+        )
+
+
+def encode_csv(rows: Iterable[Sequence[Any]], batch_size: int = 500) -> Iterator[str]:
+    """Encode rows as CSV with a header line, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue()
+    
+    for batch in _batched(rows, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_plain(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+
+
+ENCODERS = {
+    ExportFormat.NDJSON: encode_ndjson,
+    ExportFormat.CSV: encode_csv,
+}
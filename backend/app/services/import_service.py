@@ -0,0 +1,248 @@
+"""Streaming task import service."""
+
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import case, cast, column, func, insert, literal, select, table, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import BadRequestException
+from app.models.task import Task, TaskStatus
+from app.schemas.task import TaskCreate, TaskImportError, TaskImportResult
+from app.services.export_service import ExportFormat
+from app.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+# Columns loaded from an import file; everything else comes from defaults
+IMPORT_COLUMNS = ("title", "description", "status", "priority", "due_date")
+
+# Temporary table COPY loads into (Postgres)
+COPY_STAGING = table("task_import_staging", *(column(name) for name in IMPORT_COLUMNS))
+
+
+class TaskImportService:
+    """Service class for importing large task files."""
+    
+    def __init__(self, db: Session) -> None:
+        self.db = db
+    
+    def import_stream(
+        self,
+        stream: TextIO,
+        format: ExportFormat,
+        user_id: int,
+        chunk_size: Optional[int] = None
+    ) -> TaskImportResult:
+        """
+        Validate and load tasks from a text stream, one chunk at a time.
+        
+        Only a single chunk of rows is held in memory. Each chunk is
+        committed on its own, so a failure late in a file keeps the rows
+        already loaded. Invalid rows are skipped and reported by line.
+        """
+        chunk_size = chunk_size or settings.TASK_IMPORT_CHUNK_SIZE
+        records = self._read_ndjson(stream) if format == ExportFormat.NDJSON else (
+            self._read_csv(stream)
+        )
+        
+        imported = 0
+        failed = 0
+        chunks = 0
+        errors: List[TaskImportError] = []
+        
+        def record_error(line: int, error: Any) -> None:
+            nonlocal failed
+            failed += 1
+            if len(errors) < settings.TASK_IMPORT_MAX_REPORTED_ERRORS:
+                errors.append(TaskImportError(line=line, error=_format_error(error)))
+        
+        chunk: List[Dict[str, Any]] = []
+        last_line = 0
+        try:
+            for line, record in records:
+                last_line = line
+                if isinstance(record, Exception):
+                    record_error(line, record)
+                    continue
+                try:
+                    task_data = TaskCreate.model_validate(record)
+                except ValidationError as exc:
+                    record_error(line, exc)
+                    continue
+                row = task_data.model_dump(include=set(IMPORT_COLUMNS))
+                # Postgres text can't hold NUL, and one would fail the chunk
+                if any(isinstance(value, str) and "\x00" in value for value in row.values()):
+                    record_error(line, "NUL characters are not allowed")
+                    continue
+                chunk.append(row)
+                
+                if len(chunk) >= chunk_size:
+                    imported += self._load_chunk(chunk, user_id)
+                    chunks += 1
+                    chunk = []
+                    logger.info(
+                        "Task import for user %s: %s rows imported, %s failed",
+                        user_id, imported, failed
+                    )
+        except UnicodeDecodeError:
+            if not imported:
+                raise BadRequestException("Import file must be UTF-8 encoded")
+            # Chunks already committed stay; report where reading stopped
+            record_error(
+                last_line + 1, "Import file is not valid UTF-8 from here on; the rest was not read"
+            )
+        
+        if chunk:
+            imported += self._load_chunk(chunk, user_id)
+            chunks += 1
+        
+        return TaskImportResult(
+            imported=imported,
+            failed=failed,
+            chunks=chunks,
+            errors=errors,
+            errors_truncated=failed > len(errors)
+        )
+    
+    def _read_ndjson(self, stream: TextIO) -> Iterator[Tuple[int, Any]]:
+        """Yield (line number, object or parse error) for each NDJSON line."""
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as exc:
+                yield line_number, exc
+    
+    def _read_csv(self, stream: TextIO) -> Iterator[Tuple[int, Any]]:
+        """Yield (line number, row dict or parse error) for each CSV record after the header."""
+        reader = csv.DictReader(stream, strict=True)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                # e.g. an unterminated quote; the bad record starts after the
+                # last good one and reading resumes after it
+                yield reader.line_num + 1, exc
+                continue
+            # Empty cells mean "not provided" so schema defaults apply
+            record = {
+                key: value for key, value in row.items()
+                if key in IMPORT_COLUMNS and value not in ("", None)
+            }
+            yield reader.line_num, record
+    
+    def _load_chunk(self, rows: List[Dict[str, Any]], user_id: int) -> int:
+        """Insert one validated chunk and commit it."""
+        change_seq = UserService(self.db).bump_task_version(user_id)
+        if self.db.get_bind().dialect.name == "postgresql":
+            self._copy_chunk(rows, user_id, change_seq)
+        else:
+            now = datetime.utcnow()
+            self.db.execute(
+                insert(Task),
+                [
+                    {
+                        **row,
+                        "owner_id": user_id,
+                        "change_seq": change_seq,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for row in rows
+                ]
+            )
+        self.db.commit()
+        return len(rows)
+    
+    def _copy_chunk(
+        self, rows: List[Dict[str, Any]], user_id: int, change_seq: int
+    ) -> None:
+        """Load a chunk with COPY into a staging table, then INSERT ... SELECT."""
+        self.db.execute(text(
+            "CREATE TEMP TABLE IF NOT EXISTS task_import_staging ("
+            "title varchar(255), description text, status text, priority text, "
+            "due_date timestamp"
+            ") ON COMMIT DELETE ROWS"
+        ))
+        
+        tasks = Task.__table__
+        # Enum values as the column types store them
+        dialect = self.db.get_bind().dialect
+        store_status = tasks.c.status.type.bind_processor(dialect)
+        store_priority = tasks.c.priority.type.bind_processor(dialect)
+        buffer = io.StringIO()
+        for row in rows:
+            due_date = row["due_date"]
+            buffer.write(",".join(_copy_field(value) for value in (
+                row["title"],
+                row["description"],
+                store_status(row["status"]),
+                store_priority(row["priority"]),
+                None if due_date is None else due_date.isoformat(),
+            )) + "\n")
+        buffer.seek(0)
+        
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY task_import_staging ({', '.join(IMPORT_COLUMNS)}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+        
+        staged = COPY_STAGING.c
+        status = cast(staged.status, tasks.c.status.type)
+        now = func.timezone("utc", func.now())
+        self.db.execute(
+            insert(tasks).from_select(
+                [
+                    *IMPORT_COLUMNS,
+                    "created_at", "updated_at", "completed_at", "owner_id", "change_seq",
+                ],
+                select(
+                    staged.title,
+                    staged.description,
+                    status,
+                    cast(staged.priority, tasks.c.priority.type),
+                    staged.due_date,
+                    now,
+                    now,
+                    case((status == TaskStatus.DONE, now)),
+                    literal(user_id),
+                    literal(change_seq),
+                )
+            )
+        )
+
+
+def _copy_field(value: Optional[str]) -> str:
+    """
+    A field of the CSV sent to COPY: NULL as an unquoted empty field (COPY's
+    CSV default) and every value quoted, so no text, even an empty string,
+    reads as NULL.
+    """
+    if value is None:
+        return ""
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _format_error(error: Any) -> str:
+    """Render a validation or parse error as a single line."""
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+            for detail in error.errors()
+        )
+    return str(error)
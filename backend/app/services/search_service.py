@@ -0,0 +1,135 @@
+"""Search backends for the task ``search`` parameter."""
+
+from abc import ABC, abstractmethod
+from typing import List
+
+from sqlalchemy import column, func, literal_column, or_, table
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.models.task import Task
+
+# FTS5 shadow table maintained by triggers on ``tasks`` (SQLite only)
+tasks_fts = table("tasks_fts", column("rowid"), column("title"), column("description"))
+
+
+class SearchBackend(ABC):
+    """Base class for narrowing a task query to the rows matching a search."""
+    
+    name = "base"
+    
+    @abstractmethod
+    def apply(self, query: Query, search: str) -> Query:
+        """Restrict the query to tasks matching the search string."""
+    
+    def order_by(self, search: str) -> List[ColumnElement]:
+        """Ordering expressions that rank the best matches first."""
+        return []
+
+
+class ILikeSearchBackend(SearchBackend):
+    """Unindexed substring match on title and description (fallback mode)."""
+    
+    name = "ilike"
+    
+    def apply(self, query: Query, search: str) -> Query:
+        search_filter = f"%{search}%"
+        return query.filter(
+            or_(
+                Task.title.ilike(search_filter),
+                Task.description.ilike(search_filter)
+            )
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Full-text search on the generated ``search_vector`` column (GIN index),
+    with ILIKE substring matches served by pg_trgm GIN indexes.
+    """
+    
+    name = "postgresql"
+    
+    search_vector = literal_column("tasks.search_vector")
+    # Same text search configuration the generated column is built with
+    ts_config = literal_column("'simple'")
+    
+    def _tsquery(self, search: str) -> ColumnElement:
+        return func.websearch_to_tsquery(self.ts_config, search)
+    
+    def apply(self, query: Query, search: str) -> Query:
+        search_filter = f"%{search}%"
+        return query.filter(
+            or_(
+                self.search_vector.op("@@")(self._tsquery(search)),
+                Task.title.ilike(search_filter),
+                Task.description.ilike(search_filter)
+            )
+        )
+    
+    def order_by(self, search: str) -> List[ColumnElement]:
+        rank = (
+            func.ts_rank(self.search_vector, self._tsquery(search))
+            + func.similarity(Task.title, search)
+        )
+        return [rank.desc()]
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    FTS5 search through the ``tasks_fts`` shadow table.
+    
+    The table uses the trigram tokenizer, so matching keeps the substring
+    semantics of ILIKE. Terms shorter than a trigram cannot be looked up in
+    the index and fall back to ILIKE.
+    """
+    
+    name = "sqlite"
+    
+    # bm25() column weights: title matches outrank description matches
+    TITLE_WEIGHT = 10.0
+    DESCRIPTION_WEIGHT = 1.0
+    
+    fallback = ILikeSearchBackend()
+    
+    def _indexable(self, search: str) -> bool:
+        return len(search) >= 3
+    
+    def _match_expression(self, search: str) -> str:
+        # Quote as a single FTS5 phrase so user input is never parsed as syntax
+        return '"' + search.replace('"', '""') + '"'
+    
+    def apply(self, query: Query, search: str) -> Query:
+        if not self._indexable(search):
+            return self.fallback.apply(query, search)
+        return (
+            query
+            .join(tasks_fts, tasks_fts.c.rowid == Task.id)
+            .filter(literal_column("tasks_fts").op("MATCH")(self._match_expression(search)))
+        )
+    
+    def order_by(self, search: str) -> List[ColumnElement]:
+        if not self._indexable(search):
+            return []
+        # bm25() is lower for better matches
+        return [
+            func.bm25(
+                literal_column("tasks_fts"),
+                self.TITLE_WEIGHT,
+                self.DESCRIPTION_WEIGHT
+            ).asc()
+        ]
+
+
+def get_search_backend(db: Session) -> SearchBackend:
+    """Pick the search backend for the configured mode and database dialect."""
+    if settings.SEARCH_BACKEND == "ilike":
+        return ILikeSearchBackend()
+    
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return PostgresSearchBackend()
+    if dialect == "sqlite":
+        return SQLiteSearchBackend()
+    return ILikeSearchBackend()
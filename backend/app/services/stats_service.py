@@ -0,0 +1,122 @@
+"""Checks and rebuilds of the trigger-maintained analytics tables."""
+
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import delete, func, insert, literal, select, text, union_all
+from sqlalchemy.orm import Session
+
+from app.models.task import (
+    Task,
+    TaskDailyRollup,
+    TaskPriority,
+    TaskStatus,
+    UserTaskStats,
+)
+from app.db.ddl import task_rollup_contributions, task_rollup_upsert
+
+
+class TaskStatsDrift(NamedTuple):
+    """A user_task_stats row that disagrees with the tasks it counts."""
+    
+    owner_id: int
+    status: TaskStatus
+    priority: TaskPriority
+    expected: int
+    actual: int
+
+
+class TaskStatsService:
+    """Service class for checking and rebuilding per-user task counts."""
+    
+    def __init__(self, db: Session) -> None:
+        self.db = db
+    
+    def find_drift(self, user_id: Optional[int] = None) -> List[TaskStatsDrift]:
+        """
+        Compare user_task_stats with a fresh count of tasks.
+        
+        Both sides are read by one statement, so the comparison sees a
+        single snapshot even while tasks are being written.
+        """
+        expected = select(
+            Task.owner_id,
+            Task.status,
+            Task.priority,
+            func.count().label("expected"),
+            literal(0).label("actual"),
+        ).group_by(Task.owner_id, Task.status, Task.priority)
+        actual = select(
+            UserTaskStats.owner_id,
+            UserTaskStats.status,
+            UserTaskStats.priority,
+            literal(0),
+            UserTaskStats.task_count,
+        )
+        if user_id is not None:
+            expected = expected.where(Task.owner_id == user_id)
+            actual = actual.where(UserTaskStats.owner_id == user_id)
+        
+        counts = union_all(expected, actual).subquery()
+        key = (counts.c.owner_id, counts.c.status, counts.c.priority)
+        rows = self.db.execute(
+            select(
+                *key,
+                func.sum(counts.c.expected).label("expected"),
+                func.sum(counts.c.actual).label("actual"),
+            )
+            .group_by(*key)
+            .having(func.sum(counts.c.expected) != func.sum(counts.c.actual))
+            .order_by(*key)
+        )
+        return [TaskStatsDrift(*row) for row in rows]
+    
+    def rebuild(self, user_id: Optional[int] = None) -> int:
+        """Recount user_task_stats from tasks; returns the rows written."""
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Holds off task writes (whose triggers would race the recount)
+            # while leaving reads alone
+            self.db.execute(text("LOCK TABLE tasks IN SHARE MODE"))
+        
+        cleared = delete(UserTaskStats)
+        counts = select(
+            Task.owner_id, Task.status, Task.priority, func.count()
+        ).group_by(Task.owner_id, Task.status, Task.priority)
+        if user_id is not None:
+            cleared = cleared.where(UserTaskStats.owner_id == user_id)
+            counts = counts.where(Task.owner_id == user_id)
+        
+        self.db.execute(cleared)
+        written = self.db.execute(
+            insert(UserTaskStats).from_select(
+                ["owner_id", "status", "priority", "task_count"], counts
+            )
+        ).rowcount
+        self.db.commit()
+        return written
+
+
+class TaskRollupService:
+    """Service class for rebuilding the daily task rollup."""
+    
+    def __init__(self, db: Session) -> None:
+        self.db = db
+    
+    def rebuild(self, user_id: Optional[int] = None) -> int:
+        """Recompute task_daily_rollup from tasks; returns the days written."""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            self.db.execute(text("LOCK TABLE tasks IN SHARE MODE"))
+        
+        cleared = delete(TaskDailyRollup)
+        rows = "tasks"
+        if user_id is not None:
+            cleared = cleared.where(TaskDailyRollup.owner_id == user_id)
+            rows = "(SELECT * FROM tasks WHERE owner_id = :owner_id) AS user_tasks"
+        
+        self.db.execute(cleared)
+        written = self.db.execute(
+            text(task_rollup_upsert(task_rollup_contributions(dialect, rows))),
+            {"owner_id": user_id}
+        ).rowcount
+        self.db.commit()
+        return written
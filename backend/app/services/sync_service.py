@@ -0,0 +1,260 @@
+"""Offline sync push: apply a batch of queued client edits."""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionRunner
+from app.models.task import Task
+from app.schemas.task import (
+    SyncOperationType,
+    SyncPolicy,
+    SyncStatus,
+    TaskChange,
+    TaskCreate,
+    TaskSyncOperation,
+    TaskSyncResult,
+    TaskUpdate,
+)
+from app.services.task_service import TaskService
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Naive UTC datetime, the way task timestamps are stored."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _same(stored: Any, value: Any) -> bool:
+    """Whether a client-sent field value equals the stored one."""
+    if isinstance(value, datetime):
+        value = _as_utc(value)
+    return stored == value
+
+
+def _format_error(error: ValidationError) -> str:
+    """Render a validation error as a single line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'operation'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+class TaskSyncService:
+    """Service class for pushing offline task edits."""
+    
+    def __init__(self, db: Session) -> None:
+        self.db = db
+        self.task_service = TaskService(db)
+    
+    def push(
+        self, operations: List[Any], policy: SyncPolicy, user_id: int
+    ) -> List[TaskSyncResult]:
+        """
+        Apply queued creates, updates and deletes in one transaction.
+        
+        When a task changed on the server after ``base_seq``, updates are
+        merged field by field: an edited field conflicts only if the server
+        changed it too (its value differs from the client's ``base``, or
+        there is no base value) to something else. Other fields apply. A
+        conflicting field keeps the server value with ``reject``; with
+        ``lww`` the client's value wins if it edited after the server's
+        last write (``modified_at``, push time if omitted). Kept server
+        values come back in the result's ``conflicts``. A delete of a
+        changed task conflicts as a whole under the same rules.
+        """
+        results: List[Optional[TaskSyncResult]] = [None] * len(operations)
+        creates: List[Tuple[int, TaskSyncOperation, Dict[str, Any]]] = []
+        edits: Dict[int, Tuple[int, TaskSyncOperation, Dict[str, Any], Dict[str, Any]]] = {}
+        
+        for index, raw in enumerate(operations):
+            try:
+                operation = TaskSyncOperation.model_validate(raw)
+            except ValidationError as exc:
+                results[index] = TaskSyncResult(
+                    index=index, status=SyncStatus.ERROR, error=_format_error(exc)
+                )
+                continue
+            try:
+                if operation.op == SyncOperationType.CREATE:
+                    task_data = TaskCreate.model_validate(operation.data).model_dump()
+                    creates.append((index, operation, task_data))
+                    continue
+                update_data, base_data = (
+                    TaskUpdate.model_validate(values).model_dump(exclude_unset=True)
+                    for values in (operation.data, operation.base)
+                ) if operation.op == SyncOperationType.UPDATE else ({}, {})
+            except ValidationError as exc:
+                results[index] = self._error(index, operation, _format_error(exc))
+                continue
+            if operation.id is None or operation.base_seq is None:
+                results[index] = self._error(
+                    index, operation, "Updates and deletes need an id and a base_seq"
+                )
+            elif operation.id in edits:
+                results[index] = self._error(index, operation, "Duplicate id in batch")
+            else:
+                edits[operation.id] = (index, operation, update_data, base_data)
+        
+        if not creates and not edits:
+            return results
+        
+        # Bumped first: the user row lock keeps other writers out until commit
+        change_seq = self.task_service.user_service.bump_task_version(user_id)
+        tasks = {
+            task.id: task
+            for task in self.db.scalars(select(Task).where(Task.id.in_(list(edits))))
+        } if edits else {}
+        
+        now = datetime.utcnow()
+        updates: Dict[int, Dict[str, Any]] = {}
+        kept: Dict[int, Dict[str, Any]] = {}
+        deletes: List[int] = []
+        for task_id, (index, operation, update_data, base_data) in edits.items():
+            task = tasks.get(task_id)
+            if task is None:
+                # Deleting a deleted task is already done; editing one is not
+                if operation.op == SyncOperationType.DELETE:
+                    results[index] = self._result(index, operation, SyncStatus.APPLIED)
+                else:
+                    results[index] = self._result(
+                        index, operation, SyncStatus.CONFLICT, error="Task was deleted"
+                    )
+                continue
+            if task.owner_id != user_id:
+                results[index] = self._error(
+                    index, operation, "You don't have access to this task"
+                )
+                continue
+            
+            client_wins = (
+                policy == SyncPolicy.LAST_WRITER_WINS
+                and _as_utc(operation.modified_at or now) >= task.updated_at
+            )
+            changed = task.change_seq != operation.base_seq and not client_wins
+            
+            if operation.op == SyncOperationType.DELETE:
+                if changed:
+                    results[index] = self._result(
+                        index, operation, SyncStatus.CONFLICT,
+                        error="Task was changed on the server",
+                        task=TaskChange.model_validate(task)
+                    )
+                else:
+                    deletes.append(task_id)
+                    results[index] = self._result(index, operation, SyncStatus.APPLIED)
+                continue
+            
+            conflicts = self._conflicts(task, update_data, base_data) if changed else {}
+            applied = {
+                field: value for field, value in update_data.items() if field not in conflicts
+            }
+            if conflicts:
+                kept[task_id] = conflicts
+            if conflicts and not applied:
+                results[index] = self._conflict(index, operation, task, conflicts)
+            else:
+                updates[task_id] = applied
+        
+        if updates:
+            for task in self.task_service.apply_updates(updates, user_id, change_seq):
+                index, operation, _, _ = edits[task.id]
+                if task.id in kept:
+                    results[index] = self._conflict(index, operation, task, kept[task.id])
+                else:
+                    results[index] = self._result(
+                        index, operation, SyncStatus.APPLIED,
+                        task=TaskChange.model_validate(task)
+                    )
+        if creates:
+            created = self.db.scalars(
+                insert(Task).returning(Task, sort_by_parameter_order=True),
+                [
+                    {**task_data, "owner_id": user_id, "change_seq": change_seq}
+                    for _, _, task_data in creates
+                ]
+            ).all()
+            for (index, operation, _), task in zip(creates, created):
+                results[index] = self._result(
+                    index, operation, SyncStatus.APPLIED, task=TaskChange.model_validate(task)
+                )
+        if deletes:
+            # Tombstones for the change feed are written by the delete trigger
+            self.db.execute(
+                delete(Task).where(Task.owner_id == user_id, Task.id.in_(deletes))
+            )
+        self.db.commit()
+        
+        return results
+    
+    @staticmethod
+    def _conflicts(
+        task: Task, update_data: Dict[str, Any], base_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Server values of the edited fields the server also changed."""
+        conflicts = {}
+        for field, value in update_data.items():
+            stored = getattr(task, field)
+            if _same(stored, value):
+                continue
+            if field in base_data and _same(stored, base_data[field]):
+                continue
+            conflicts[field] = stored
+        return conflicts
+    
+    @staticmethod
+    def _result(
+        index: int,
+        operation: TaskSyncOperation,
+        status: SyncStatus,
+        error: Optional[str] = None,
+        task: Optional[TaskChange] = None,
+        conflicts: Optional[Dict[str, Any]] = None
+    ) -> TaskSyncResult:
+        """Build the result entry of an operation."""
+        return TaskSyncResult(
+            index=index,
+            op=operation.op,
+            id=task.id if task is not None else operation.id,
+            client_id=operation.client_id,
+            status=status,
+            error=error,
+            task=task,
+            conflicts=conflicts
+        )
+    
+    @staticmethod
+    def _conflict(
+        index: int, operation: TaskSyncOperation, task: Task, conflicts: Dict[str, Any]
+    ) -> TaskSyncResult:
+        """Build the result of an update that kept some server values."""
+        return TaskSyncService._result(
+            index, operation, SyncStatus.CONFLICT,
+            error="Fields were changed on the server: " + ", ".join(conflicts),
+            task=TaskChange.model_validate(task),
+            conflicts=conflicts
+        )
+    
+    @staticmethod
+    def _error(index: int, operation: TaskSyncOperation, error: str) -> TaskSyncResult:
+        """Build the result of an operation that was invalid or not allowed."""
+        return TaskSyncService._result(index, operation, SyncStatus.ERROR, error=error)
+
+
+class AsyncTaskSyncService:
+    """Async facade over TaskSyncService (see AsyncTaskService)."""
+    
+    def __init__(self, db: SessionRunner) -> None:
+        self.db = db
+    
+    async def push(
+        self, operations: List[Any], policy: SyncPolicy, user_id: int
+    ) -> List[TaskSyncResult]:
+        """Apply queued offline edits in one transaction."""
+        return await self.db.run(
+            lambda session: TaskSyncService(session).push(operations, policy, user_id)
+        )
@@ -1,28 +1,102 @@
 """Task service for handling task-related business logic."""
 
-from typing import List, Optional, Tuple
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
 
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from sqlalchemy import (
+    and_, bindparam, case, delete, func, insert, literal, null, select, tuple_, update
+)
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query, Session, load_only
 
-from app.core.exceptions import NotFoundException, ForbiddenException
-from app.models.task import Task, TaskStatus, TaskPriority
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.core.config import settings
+from app.core.database import SessionRunner, replica_read
+from app.core.events import record_task_change
+from app.core.exceptions import (
+    ForbiddenException, NotFoundException, PreconditionFailedException
+)
+from app.core.pagination import (
+    decode_cursor,
+    decode_sync_token,
+    encode_cursor,
+    encode_sync_token,
+)
+from app.models.task import Task, TaskStatus, TaskPriority, TaskTombstone
+from app.models.user import User
+from app.schemas.task import (
+    TASK_FIELDS,
+    TaskBulkItemResult,
+    TaskCreate,
+    TaskResponse,
+    TaskUpdate,
+    TotalMode,
+)
+from app.services.search_service import get_search_backend
+from app.services.user_service import UserService
+
+
+@dataclass
+class TaskPage:
+    """A single page of tasks plus the data needed to fetch the next one."""
+    
+    items: List[Any]
+    total: Optional[int]
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+
+
+@dataclass
+class TaskChanges:
+    """A page of the change feed: changed task rows and deleted task ids."""
+    
+    changes: List[Row]
+    deleted: List[int]
+    next_since: str
+    has_more: bool = False
 
 
 class TaskService:
     """Service class for task operations."""
     
+    # Columns streamed by export_rows (see app/services/export_service.py)
+    EXPORT_COLUMNS = (
+        Task.id,
+        Task.title,
+        Task.description,
+        Task.status,
+        Task.priority,
+        Task.due_date,
+        Task.created_at,
+        Task.updated_at,
+        Task.owner_id,
+    )
+    
+    # Always loaded with a ``fields`` selection: needed for access checks,
+    # list cursors and task ETags
+    REQUIRED_FIELDS = ("id", "owner_id", "created_at", "version")
+    
     def __init__(self, db: Session) -> None:
         self.db = db
+        self.search_backend = get_search_backend(db)
+        self.user_service = UserService(db)
     
-    def get_by_id(self, task_id: int) -> Optional[Task]:
-        """Get a task by its ID."""
-        return self.db.query(Task).filter(Task.id == task_id).first()
+    def get_by_id(
+        self, task_id: int, fields: Optional[Sequence[str]] = None
+    ) -> Optional[Task]:
+        """Get a task by its ID, optionally loading only some columns."""
+        query = self._load_fields(self.db.query(Task), fields)
+        return query.filter(Task.id == task_id).first()
     
-    def get_user_task(self, task_id: int, user_id: int) -> Task:
+    @replica_read
+    def get_user_task(
+        self, task_id: int, user_id: int, fields: Optional[Sequence[str]] = None
+    ) -> Task:
         """Get a task by ID, ensuring it belongs to the user."""
-        task = self.get_by_id(task_id)
+        task = self.get_by_id(task_id, fields)
         
         if not task:
             raise NotFoundException("Task")
@@ -32,6 +106,32 @@ class TaskService:
         
         return task
     
+    @replica_read
+    def get_user_task_row(
+        self, task_id: int, user_id: int, fields: Optional[Sequence[str]] = None
+    ) -> Row:
+        """Like get_user_task, but return a plain row of the selected columns."""
+        return self._user_task_row(task_id, user_id, self._columns(fields))
+    
+    @replica_read
+    def get_user_task_version(self, task_id: int, user_id: int) -> int:
+        """Get a task's version, ensuring it belongs to the user, without loading it."""
+        columns = [Task.id, Task.owner_id, Task.version]
+        return self._user_task_row(task_id, user_id, columns).version
+    
+    def _user_task_row(self, task_id: int, user_id: int, columns: List[Any]) -> Row:
+        """Select ``columns`` of a task, raising 404 / 403 unless the user owns it."""
+        row = self.db.execute(select(*columns).where(Task.id == task_id)).one_or_none()
+        
+        if row is None:
+            raise NotFoundException("Task")
+        
+        if row.owner_id != user_id:
+            raise ForbiddenException("You don't have access to this task")
+        
+        return row
+    
+    @replica_read
     def get_tasks(
         self,
         user_id: int,
@@ -39,9 +139,207 @@ class TaskService:
         priority: Optional[TaskPriority] = None,
         search: Optional[str] = None,
         page: int = 1,
-        page_size: int = 10
-    ) -> Tuple[List[Task], int]:
-        """Get paginated list of tasks with optional filters."""
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+        total_mode: Optional[TotalMode] = None,
+        fields: Optional[Sequence[str]] = None,
+        as_rows: bool = False
+    ) -> TaskPage:
+        """
+        Get a page of tasks with optional filters.
+        
+        When ``cursor`` is given the page is located by seeking on
+        ``(created_at, id)`` instead of skipping ``(page - 1) * page_size``
+        rows, so deep pages cost the same as the first one. Search results
+        are ranked by relevance in offset mode; cursor pages keep the
+        ``(created_at, id)`` order the cursor seeks on.
+        
+        ``total_mode`` controls how the total is produced:
+        - exact: counted in the same statement as the page
+        - estimated: planner row estimate where available, otherwise exact
+        - none: no total, only ``has_more``
+        
+        ``fields`` limits the task columns selected from the database; the
+        other attributes of the returned tasks are left unloaded. With
+        ``as_rows`` the items are plain result rows of those columns instead
+        of ORM objects.
+        """
+        total_mode = total_mode or TotalMode(settings.TASK_LIST_TOTAL_MODE)
+        filtered = self._filtered_query(user_id, status, priority, search)
+        if as_rows:
+            query = filtered.with_entities(*self._columns(fields))
+        else:
+            query = self._load_fields(filtered, fields)
+        
+        if search and not cursor:
+            query = query.order_by(*self.search_backend.order_by(search))
+        query = query.order_by(Task.created_at.desc(), Task.id.desc())
+        
+        if cursor:
+            created_at, task_id = decode_cursor(cursor)
+            query = query.filter(
+                tuple_(Task.created_at, Task.id) < (created_at, task_id)
+            )
+        else:
+            query = query.offset((page - 1) * page_size)
+        
+        total = None
+        if total_mode == TotalMode.ESTIMATED:
+            total = self._estimate_count(filtered)
+        count_in_query = total_mode != TotalMode.NONE and total is None
+        
+        if count_in_query:
+            # The count rides along as an uncorrelated scalar subquery, which
+            # the database evaluates once (from an index) for the whole page.
+            # Unlike COUNT(*) OVER (), it neither buffers every matching row
+            # nor sees only the rows after a cursor's seek position.
+            total_column = (
+                filtered
+                .with_entities(func.count())
+                .statement
+                .correlate(None)
+                .scalar_subquery()
+            )
+            query = query.add_columns(total_column.label("total"))
+        
+        # Fetch one extra row to know whether another page follows
+        rows = query.limit(page_size + 1).all()
+        
+        if count_in_query:
+            if rows:
+                total = rows[0].total
+            else:
+                # Past the last page there is no row to carry the count
+                total = filtered.order_by(None).count()
+            if not as_rows:
+                rows = [row[0] for row in rows]
+        
+        tasks = rows[:page_size]
+        has_more = len(rows) > page_size
+        
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor(tasks[-1].created_at, tasks[-1].id)
+        
+        return TaskPage(
+            items=tasks, total=total, has_more=has_more, next_cursor=next_cursor
+        )
+    
+    def get_changes(
+        self, user_id: int, since: Optional[str] = None, limit: int = 500
+    ) -> TaskChanges:
+        """
+        Get tasks created or updated, and ids of tasks deleted, after ``since``.
+        
+        Both are read from ``(owner_id, change_seq)`` indexes in
+        ``(change_seq, id)`` order, so a client that keeps ``next_since``
+        only downloads what changed. Bulk writes stamp many tasks with one
+        change_seq; the id tiebreak lets a page end inside such a batch.
+        """
+        position = decode_sync_token(since) if since else (0, 0)
+        
+        changed = self.db.execute(
+            select(*self._columns(None), Task.change_seq)
+            .where(
+                Task.owner_id == user_id,
+                tuple_(Task.change_seq, Task.id) > position
+            )
+            .order_by(Task.change_seq, Task.id)
+            .limit(limit + 1)
+        ).all()
+        deleted = self.db.execute(
+            select(TaskTombstone.change_seq, TaskTombstone.task_id)
+            .where(
+                TaskTombstone.owner_id == user_id,
+                tuple_(TaskTombstone.change_seq, TaskTombstone.task_id) > position
+            )
+            .order_by(TaskTombstone.change_seq, TaskTombstone.task_id)
+            .limit(limit + 1)
+        ).all()
+        
+        # Merge both streams by position and cut the page at ``limit``
+        entries = sorted(
+            [(row.change_seq, row.id, row) for row in changed]
+            + [(change_seq, task_id, None) for change_seq, task_id in deleted],
+            key=lambda entry: entry[:2]
+        )
+        page = entries[:limit]
+        next_position = page[-1][:2] if page else position
+        
+        return TaskChanges(
+            changes=[row for _, _, row in page if row is not None],
+            deleted=[task_id for _, task_id, row in page if row is None],
+            next_since=encode_sync_token(*next_position),
+            has_more=len(entries) > limit
+        )
+    
+    def export_rows(
+        self,
+        user_id: int,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        search: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Row]:
+        """
+        Stream all of a user's matching tasks as plain column tuples.
+        
+        Rows come from a server-side cursor ``batch_size`` at a time and no
+        ORM objects are built, so memory stays flat for any account size.
+        """
+        query = (
+            self._filtered_query(user_id, status, priority, search)
+            .with_entities(*self.EXPORT_COLUMNS)
+            .order_by(Task.created_at.desc(), Task.id.desc())
+            .execution_options(yield_per=batch_size)
+        )
+        yield from query
+    
+    def _estimate_count(self, query: Query) -> Optional[int]:
+        """
+        Estimate the row count of a query from planner statistics.
+        
+        Only Postgres exposes row estimates; other databases return None so
+        the caller falls back to an exact count.
+        """
+        bind = self.db.get_bind()
+        if bind.dialect.name != "postgresql":
+            return None
+        
+        statement = query.order_by(None).statement.compile(
+            dialect=bind.dialect, compile_kwargs={"literal_binds": True}
+        )
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}")
+            plan = cursor.fetchone()[0]
+        finally:
+            cursor.close()
+        if isinstance(plan, str):
+            # asyncpg hands json back undecoded
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    
+    def _columns(self, fields: Optional[Sequence[str]]) -> List[Any]:
+        """Task columns to select for ``fields`` (all response fields by default)."""
+        names = dict.fromkeys((*self.REQUIRED_FIELDS, *(fields or TASK_FIELDS)))
+        return [getattr(Task, name) for name in names]
+    
+    def _load_fields(self, query: Query, fields: Optional[Sequence[str]]) -> Query:
+        """Restrict the task columns a query selects to ``fields``."""
+        if not fields:
+            return query
+        columns = dict.fromkeys((*self.REQUIRED_FIELDS, *fields))
+        return query.options(load_only(*(getattr(Task, name) for name in columns)))
+    
+    def _filtered_query(
+        self,
+        user_id: int,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        search: Optional[str] = None
+    ) -> Query:
+        """Build the base task query for a user with the list filters applied."""
         query = self.db.query(Task).filter(Task.owner_id == user_id)
         
         # Apply filters
@@ -52,64 +350,458 @@ class TaskService:
             query = query.filter(Task.priority == priority)
         
         if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Task.title.ilike(search_filter),
-                    Task.description.ilike(search_filter)
-                )
+            query = self.search_backend.apply(query, search)
+        
+        return query
+    
+    def create(self, task_data: TaskCreate, user_id: int) -> Task:
+        """Create a new task with a single INSERT ... RETURNING."""
+        change_seq = self.user_service.bump_task_version(user_id)
+        table = Task.__table__
+        row = self.db.execute(
+            insert(table)
+            .values(**task_data.model_dump(), owner_id=user_id, change_seq=change_seq)
+            .returning(*table.c)
+        ).one()
+        self.db.commit()
+        
+        return self._task_from_row(row)
+    
+    def update(
+        self,
+        task_id: int,
+        task_data: TaskUpdate,
+        user_id: int,
+        expected_version: Optional[int] = None
+    ) -> Task:
+        """
+        Update an existing task.
+        
+        The ownership check rides on the version bump, and the change is
+        applied with one owner-scoped UPDATE ... RETURNING. With
+        ``expected_version`` (If-Match) the UPDATE is also conditional on the
+        task's version, and a mismatch raises 412 instead of overwriting a
+        concurrent edit.
+        """
+        # Update only provided fields
+        update_data = task_data.model_dump(exclude_unset=True)
+        if not update_data:
+            task = self.get_user_task(task_id, user_id)
+            if expected_version is not None and task.version != expected_version:
+                raise PreconditionFailedException()
+            return task
+        
+        change_seq = self._claim_task_change(task_id, user_id, expected_version)
+        table = Task.__table__
+        if "status" in update_data:
+            update_data["completed_at"] = self._completed_at(
+                literal(update_data["status"], table.c.status.type)
             )
+        row = self.db.execute(
+            update(table)
+            .where(
+                table.c.id == task_id,
+                table.c.owner_id == user_id,
+                *self._version_condition(table.c.version, expected_version)
+            )
+            .values(**update_data, change_seq=change_seq, version=table.c.version + 1)
+            .returning(*table.c)
+        ).one_or_none()
+        if row is None:
+            raise self._write_missed(expected_version)
+        self.db.commit()
         
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination and ordering
-        offset = (page - 1) * page_size
-        tasks = (
-            query
-            .order_by(Task.created_at.desc())
-            .offset(offset)
-            .limit(page_size)
-            .all()
+        return self._task_from_row(row)
+    
+    def delete(
+        self, task_id: int, user_id: int, expected_version: Optional[int] = None
+    ) -> None:
+        """
+        Delete a task with one owner-scoped DELETE.
+        
+        A trigger records the tombstone the change feed reports. As with
+        update, ``expected_version`` makes the DELETE conditional.
+        """
+        self._claim_task_change(task_id, user_id, expected_version)
+        deleted_id = self.db.scalar(
+            delete(Task)
+            .where(
+                Task.id == task_id,
+                Task.owner_id == user_id,
+                *self._version_condition(Task.version, expected_version)
+            )
+            .returning(Task.id)
         )
+        if deleted_id is None:
+            raise self._write_missed(expected_version)
+        self.db.commit()
+    
+    def _claim_task_change(
+        self, task_id: int, user_id: int, expected_version: Optional[int] = None
+    ) -> int:
+        """
+        Bump the user's task version for a write to one task.
         
-        return tasks, total
+        The task's owner and version are read in the same statement, so a
+        missing task (404), another user's task (403) or a stale
+        ``expected_version`` (412) costs no extra round trip. Raising rolls
+        the bump back.
+        """
+        task = select(Task.owner_id, Task.version).where(Task.id == task_id)
+        change_seq, owner_id, version = self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(task_version=User.task_version + 1)
+            .returning(
+                User.task_version,
+                task.with_only_columns(Task.owner_id).scalar_subquery(),
+                task.with_only_columns(Task.version).scalar_subquery()
+            )
+        ).one()
+        
+        if owner_id is None:
+            raise NotFoundException("Task")
+        
+        if owner_id != user_id:
+            raise ForbiddenException("You don't have access to this task")
+        
+        if expected_version is not None and version != expected_version:
+            raise PreconditionFailedException()
+        
+        record_task_change(self.db, user_id, change_seq)
+        return change_seq
     
-    def create(self, task_data: TaskCreate, user_id: int) -> Task:
-        """Create a new task."""
-        task = Task(
-            title=task_data.title,
-            description=task_data.description,
-            status=task_data.status,
-            priority=task_data.priority,
-            due_date=task_data.due_date,
-            owner_id=user_id
+    @staticmethod
+    def _version_condition(column: Any, expected_version: Optional[int]) -> List[Any]:
+        """
+        WHERE clause of a conditional write.
+        
+        The check in _claim_task_change reads the task as of the start of
+        its statement, so on Postgres an edit committing while that
+        statement waits for the user's row lock can still slip past it;
+        this condition catches it.
+        """
+        return [] if expected_version is None else [column == expected_version]
+    
+    @staticmethod
+    def _write_missed(expected_version: Optional[int]) -> Exception:
+        """
+        Error for a write that matched no row after _claim_task_change passed.
+        
+        A conditional write lost to a concurrent edit (412); only an
+        unconditional one means the task is gone (404).
+        """
+        if expected_version is not None:
+            return PreconditionFailedException()
+        return NotFoundException("Task")
+    
+    @staticmethod
+    def _completed_at(status: Any) -> Any:
+        """
+        New completed_at of an UPDATE setting the SQL expression ``status``:
+        stamped when the task becomes done, kept while it stays done and
+        cleared when it is reopened.
+        """
+        table = Task.__table__
+        done = status == TaskStatus.DONE
+        return case(
+            (and_(done, table.c.status == TaskStatus.DONE), table.c.completed_at),
+            (done, datetime.utcnow()),
+            else_=null()
         )
+    
+    @staticmethod
+    def _task_from_row(row: Row) -> Task:
+        """
+        Build a Task from a RETURNING row.
         
-        self.db.add(task)
-        self.db.commit()
-        self.db.refresh(task)
+        The object is kept out of the session, so the commit does not expire
+        it and serializing it needs no refresh SELECT.
+        """
+        return Task(**row._mapping)
+    
+    def bulk_create(
+        self, items: List[Any], user_id: int
+    ) -> List[TaskBulkItemResult]:
+        """
+        Create many tasks in one transaction.
         
-        return task
+        Valid items are inserted with a single multi-row INSERT ... RETURNING;
+        invalid items are reported in place without aborting the batch.
+        """
+        results: List[Optional[TaskBulkItemResult]] = [None] * len(items)
+        rows = []
+        row_indexes = []
+        
+        for index, item in enumerate(items):
+            try:
+                task_data = TaskCreate.model_validate(item)
+            except ValidationError as exc:
+                results[index] = self._bulk_error(index, 422, exc)
+                continue
+            rows.append({**task_data.model_dump(), "owner_id": user_id})
+            row_indexes.append(index)
+        
+        if rows:
+            change_seq = self.user_service.bump_task_version(user_id)
+            for row in rows:
+                row["change_seq"] = change_seq
+            tasks = self.db.scalars(
+                insert(Task).returning(Task, sort_by_parameter_order=True),
+                rows
+            ).all()
+            for index, task in zip(row_indexes, tasks):
+                results[index] = TaskBulkItemResult(
+                    index=index,
+                    id=task.id,
+                    status_code=201,
+                    task=TaskResponse.model_validate(task)
+                )
+            self.db.commit()
+        
+        return results
     
-    def update(self, task_id: int, task_data: TaskUpdate, user_id: int) -> Task:
-        """Update an existing task."""
-        task = self.get_user_task(task_id, user_id)
+    def bulk_update(
+        self, items: List[Any], user_id: int
+    ) -> List[TaskBulkItemResult]:
+        """
+        Update many tasks in one transaction.
         
-        # Update only provided fields
-        update_data = task_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(task, field, value)
+        Items changing the same set of fields are applied together as one
+        owner-scoped UPDATE executed over all of their parameter sets.
+        """
+        results: List[Optional[TaskBulkItemResult]] = [None] * len(items)
+        changes: Dict[int, Dict[str, Any]] = {}
+        change_indexes: Dict[int, int] = {}
+        
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not isinstance(item.get("id"), int):
+                results[index] = self._bulk_error(index, 422, "Item must include an integer id")
+                continue
+            task_id = item["id"]
+            if task_id in changes:
+                results[index] = self._bulk_error(
+                    index, 422, "Duplicate id in batch", task_id=task_id
+                )
+                continue
+            fields = {key: value for key, value in item.items() if key != "id"}
+            try:
+                task_data = TaskUpdate.model_validate(fields)
+            except ValidationError as exc:
+                results[index] = self._bulk_error(index, 422, exc, task_id=task_id)
+                continue
+            changes[task_id] = task_data.model_dump(exclude_unset=True)
+            change_indexes[task_id] = index
         
+        # Ownership check for every referenced task in one query
+        owners = dict(
+            self.db.execute(
+                select(Task.id, Task.owner_id).where(Task.id.in_(list(changes)))
+            ).all()
+        ) if changes else {}
+        for task_id in list(changes):
+            if owners.get(task_id) != user_id:
+                index = change_indexes.pop(task_id)
+                del changes[task_id]
+                if task_id in owners:
+                    error = self._bulk_error(
+                        index, 403, "You don't have access to this task", task_id=task_id
+                    )
+                else:
+                    error = self._bulk_error(index, 404, "Task not found", task_id=task_id)
+                results[index] = error
+        
+        if changes:
+            change_seq = self.user_service.bump_task_version(user_id)
+            for task in self.apply_updates(changes, user_id, change_seq):
+                index = change_indexes[task.id]
+                results[index] = TaskBulkItemResult(
+                    index=index,
+                    id=task.id,
+                    status_code=200,
+                    task=TaskResponse.model_validate(task)
+                )
+            # Deleted since the ownership check
+            for task_id, index in change_indexes.items():
+                if results[index] is None:
+                    results[index] = self._bulk_error(
+                        index, 404, "Task not found", task_id=task_id
+                    )
         self.db.commit()
-        self.db.refresh(task)
         
-        return task
+        return results
     
-    def delete(self, task_id: int, user_id: int) -> None:
-        """Delete a task."""
-        task = self.get_user_task(task_id, user_id)
+    def apply_updates(
+        self, changes: Dict[int, Dict[str, Any]], user_id: int, change_seq: int
+    ) -> List[Task]:
+        """
+        Apply partial updates ``{task_id: fields}`` and return the updated tasks.
         
-        self.db.delete(task)
+        Updates changing the same set of fields run as one owner-scoped
+        UPDATE executed over all of their parameter sets. The caller bumps
+        the task version and commits.
+        """
+        groups: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+        for task_id, update_data in changes.items():
+            params = {f"new_{field}": value for field, value in update_data.items()}
+            params["task_id"] = task_id
+            groups[tuple(sorted(update_data))].append(params)
+        
+        table = Task.__table__
+        for fields, params in groups.items():
+            statement = (
+                update(table)
+                .where(table.c.id == bindparam("task_id"), table.c.owner_id == user_id)
+                .values({field: bindparam(f"new_{field}") for field in fields})
+                .values(change_seq=change_seq, version=table.c.version + 1)
+            )
+            if "status" in fields:
+                statement = statement.values(completed_at=self._completed_at(
+                    bindparam("new_status", type_=table.c.status.type)
+                ))
+            self.db.execute(statement, params)
+        
+        return self.db.scalars(
+            select(Task)
+            .where(Task.id.in_(list(changes)))
+            .execution_options(populate_existing=True)
+        ).all()
+    
+    def bulk_delete(
+        self, task_ids: List[int], user_id: int
+    ) -> List[TaskBulkItemResult]:
+        """Delete many tasks with one owner-scoped DELETE ... RETURNING."""
+        # Bumped first so the tombstone trigger stamps the new version
+        self.user_service.bump_task_version(user_id)
+        deleted = set(
+            self.db.scalars(
+                delete(Task)
+                .where(Task.owner_id == user_id, Task.id.in_(task_ids))
+                .returning(Task.id)
+            ).all()
+        )
+        
+        # Only ids that were not deleted need telling apart (404 vs 403)
+        missing = [task_id for task_id in task_ids if task_id not in deleted]
+        existing = set(
+            self.db.scalars(select(Task.id).where(Task.id.in_(missing))).all()
+        ) if missing else set()
         self.db.commit()
+        
+        results = []
+        seen = set()
+        for index, task_id in enumerate(task_ids):
+            if task_id in seen:
+                results.append(self._bulk_error(
+                    index, 422, "Duplicate id in batch", task_id=task_id
+                ))
+            elif task_id in deleted:
+                results.append(
+                    TaskBulkItemResult(index=index, id=task_id, status_code=204)
+                )
+            elif task_id in existing:
+                results.append(self._bulk_error(
+                    index, 403, "You don't have access to this task", task_id=task_id
+                ))
+            else:
+                results.append(
+                    self._bulk_error(index, 404, "Task not found", task_id=task_id)
+                )
+            seen.add(task_id)
+        
+        return results
+    
+    @staticmethod
+    def _bulk_error(
+        index: int,
+        status_code: int,
+        error: Any,
+        task_id: Optional[int] = None
+    ) -> TaskBulkItemResult:
+        """Build the result entry of a bulk item that was not applied."""
+        if isinstance(error, ValidationError):
+            error = "; ".join(
+                f"{'.'.join(str(part) for part in detail['loc']) or 'item'}: {detail['msg']}"
+                for detail in error.errors()
+            )
+        return TaskBulkItemResult(
+            index=index, id=task_id, status_code=status_code, error=str(error)
+        )
+
 
+class AsyncTaskService:
+    """
+    Async facade over TaskService for async handlers.
+    
+    Each call runs the sync implementation through the request's session
+    runner: on the event loop with the async engine, in the threadpool with
+    the sync one.
+    """
+    
+    def __init__(self, db: SessionRunner) -> None:
+        self.db = db
+    
+    async def _call(self, method: str, *args, **kwargs) -> Any:
+        return await self.db.run(
+            lambda session: getattr(TaskService(session), method)(*args, **kwargs)
+        )
+    
+    async def get_user_task(
+        self, task_id: int, user_id: int, fields: Optional[Sequence[str]] = None
+    ) -> Task:
+        """Get a task by ID, ensuring it belongs to the user."""
+        return await self._call("get_user_task", task_id, user_id, fields)
+    
+    async def get_user_task_row(
+        self, task_id: int, user_id: int, fields: Optional[Sequence[str]] = None
+    ) -> Row:
+        """Get a task by ID as a plain row, ensuring it belongs to the user."""
+        return await self._call("get_user_task_row", task_id, user_id, fields)
+    
+    async def get_user_task_version(self, task_id: int, user_id: int) -> int:
+        """Get a task's version, ensuring it belongs to the user."""
+        return await self._call("get_user_task_version", task_id, user_id)
+    
+    async def get_tasks(self, user_id: int, **filters) -> TaskPage:
+        """Get a page of tasks (see TaskService.get_tasks)."""
+        return await self._call("get_tasks", user_id, **filters)
+    
+    async def get_changes(
+        self, user_id: int, since: Optional[str] = None, limit: int = 500
+    ) -> TaskChanges:
+        """Get the task changes after a sync token."""
+        return await self._call("get_changes", user_id, since, limit)
+    
+    async def create(self, task_data: TaskCreate, user_id: int) -> Task:
+        """Create a new task."""
+        return await self._call("create", task_data, user_id)
+    
+    async def update(
+        self,
+        task_id: int,
+        task_data: TaskUpdate,
+        user_id: int,
+        expected_version: Optional[int] = None
+    ) -> Task:
+        """Update an existing task."""
+        return await self._call("update", task_id, task_data, user_id, expected_version)
+    
+    async def delete(
+        self, task_id: int, user_id: int, expected_version: Optional[int] = None
+    ) -> None:
+        """Delete a task."""
+        await self._call("delete", task_id, user_id, expected_version)
+    
+    async def bulk_create(self, items: List[Any], user_id: int) -> List[TaskBulkItemResult]:
+        """Create many tasks in one transaction."""
+        return await self._call("bulk_create", items, user_id)
+    
+    async def bulk_update(self, items: List[Any], user_id: int) -> List[TaskBulkItemResult]:
+        """Update many tasks in one transaction."""
+        return await self._call("bulk_update", items, user_id)
+    
+    async def bulk_delete(
+        self, task_ids: List[int], user_id: int
+    ) -> List[TaskBulkItemResult]:
+        """Delete many tasks in one transaction."""
+        return await self._call("bulk_delete", task_ids, user_id)
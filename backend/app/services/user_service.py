@@ -1,15 +1,58 @@
 """User service for handling user-related business logic."""
 
-from typing import Optional
+from typing import NamedTuple, Optional
 
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
+from app.core.cache import ResultCache, create_backend
+from app.core.config import settings
+from app.core.database import SessionRunner
+from app.core.events import announce_token_revocation, record_task_change
 from app.core.exceptions import ConflictException, NotFoundException
-from app.core.security import get_password_hash, verify_password
+from app.core.security import (
+    get_password_hash,
+    password_hasher,
+    revoke_token,
+    verify_and_update_password,
+)
 from app.models.user import User
 from app.schemas.user import UserCreate
 
 
+class Principal(NamedTuple):
+    """
+    The authenticated user as routes need them, without an ORM object.
+    
+    Task versions are deliberately left out: they change on every task
+    write, so routes that need one (for ETags) depend on the full User.
+    """
+    
+    id: int
+    email: str
+    full_name: Optional[str]
+    is_active: bool
+
+
+# Principals by user id, dropped when the user row changes (see
+# app/models/user.py); with a shared backend nothing is kept per worker
+principal_cache = ResultCache(
+    "principals",
+    0 if settings.PRINCIPAL_CACHE_URL else settings.PRINCIPAL_CACHE_SIZE,
+    create_backend(settings.PRINCIPAL_CACHE_URL),
+    scope="user"
+) if settings.PRINCIPAL_CACHE_TTL_SECONDS > 0 else None
+
+
+def cached_principal(user_id: int) -> Optional[Principal]:
+    """The user's principal if cached, without touching the database."""
+    if principal_cache is None:
+        return None
+    cached = principal_cache.get(user_id, "", 0)
+    # Shared backends hand back a JSON list
+    return Principal(*cached) if cached is not None else None
+
+
 class UserService:
     """Service class for user operations."""
     
@@ -24,8 +67,33 @@ class UserService:
         """Get a user by their email address."""
         return self.db.query(User).filter(User.email == email).first()
     
-    def create(self, user_data: UserCreate) -> User:
-        """Create a new user."""
+    def get_principal(self, user_id: int) -> Optional[Principal]:
+        """Get a user's principal, from the cache when possible."""
+        return cached_principal(user_id) or self.load_principal(user_id)
+    
+    def load_principal(self, user_id: int) -> Optional[Principal]:
+        """Read a user's principal from the database and cache it."""
+        # A change committing between the read and the set (e.g. a
+        # deactivation) must not be overwritten by the row read before it
+        invalidations = principal_cache.invalidations if principal_cache is not None else None
+        row = self.db.execute(
+            select(User.id, User.email, User.full_name, User.is_active)
+            .where(User.id == user_id)
+        ).first()
+        if row is None:
+            return None
+        principal = Principal(*row)
+        if principal_cache is not None:
+            principal_cache.set(
+                user_id, "", 0, principal, settings.PRINCIPAL_CACHE_TTL_SECONDS,
+                invalidations
+            )
+        return principal
+    
+    def create(
+        self, user_data: UserCreate, hashed_password: Optional[str] = None
+    ) -> User:
+        """Create a new user (hashing the password here unless given its hash)."""
         # Check if email already exists
         if self.get_by_email(user_data.email):
             raise ConflictException("Email already registered")
@@ -33,7 +101,7 @@ class UserService:
         # Create user with hashed password
         user = User(
             email=user_data.email,
-            hashed_password=get_password_hash(user_data.password),
+            hashed_password=hashed_password or get_password_hash(user_data.password),
             full_name=user_data.full_name
         )
         
@@ -50,12 +118,107 @@ class UserService:
         if not user:
             return None
         
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return None
         
+        if new_hash:
+            self.update_password_hash(user, new_hash)
         return user
     
+    def update_password_hash(self, user: User, hashed_password: str) -> None:
+        """Store a rehashed password (e.g. after BCRYPT_ROUNDS changed)."""
+        user.hashed_password = hashed_password
+        self.db.commit()
+        self.db.refresh(user)
+    
+    def revoke_token(self, token: str) -> None:
+        """Revoke an access token on this worker and, at commit, on the others."""
+        revoked = revoke_token(token)
+        if revoked is not None:
+            announce_token_revocation(self.db, *revoked)
+            self.db.commit()
+    
+    def bump_task_version(self, user_id: int) -> int:
+        """
+        Record a change to the user's tasks and return the new version.
+        
+        Call this before writing the tasks: the row lock it takes on the user
+        is held until commit, so one user's writes commit in version order
+        and the change feed never skips a version it has not seen yet.
+        Stream clients are notified of the new version once it commits.
+        """
+        change_seq = self.db.scalar(
+            update(User)
+            .where(User.id == user_id)
+            .values(task_version=User.task_version + 1)
+            .returning(User.task_version)
+        )
+        record_task_change(self.db, user_id, change_seq)
+        return change_seq
+    
     def is_active(self, user: User) -> bool:
         """Check if a user is active."""
         return user.is_active
 
+
+class AsyncUserService:
+    """
+    Async facade over UserService for async handlers.
+    
+    Password hashing runs on ``password_hasher``, off both the event loop
+    and the request threadpool.
+    """
+    
+    def __init__(self, db: SessionRunner) -> None:
+        self.db = db
+    
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """Get a user by their ID."""
+        return await self.db.run(lambda session: UserService(session).get_by_id(user_id))
+    
+    async def create(self, user_data: UserCreate) -> User:
+        """Create a new user."""
+        # Spare the hashing threads a hash that could never be stored
+        if await self.get_by_email(user_data.email):
+            raise ConflictException("Email already registered")
+        hashed_password = await password_hasher.hash(user_data.password)
+        return await self.db.run(
+            lambda session: UserService(session).create(user_data, hashed_password)
+        )
+    
+    async def authenticate(self, email: str, password: str) -> Optional[User]:
+        """Authenticate a user, upgrading their hash if its cost is outdated."""
+        user = await self.get_by_email(email)
+        
+        if not user:
+            return None
+        
+        valid, new_hash = await password_hasher.verify_and_update(
+            password, user.hashed_password
+        )
+        if not valid:
+            return None
+        
+        if new_hash:
+            await self.db.run(
+                lambda session: UserService(session).update_password_hash(user, new_hash)
+            )
+        return user
+    
+    async def revoke_token(self, token: str) -> None:
+        """Revoke an access token on every worker."""
+        await self.db.run(lambda session: UserService(session).revoke_token(token))
+    
+    async def get_principal(self, user_id: int) -> Optional[Principal]:
+        """Get a user's principal; cache hits skip the database session."""
+        principal = cached_principal(user_id)
+        if principal is not None:
+            return principal
+        return await self.db.run(
+            lambda session: UserService(session).load_principal(user_id)
+        )
+    
+    async def get_by_email(self, email: str) -> Optional[User]:
+        """Get a user by their email address."""
+        return await self.db.run(lambda session: UserService(session).get_by_email(email))
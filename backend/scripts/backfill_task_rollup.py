@@ -0,0 +1,35 @@
+"""Rebuild the daily task rollup behind the analytics time series.
+
+Usage (from the backend directory):
+    python scripts/backfill_task_rollup.py [--user-id ID]
+
+The rollup is kept current by triggers on the tasks table; run this after
+loading tasks with the triggers disabled, or to repair history.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import SessionLocal
+from app.services.stats_service import TaskRollupService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=int, help="limit to one user")
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        written = TaskRollupService(db).rebuild(args.user_id)
+        print(f"Rebuilt {written} day(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
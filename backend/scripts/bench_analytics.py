@@ -0,0 +1,131 @@
+"""Benchmark: analytics summary as seven COUNT queries vs. one conditional aggregate.
+
+Usage (from the backend directory):
+    python scripts/bench_analytics.py [--tasks 100000] [--repeat 20] [--database-url URL]
+
+Defaults to a temporary SQLite file. Pass a Postgres URL of a scratch
+database to measure with real round trips; its tables are created and
+dropped by the script.
+"""
+
+import argparse
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.database import Base
+from app.models.task import Task, TaskStatus, TaskPriority
+from app.models.user import User
+from app.schemas.analytics import AnalyticsSummary
+from app.services.analytics_service import AnalyticsService
+
+
+def seed(db: Session, tasks: int) -> int:
+    """Create one user with ``tasks`` tasks of mixed status, priority and dates."""
+    user = User(email="bench@example.com", hashed_password="x", is_active=True)
+    db.add(user)
+    db.flush()
+    now = datetime.utcnow()
+    statuses = list(TaskStatus)
+    priorities = list(TaskPriority)
+    for start in range(0, tasks, 10000):
+        db.execute(insert(Task), [
+            {
+                "title": f"Task {i}",
+                "status": statuses[i % 3],
+                "priority": priorities[(i // 3) % 3],
+                "due_date": now + timedelta(days=(i % 60) - 30) if i % 2 else None,
+                "created_at": now - timedelta(minutes=i),
+                "updated_at": now - timedelta(hours=i % 500),
+                "owner_id": user.id,
+            }
+            for i in range(start, min(start + 10000, tasks))
+        ])
+    db.commit()
+    db.execute(text("ANALYZE"))
+    return user.id
+
+
+def seven_queries(db: Session, user_id: int) -> AnalyticsSummary:
+    """The previous implementation: one COUNT query per figure."""
+    base_query = db.query(Task).filter(Task.owner_id == user_id)
+    now = datetime.utcnow()
+    total = base_query.count()
+    completed = base_query.filter(Task.status == TaskStatus.DONE).count()
+    return AnalyticsSummary(
+        total_tasks=total,
+        completed_tasks=completed,
+        pending_tasks=base_query.filter(Task.status == TaskStatus.TODO).count(),
+        in_progress_tasks=base_query.filter(Task.status == TaskStatus.IN_PROGRESS).count(),
+        overdue_tasks=base_query.filter(
+            Task.status != TaskStatus.DONE,
+            Task.due_date.isnot(None),
+            Task.due_date < now
+        ).count(),
+        completed_this_week=base_query.filter(
+            Task.status == TaskStatus.DONE,
+            Task.updated_at >= now - timedelta(days=7)
+        ).count(),
+        high_priority_pending=base_query.filter(
+            Task.status != TaskStatus.DONE,
+            Task.priority == TaskPriority.HIGH
+        ).count(),
+        completion_rate=round(completed / total * 100, 1) if total else 0.0
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100000, help="tasks of the user")
+    parser.add_argument("--repeat", type=int, default=20, help="iterations per path")
+    parser.add_argument("--database-url", help="scratch database (default: SQLite file)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite:///{directory}/bench.db"
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        try:
+            db = sessionmaker(bind=engine)()
+            user_id = seed(db, args.tasks)
+            service = AnalyticsService(db)
+            
+            statements = 0
+            
+            def count_statement(*_):
+                nonlocal statements
+                statements += 1
+            
+            event.listen(engine, "before_cursor_execute", count_statement)
+            paths = (
+                ("7 queries", lambda: seven_queries(db, user_id)),
+                ("1 query", lambda: service.get_summary(user_id)),
+            )
+            assert paths[0][1]() == paths[1][1]()
+            
+            print(f"{engine.dialect.name}, {args.tasks} tasks")
+            for name, func in paths:
+                statements = 0
+                func()
+                round_trips = statements
+                seconds = min(timeit.repeat(func, number=args.repeat, repeat=3)) / args.repeat
+                print(
+                    f"{name:>10}: {round_trips} round trip(s), "
+                    f"{seconds * 1000:.2f} ms per summary"
+                )
+            db.close()
+        finally:
+            Base.metadata.drop_all(bind=engine)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Microbenchmark: per-request authentication cost with and without caches.
+
+Compares what a request spent resolving its bearer token before (JWT
+signature check plus a users query) with the cached path (verified token
+and principal caches warm), and the token decode on its own.
+
+Usage (from the backend directory):
+    python scripts/bench_auth.py [--repeat 20000]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.security import create_access_token, decode_token
+from app.models.user import User
+from app.services.user_service import UserService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20000, help="iterations per path")
+    args = parser.parse_args()
+    
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    user = User(email="bench@example.com", hashed_password="x", is_active=True)
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    token = create_access_token(subject=user_id)
+    service = UserService(db)
+    
+    def uncached_decode() -> dict:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    
+    def before() -> bool:
+        # decode_token and get_by_id as get_current_user ran them
+        payload = uncached_decode()
+        return service.get_by_id(int(payload["sub"])).is_active
+    
+    def after() -> bool:
+        # decode_token and get_principal as get_current_principal runs them
+        payload = decode_token(token)
+        return service.get_principal(int(payload["sub"])).is_active
+    
+    assert before() and after()
+    
+    results = {}
+    for name, func in (
+        ("jwt decode", uncached_decode),
+        ("cached decode", lambda: decode_token(token)),
+        ("auth before", before),
+        ("auth after", after),
+    ):
+        seconds = min(timeit.repeat(func, number=args.repeat, repeat=3)) / args.repeat
+        results[name] = seconds
+        print(f"{name:>13}: {seconds * 1e6:8.2f} us per request")
+    print(f"{'speedup':>13}: {results['auth before'] / results['auth after']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
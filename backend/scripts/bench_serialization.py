@@ -0,0 +1,100 @@
+"""Microbenchmark: task list serialization through Pydantic vs. the row fast path.
+
+Usage (from the backend directory):
+    python scripts/bench_serialization.py [--rows 100] [--repeat 200]
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import orjson
+from fastapi.utils import create_response_field
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.core.serialization import rows_as_dicts
+from app.models.task import Task, TaskStatus, TaskPriority
+from app.models.user import User
+from app.schemas.task import TASK_FIELDS, TaskListResponse
+from app.services.task_service import TaskService
+
+
+def seed(db, rows: int) -> int:
+    """Create one user with ``rows`` tasks carrying realistic descriptions."""
+    user = User(email="bench@example.com", hashed_password="x", is_active=True)
+    db.add(user)
+    db.flush()
+    now = datetime.utcnow()
+    db.execute(insert(Task), [
+        {
+            "title": f"Task {i}",
+            "description": "Lorem ipsum dolor sit amet. " * 20,
+            "status": list(TaskStatus)[i % 3],
+            "priority": list(TaskPriority)[i % 3],
+            "due_date": now + timedelta(days=i) if i % 2 else None,
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now,
+            "owner_id": user.id,
+        }
+        for i in range(rows)
+    ])
+    db.commit()
+    return user.id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100, help="tasks per page")
+    parser.add_argument("--repeat", type=int, default=200, help="iterations per path")
+    args = parser.parse_args()
+    
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    user_id = seed(db, args.rows)
+    service = TaskService(db)
+    response_field = create_response_field(name="response", type_=TaskListResponse)
+    
+    def pydantic_path() -> bytes:
+        # ORM objects -> TaskListResponse -> response_model validation and
+        # serialization (what FastAPI's serialize_response does) -> json.dumps
+        db.expunge_all()
+        page = service.get_tasks(user_id, page_size=args.rows)
+        content = TaskListResponse(
+            items=page.items, total=page.total, page=1, page_size=args.rows
+        )
+        value, _ = response_field.validate(content, {}, loc=("response",))
+        payload = response_field.serialize(value, mode="json")
+        return json.dumps(payload, separators=(",", ":")).encode()
+    
+    def fast_path() -> bytes:
+        # Column rows -> dicts -> orjson
+        db.expunge_all()
+        page = service.get_tasks(user_id, page_size=args.rows, as_rows=True)
+        return orjson.dumps({
+            "items": rows_as_dicts(page.items, TASK_FIELDS),
+            "total": page.total,
+            "page": 1,
+            "page_size": args.rows,
+        })
+    
+    assert orjson.loads(pydantic_path())["items"] == orjson.loads(fast_path())["items"]
+    
+    for name, func in (("pydantic", pydantic_path), ("fast path", fast_path)):
+        seconds = min(timeit.repeat(func, number=args.repeat, repeat=3)) / args.repeat
+        print(f"{name:>10}: {seconds * 1000:.3f} ms per {args.rows}-item page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Check the per-user task counts against the tasks table and rebuild them.
+
+Usage (from the backend directory):
+    python scripts/reconcile_task_stats.py [--check] [--user-id ID]
+
+Prints every drifted (user, status, priority) count and, if there is any,
+rebuilds the counts from scratch. With ``--check`` the script only reports,
+exiting with status 1 on drift, for use from cron or CI.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import SessionLocal
+from app.services.stats_service import TaskStatsService
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="report drift only")
+    parser.add_argument("--user-id", type=int, help="limit to one user")
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        service = TaskStatsService(db)
+        drift = service.find_drift(args.user_id)
+        for row in drift:
+            print(
+                f"user {row.owner_id} {row.status.value}/{row.priority.value}: "
+                f"expected {row.expected}, stored {row.actual}"
+            )
+        print(f"{len(drift)} drifted count(s)")
+        
+        if args.check:
+            return 1 if drift else 0
+        if not drift:
+            return 0
+        
+        written = service.rebuild(args.user_id)
+        print(f"Rebuilt {written} count(s)")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,22 @@
 """Pytest configuration and fixtures."""
 
+import os
 import pytest
+from pathlib import Path
 from typing import Generator
+from alembic import command
+from alembic.config import Config
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.core.cache import caches
+from app.core.config import settings
 from app.core.database import Base, get_db
-from app.core.security import create_access_token, get_password_hash
+from app.core.security import create_access_token, get_password_hash, token_cache
 from app.models.user import User
 from app.models.task import Task, TaskStatus, TaskPriority
 
@@ -37,6 +44,69 @@ def db() -> Generator[Session, None, None]:
     finally:
         session.close()
         Base.metadata.drop_all(bind=engine)
+        # Ids and task versions restart with the database
+        for cache in caches.values():
+            cache.clear()
+        token_cache.clear()
+
+
+def _alembic_config() -> Config:
+    config = Config()
+    config.set_main_option("script_location", str(Path(__file__).parent.parent / "alembic"))
+    return config
+
+
+@pytest.fixture
+def alembic_config(tmp_path: Path, monkeypatch) -> Config:
+    """Alembic configuration pointed at a scratch SQLite database."""
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'migrated.db'}")
+    return _alembic_config()
+
+
+@pytest.fixture
+def postgres_alembic_config(monkeypatch) -> Generator[Config, None, None]:
+    """
+    Alembic configuration pointed at a scratch database on Postgres.
+    
+    Uses the server of the environment's DATABASE_URL (as set in CI) and is
+    skipped when that isn't Postgres.
+    """
+    url = make_url(os.environ.get("DATABASE_URL", "sqlite://"))
+    if url.get_backend_name() != "postgresql":
+        pytest.skip("DATABASE_URL is not a Postgres database")
+    name = f"{url.database}_migrations"
+    server = create_engine(url, isolation_level="AUTOCOMMIT")
+    with server.connect() as connection:
+        connection.exec_driver_sql(f"DROP DATABASE IF EXISTS {name}")
+        connection.exec_driver_sql(f"CREATE DATABASE {name}")
+    monkeypatch.setattr(
+        settings, "DATABASE_URL", url.set(database=name).render_as_string(hide_password=False)
+    )
+    try:
+        yield _alembic_config()
+    finally:
+        with server.connect() as connection:
+            connection.exec_driver_sql(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+        server.dispose()
+        for cache in caches.values():
+            cache.clear()
+        token_cache.clear()
+
+
+@pytest.fixture
+def migrated_db(alembic_config: Config) -> Generator[Session, None, None]:
+    """Create a database with ``alembic upgrade head`` instead of create_all."""
+    command.upgrade(alembic_config, "head")
+    migrated_engine = create_engine(settings.DATABASE_URL)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=migrated_engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        migrated_engine.dispose()
+        for cache in caches.values():
+            cache.clear()
+        token_cache.clear()
 
 
 @pytest.fixture(scope="function")
@@ -96,3 +166,15 @@ def test_task(db: Session, test_user: User) -> Task:
     db.refresh(task)
     return task
 
+
+@pytest.fixture
+def other_task(db: Session) -> Task:
+    """Create a task owned by another user."""
+    other = User(email="other@example.com", hashed_password="x", is_active=True)
+    db.add(other)
+    db.flush()
+    task = Task(title="Not yours", owner_id=other.id)
+    db.add(task)
+    db.commit()
+    db.refresh(task)
+    return task
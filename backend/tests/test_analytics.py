@@ -1,12 +1,86 @@
 """Tests for analytics endpoints."""
 
+import sys
+import time
+import types
+
 import pytest
 from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
+from sqlalchemy import delete, or_, select, update
 from sqlalchemy.orm import Session
 
-from app.models.task import Task, TaskStatus, TaskPriority
+from app.core.cache import (
+    CacheBackend,
+    MemoryBackend,
+    RedisBackend,
+    ResultCache,
+    caches,
+    create_backend,
+)
+from app.models.task import (
+    Task,
+    TaskDailyRollup,
+    TaskPriority,
+    TaskStatus,
+    TaskStatusEvent,
+    UserTaskStats,
+)
 from app.models.user import User
+from app.services.analytics_service import AnalyticsService, analytics_cache
+from app.services.stats_service import TaskRollupService, TaskStatsService
+
+
+class FakeRedis:
+    """The part of redis.Redis that RedisBackend uses, kept in memory."""
+    
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.hashes = {}
+        self.ttls = {}
+    
+    @classmethod
+    def from_url(cls, url: str) -> "FakeRedis":
+        return cls(url)
+    
+    def hget(self, name: str, key: str):
+        value = self.hashes.get(name, {}).get(key)
+        # Like redis-py without decode_responses
+        return value.encode() if value is not None else None
+    
+    def hset(self, name: str, key: str, value: str) -> None:
+        self.hashes.setdefault(name, {})[key] = value
+    
+    def expire(self, name: str, ttl: int) -> None:
+        self.ttls[name] = ttl
+    
+    def delete(self, name: str) -> None:
+        self.hashes.pop(name, None)
+        self.ttls.pop(name, None)
+    
+    def pipeline(self) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues FakeRedis calls until execute()."""
+    
+    def __init__(self, client: FakeRedis) -> None:
+        self.client = client
+        self.calls = []
+    
+    def __enter__(self) -> "FakePipeline":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.calls.clear()
+    
+    def __getattr__(self, name: str):
+        return lambda *args: self.calls.append((name, args))
+    
+    def execute(self) -> None:
+        for name, args in self.calls:
+            getattr(self.client, name)(*args)
 
 
 class TestAnalyticsSummary:
@@ -35,14 +109,14 @@ class TestAnalyticsSummary:
                 status=TaskStatus.DONE,
                 priority=TaskPriority.HIGH,
                 owner_id=test_user.id,
-                updated_at=now - timedelta(days=2)  # Completed this week
+                completed_at=now - timedelta(days=2)  # Completed this week
             ),
             Task(
                 title="Done Task 2",
                 status=TaskStatus.DONE,
                 priority=TaskPriority.MEDIUM,
                 owner_id=test_user.id,
-                updated_at=now - timedelta(days=10)  # Not this week
+                completed_at=now - timedelta(days=10)  # Not this week
             ),
             Task(
                 title="In Progress Task",
@@ -78,6 +152,7 @@ class TestAnalyticsSummary:
         assert data["pending_tasks"] == 2  # TODO tasks
         assert data["in_progress_tasks"] == 1
         assert data["overdue_tasks"] == 1
+        assert data["completed_this_week"] == 1
         assert data["high_priority_pending"] == 1  # Overdue high priority task
         assert data["completion_rate"] == 40.0  # 2/5 * 100
     
@@ -86,4 +161,479 @@ class TestAnalyticsSummary:
         response = client.get("/analytics/summary")
         
         assert response.status_code == 403
+    
+    def test_get_summary_not_modified(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test conditional GET of the summary and invalidation by task writes."""
+        first = client.get("/analytics/summary", headers=auth_headers)
+        etag = first.headers["etag"]
+        
+        response = client.get(
+            "/analytics/summary", headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        
+        client.post("/tasks", json={"title": "New Task"}, headers=auth_headers)
+        response = client.get(
+            "/analytics/summary", headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.json()["total_tasks"] == 1
+
+
+class TestAnalyticsMetrics:
+    """Tests for selecting individual metrics."""
+    
+    def test_get_metric_subset(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test that only the requested metrics are returned."""
+        db.add_all([
+            Task(title="Open", priority=TaskPriority.HIGH, owner_id=test_user.id),
+            Task(title="Done", status=TaskStatus.DONE, owner_id=test_user.id),
+        ])
+        db.commit()
+        
+        response = client.get(
+            "/analytics/metrics?names=high_priority_pending,completed_tasks",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.json() == {"high_priority_pending": 1, "completed_tasks": 1}
+    
+    def test_metrics_without_tasks_are_zero(self, client: TestClient, auth_headers: dict):
+        """Test that conditional counts over no tasks are 0, not null."""
+        response = client.get("/analytics/metrics", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert set(response.json().values()) == {0}
+    
+    def test_time_dependent_metrics_only(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test selecting only metrics that are counted from tasks."""
+        response = client.get(
+            "/analytics/metrics?names=overdue_tasks,completed_this_week",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.json() == {"overdue_tasks": 0, "completed_this_week": 0}
+    
+    def test_unknown_metric(self, client: TestClient, auth_headers: dict):
+        """Test that an unknown metric name is rejected."""
+        response = client.get("/analytics/metrics?names=bogus", headers=auth_headers)
+        
+        assert response.status_code == 400
+
+
+class TestTaskStats:
+    """Tests for the trigger-maintained per-user task counts."""
+    
+    def test_counts_follow_every_write_path(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test that creates, updates, bulk writes and deletes keep counts exact."""
+        created = client.post(
+            "/tasks", json={"title": "One", "priority": "high"}, headers=auth_headers
+        ).json()
+        bulk = client.post(
+            "/tasks/bulk",
+            json={"items": [{"title": f"Bulk {i}"} for i in range(4)]},
+            headers=auth_headers
+        ).json()["results"]
+        client.put(f"/tasks/{created['id']}", json={"status": "done"}, headers=auth_headers)
+        client.patch(
+            "/tasks/bulk",
+            json={"items": [{"id": bulk[0]["id"], "status": "in_progress"}]},
+            headers=auth_headers
+        )
+        client.request(
+            "DELETE", "/tasks/bulk", json={"ids": [bulk[1]["id"]]}, headers=auth_headers
+        )
+        client.delete(f"/tasks/{bulk[2]['id']}", headers=auth_headers)
+        
+        service = TaskStatsService(db)
+        assert service.find_drift() == []
+        summary = AnalyticsService(db).get_summary(test_user.id)
+        assert (
+            summary.total_tasks, summary.completed_tasks,
+            summary.in_progress_tasks, summary.pending_tasks
+        ) == (3, 1, 1, 1)
+    
+    def test_reconcile_detects_and_repairs_drift(
+        self, db: Session, test_user: User, test_task: Task
+    ):
+        """Test that drifted counts are reported and rebuilt from tasks."""
+        db.execute(update(UserTaskStats).values(task_count=UserTaskStats.task_count + 5))
+        db.commit()
+        service = TaskStatsService(db)
+        
+        drift = service.find_drift(test_user.id)
+        
+        assert [(row.status, row.expected, row.actual) for row in drift] == [
+            (test_task.status, 1, 6)
+        ]
+        assert service.rebuild() == 1
+        assert service.find_drift() == []
+        assert AnalyticsService(db).get_summary(test_user.id).total_tasks == 1
+
+
+class TestAnalyticsCache:
+    """Tests for the analytics result cache."""
+    
+    def test_summary_cached_until_tasks_change(
+        self, client: TestClient, auth_headers: dict
+    ):
+        """Test that repeated summaries hit the cache and writes invalidate it."""
+        client.post("/tasks", json={"title": "First"}, headers=auth_headers)
+        before = analytics_cache.stats()
+        
+        first = client.get("/analytics/summary", headers=auth_headers).json()
+        second = client.get("/analytics/summary", headers=auth_headers).json()
+        assert first == second
+        after = analytics_cache.stats()
+        assert after["misses"] - before["misses"] == 1
+        assert after["hits"] - before["hits"] == 1
+        
+        client.post("/tasks", json={"title": "Second"}, headers=auth_headers)
+        response = client.get("/analytics/summary", headers=auth_headers)
+        assert response.json()["total_tasks"] == 2
+    
+    def test_cache_expires_when_task_falls_due(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test that a cached overdue count expires at the next due date."""
+        db.add(Task(
+            title="Due soon",
+            due_date=datetime.utcnow() + timedelta(seconds=1),
+            owner_id=test_user.id
+        ))
+        db.commit()
+        url = "/analytics/metrics?names=overdue_tasks"
+        
+        assert client.get(url, headers=auth_headers).json() == {"overdue_tasks": 0}
+        time.sleep(1.1)
+        assert client.get(url, headers=auth_headers).json() == {"overdue_tasks": 1}
+    
+    def test_shared_backend(self):
+        """Test that workers share entries and invalidations through the backend."""
+        backend = MemoryBackend()
+        worker_a = ResultCache("test-shared", 10, backend)
+        worker_b = ResultCache("test-shared", 10, backend)
+        try:
+            worker_a.set(1, "summary", 5, {"total_tasks": 3}, ttl=60)
+            
+            assert worker_b.get(1, "summary", 5) == {"total_tasks": 3}
+            assert worker_b.get(1, "summary", 6) is None
+            worker_a.invalidate(1)
+            worker_b.invalidate(1, shared=False)
+            assert worker_b.get(1, "summary", 5) is None
+        finally:
+            caches.pop("test-shared")
+    
+    def test_redis_backend(self, monkeypatch):
+        """Test entries, expiry and invalidation through the Redis backend."""
+        monkeypatch.setitem(sys.modules, "redis", types.SimpleNamespace(Redis=FakeRedis))
+        backend = create_backend("redis://cache:6379/0")
+        assert isinstance(backend, RedisBackend)
+        client = backend.client
+        assert client.url == "redis://cache:6379/0"
+        worker_a = ResultCache("test-redis", 0, backend)
+        worker_b = ResultCache("test-redis", 0, backend)
+        try:
+            worker_a.set(1, "summary", 5, {"total_tasks": 3}, ttl=60)
+            # The hash lives as long as its latest entry
+            assert 60 <= client.ttls["test-redis:1"] <= 61
+            worker_a.set(1, "overdue", 5, {"overdue_tasks": 1}, ttl=0.5)
+            
+            assert worker_b.get(1, "summary", 5) == {"total_tasks": 3}
+            assert worker_b.get(1, "summary", 6) is None
+            # Entries outlived by their hash are checked on read
+            time.sleep(0.6)
+            assert worker_b.get(1, "overdue", 5) is None
+            
+            worker_a.invalidate(1)
+            assert worker_b.get(1, "summary", 5) is None
+            assert "test-redis:1" not in client.hashes
+        finally:
+            caches.pop("test-redis")
+    
+    def test_backend_must_implement_all_methods(self):
+        """Test that an incomplete backend fails when created."""
+        class NoDelete(CacheBackend):
+            def get(self, namespace, user_id, key):
+                return None
+            
+            def set(self, namespace, user_id, key, entry):
+                pass
+        
+        with pytest.raises(TypeError):
+            NoDelete()
+    
+    def test_lru_bound(self):
+        """Test that the least recently used entries are evicted."""
+        cache = ResultCache("test-lru", 2)
+        try:
+            for user_id in (1, 2):
+                cache.set(user_id, "summary", 1, user_id, ttl=60)
+            cache.get(1, "summary", 1)
+            cache.set(3, "summary", 1, 3, ttl=60)
+            
+            assert cache.get(2, "summary", 1) is None
+            assert cache.get(1, "summary", 1) == 1
+            assert cache.stats()["evictions"] == 1
+        finally:
+            caches.pop("test-lru")
+    
+    def test_cache_counters_endpoint(self, client: TestClient):
+        """Test that the cache counters are exposed."""
+        response = client.get("/health/cache")
+        
+        assert response.status_code == 200
+        assert {"hits", "misses", "evictions"} <= response.json()["analytics"].keys()
+
+
+class TestAnalyticsTimeseries:
+    """Tests for the time series endpoint and its daily rollup."""
+    
+    def test_daily_series_is_dense(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test that days without activity are returned as zeros."""
+        today = datetime.utcnow().replace(hour=12)
+        db.add_all([
+            Task(title="Old", owner_id=test_user.id, created_at=today - timedelta(days=3)),
+            Task(title="New", owner_id=test_user.id, created_at=today),
+            Task(title="New 2", owner_id=test_user.id, created_at=today),
+        ])
+        db.commit()
+        start = (today - timedelta(days=4)).date()
+        
+        response = client.get(
+            f"/analytics/timeseries?metric=created&from={start}", headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["end"] == today.date().isoformat()
+        assert [point["value"] for point in data["points"]] == [0, 1, 0, 0, 2]
+        assert data["points"][0]["date"] == start.isoformat()
+    
+    def test_overdue_series(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test that overdue counts open tasks from their due day until completed."""
+        today = datetime.utcnow().replace(hour=12)
+        task = Task(
+            title="Late",
+            owner_id=test_user.id,
+            created_at=today - timedelta(days=10),
+            due_date=today - timedelta(days=2)
+        )
+        db.add(task)
+        db.commit()
+        url = f"/analytics/timeseries?metric=overdue&from={(today - timedelta(days=3)).date()}"
+        
+        assert [p["value"] for p in client.get(url, headers=auth_headers).json()["points"]] == [
+            0, 1, 1, 1
+        ]
+        
+        client.put(f"/tasks/{task.id}", json={"status": "done"}, headers=auth_headers)
+        values = [p["value"] for p in client.get(url, headers=auth_headers).json()["points"]]
+        assert values == [0, 1, 1, 0]
+        completed = client.get(
+            url.replace("overdue", "completed"), headers=auth_headers
+        ).json()["points"]
+        assert [p["value"] for p in completed] == [0, 0, 0, 1]
+    
+    def test_weekly_series(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test that weekly buckets start on Monday and sum their days."""
+        monday = datetime(2024, 5, 6, 12)
+        db.add_all([
+            Task(title="Mon", owner_id=test_user.id, created_at=monday),
+            Task(title="Sun", owner_id=test_user.id, created_at=monday + timedelta(days=6)),
+            Task(title="Next", owner_id=test_user.id, created_at=monday + timedelta(days=7)),
+        ])
+        db.commit()
+        
+        response = client.get(
+            "/analytics/timeseries?metric=created&granularity=week"
+            "&from=2024-05-08&to=2024-05-20",
+            headers=auth_headers
+        )
+        
+        assert response.json()["points"] == [
+            {"date": "2024-05-06", "value": 2},
+            {"date": "2024-05-13", "value": 1},
+            {"date": "2024-05-20", "value": 0},
+        ]
+    
+    def test_invalid_range(self, client: TestClient, auth_headers: dict):
+        """Test that reversed and overlong ranges are rejected."""
+        reversed_range = client.get(
+            "/analytics/timeseries?metric=created&from=2024-05-02&to=2024-05-01",
+            headers=auth_headers
+        )
+        too_long = client.get(
+            "/analytics/timeseries?metric=created&from=2000-01-01&to=2024-01-01",
+            headers=auth_headers
+        )
+        
+        assert reversed_range.status_code == 400
+        assert too_long.status_code == 400
+    
+    def test_rebuild_matches_triggers(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test that the backfill reproduces the trigger-maintained rollup."""
+        now = datetime.utcnow()
+        for i in range(6):
+            client.post("/tasks", json={
+                "title": f"Task {i}",
+                "status": "done" if i % 2 else "todo",
+                "due_date": (now + timedelta(days=i - 3)).isoformat()
+            }, headers=auth_headers)
+        
+        def snapshot():
+            return db.execute(
+                select(TaskDailyRollup).where(
+                    or_(*(column != 0 for column in (
+                        TaskDailyRollup.created_count,
+                        TaskDailyRollup.completed_count,
+                        TaskDailyRollup.due_count,
+                        TaskDailyRollup.resolved_count,
+                    )))
+                ).order_by(TaskDailyRollup.day)
+            ).scalars().all()
+        
+        def as_tuples(rows):
+            return [
+                (r.day, r.created_count, r.completed_count, r.due_count, r.resolved_count)
+                for r in rows
+            ]
+        
+        maintained = as_tuples(snapshot())
+        db.execute(delete(TaskDailyRollup))
+        db.commit()
+        
+        TaskRollupService(db).rebuild(test_user.id)
+        db.expire_all()
+        
+        assert as_tuples(snapshot()) == maintained
 
+
+class TestTaskCompletion:
+    """Tests for completed_at, the status event log and duration percentiles."""
+    
+    def test_completed_at_follows_status(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that completed_at is stamped, kept while done and cleared on reopen."""
+        url = f"/tasks/{test_task.id}"
+        assert client.get(url, headers=auth_headers).json()["completed_at"] is None
+        
+        done = client.put(url, json={"status": "done"}, headers=auth_headers).json()
+        assert done["completed_at"] is not None
+        
+        renamed = client.put(url, json={"title": "Renamed"}, headers=auth_headers).json()
+        assert renamed["completed_at"] == done["completed_at"]
+        
+        client.patch(
+            "/tasks/bulk",
+            json={"items": [{"id": test_task.id, "status": "done"}]},
+            headers=auth_headers
+        )
+        assert client.get(url, headers=auth_headers).json()["completed_at"] == done["completed_at"]
+        
+        client.patch(
+            "/tasks/bulk",
+            json={"items": [{"id": test_task.id, "status": "todo"}]},
+            headers=auth_headers
+        )
+        assert client.get(url, headers=auth_headers).json()["completed_at"] is None
+        
+        created = client.post(
+            "/tasks", json={"title": "Done", "status": "done"}, headers=auth_headers
+        ).json()
+        assert created["completed_at"] is not None
+    
+    def test_status_events_recorded(
+        self, client: TestClient, auth_headers: dict, db: Session
+    ):
+        """Test that creation and every status change append an event."""
+        task = client.post("/tasks", json={"title": "Tracked"}, headers=auth_headers).json()
+        url = f"/tasks/{task['id']}"
+        client.put(url, json={"status": "in_progress"}, headers=auth_headers)
+        client.put(url, json={"title": "No status change"}, headers=auth_headers)
+        client.patch(
+            "/tasks/bulk",
+            json={"items": [{"id": task["id"], "status": "done"}]},
+            headers=auth_headers
+        )
+        
+        events = db.execute(
+            select(TaskStatusEvent.from_status, TaskStatusEvent.to_status)
+            .where(TaskStatusEvent.task_id == task["id"])
+            .order_by(TaskStatusEvent.id)
+        ).all()
+        
+        assert events == [
+            (None, TaskStatus.TODO),
+            (TaskStatus.TODO, TaskStatus.IN_PROGRESS),
+            (TaskStatus.IN_PROGRESS, TaskStatus.DONE),
+        ]
+    
+    def test_lead_and_cycle_time_percentiles(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test percentiles over completed tasks, skipping never-started ones for cycle time."""
+        now = datetime.utcnow()
+        for hours in (1, 2, 3, 4):
+            task = Task(
+                title=f"{hours}h",
+                owner_id=test_user.id,
+                created_at=now - timedelta(hours=10)
+            )
+            db.add(task)
+            db.flush()
+            # The status event takes its time from updated_at
+            task.status = TaskStatus.IN_PROGRESS
+            task.updated_at = now - timedelta(hours=hours)
+            db.flush()
+            db.execute(
+                update(Task).where(Task.id == task.id).values(
+                    status=TaskStatus.DONE, completed_at=now, updated_at=now
+                )
+            )
+        db.add(Task(
+            title="Skipped start",
+            owner_id=test_user.id,
+            status=TaskStatus.DONE,
+            created_at=now - timedelta(hours=10)
+        ))
+        db.add(Task(title="Open", owner_id=test_user.id))
+        db.commit()
+        
+        lead = client.get("/analytics/lead-time", headers=auth_headers).json()
+        cycle = client.get("/analytics/cycle-time?days=30", headers=auth_headers).json()
+        
+        assert lead["metric"] == "lead_time"
+        assert lead["count"] == 5
+        assert lead["p50"] == pytest.approx(10 * 3600, abs=5)
+        assert cycle["days"] == 30
+        assert cycle["count"] == 4
+        assert cycle["p50"] == pytest.approx(2.5 * 3600, abs=5)
+        assert cycle["p90"] == pytest.approx(3.7 * 3600, abs=5)
+    
+    def test_percentiles_empty(self, client: TestClient, auth_headers: dict):
+        """Test that no completed tasks yields a zero count and no percentiles."""
+        response = client.get("/analytics/cycle-time", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.json()["count"] == 0
+        assert response.json()["p99"] is None
@@ -0,0 +1,132 @@
+"""Tests for serving the API through the async engine (DATABASE_ASYNC)."""
+
+import asyncio
+import pytest
+from typing import Generator
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.api.deps import get_db_runner
+from app.core.database import (
+    AsyncSessionRunner,
+    Base,
+    SessionRunner,
+    create_async_session_factory,
+    get_async_database_url,
+    get_db,
+)
+from app.core.security import create_access_token
+from app.main import app
+from app.models.user import User
+
+
+@pytest.fixture
+def async_app(tmp_path) -> Generator[dict, None, None]:
+    """Point the API at an aiosqlite engine over a fresh database file."""
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    SyncSession = sessionmaker(bind=sync_engine)
+    
+    with SyncSession() as session:
+        user = User(email="async@example.com", hashed_password="x", is_active=True)
+        session.add(user)
+        session.commit()
+        token = create_access_token(subject=user.id)
+    
+    async_engine = create_async_engine(get_async_database_url(url), poolclass=NullPool)
+    async_session_factory = create_async_session_factory(async_engine)
+    
+    async def override_get_db_runner():
+        async with async_session_factory() as session:
+            yield AsyncSessionRunner(session)
+    
+    def override_get_db():
+        with SyncSession() as session:
+            yield session
+    
+    app.dependency_overrides[get_db_runner] = override_get_db_runner
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as client:
+        yield {
+            "client": client,
+            "headers": {"Authorization": f"Bearer {token}"},
+            "engine": async_engine,
+        }
+    app.dependency_overrides.clear()
+    sync_engine.dispose()
+
+
+def test_async_database_url():
+    """Test that sync URLs map onto the async drivers."""
+    assert get_async_database_url(
+        "postgresql://taskflow:secret@db:5432/taskflow"
+    ) == "postgresql+asyncpg://taskflow:secret@db:5432/taskflow"
+    assert get_async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+
+
+def test_session_runner_requires_run():
+    """Test that a runner without run() fails when created, not on first use."""
+    class Incomplete(SessionRunner):
+        pass
+    
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_task_crud_on_async_engine(async_app: dict):
+    """Test the task endpoints end to end through the async session."""
+    client, headers = async_app["client"], async_app["headers"]
+    
+    created = client.post("/tasks", json={"title": "Async task"}, headers=headers)
+    assert created.status_code == 201
+    task_id = created.json()["id"]
+    
+    updated = client.put(f"/tasks/{task_id}", json={"status": "done"}, headers=headers)
+    assert updated.status_code == 200
+    assert updated.json()["status"] == "done"
+    
+    listing = client.get("/tasks?search=Async", headers=headers).json()
+    assert listing["total"] == 1
+    assert listing["items"][0]["title"] == "Async task"
+    
+    bulk = client.post(
+        "/tasks/bulk", json={"items": [{"title": "One"}, {"title": ""}]}, headers=headers
+    ).json()
+    assert bulk["succeeded"] == 1
+    assert bulk["failed"] == 1
+    
+    summary = client.get("/analytics/summary", headers=headers).json()
+    assert summary["total_tasks"] == 2
+    assert summary["completed_tasks"] == 1
+    
+    assert client.delete(f"/tasks/{task_id}", headers=headers).status_code == 204
+    assert client.get(f"/tasks/{task_id}", headers=headers).status_code == 404
+
+
+def test_queries_run_on_event_loop(async_app: dict):
+    """Test that no request holds a worker thread while it queries."""
+    client, headers = async_app["client"], async_app["headers"]
+    on_event_loop = []
+    
+    def before_cursor_execute(*args):
+        try:
+            asyncio.get_running_loop()
+            on_event_loop.append(True)
+        except RuntimeError:
+            on_event_loop.append(False)
+    
+    sync_engine = async_app["engine"].sync_engine
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        client.post("/tasks", json={"title": "Task"}, headers=headers)
+        client.get("/tasks", headers=headers)
+        client.get("/analytics/summary", headers=headers)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
+    
+    assert on_event_loop
+    assert all(on_event_loop)
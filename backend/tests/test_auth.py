@@ -1,10 +1,38 @@
 """Tests for authentication endpoints."""
 
+import asyncio
+import threading
+import time
+from datetime import timedelta
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
+from app.core.cache import MemoryBackend, ResultCache, caches, invalidate_user
+from app.core.config import settings
+from app.core.events import (
+    TOKEN_REVOCATIONS_CHANNEL,
+    USER_CHANGES_CHANNEL,
+    PostgresNotifyRelay,
+)
+from app.core.exceptions import ServiceUnavailableException
+from app.core.security import (
+    PasswordHasher,
+    VerifiedTokenCache,
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    pwd_context,
+    revoke_token,
+    token_cache,
+)
+from app.db.ddl import user_notify_ddl
+from app.models.task import Task
 from app.models.user import User
+from app.services import user_service
+from app.services.user_service import Principal, principal_cache
 
 
 class TestRegister:
@@ -146,3 +174,279 @@ class TestRefreshToken:
         
         assert response.status_code == 401
 
+
+class TestPrincipalCache:
+    """Tests for the cached principal behind get_current_principal."""
+    
+    @pytest.fixture
+    def user_queries(self, db: Session):
+        """Collect the statements that read the users table."""
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if "FROM users" in statement:
+                statements.append(statement)
+        
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        yield statements
+        event.remove(engine, "before_cursor_execute", record)
+    
+    def test_repeated_requests_skip_users_query(
+        self, client: TestClient, auth_headers: dict, test_task: Task, user_queries: list
+    ):
+        """Test that only the first request of a user looks them up."""
+        for _ in range(3):
+            response = client.get(f"/tasks/{test_task.id}", headers=auth_headers)
+            assert response.status_code == 200
+        
+        assert len(user_queries) == 1
+    
+    def test_task_writes_keep_principal(
+        self, client: TestClient, auth_headers: dict, user_queries: list
+    ):
+        """Test that task writes, which only bump task versions, keep the entry."""
+        client.post("/tasks", json={"title": "One"}, headers=auth_headers)
+        client.post("/tasks", json={"title": "Two"}, headers=auth_headers)
+        
+        assert len(user_queries) == 1
+    
+    def test_deactivation_invalidates(
+        self, client: TestClient, auth_headers: dict, test_task: Task,
+        db: Session, test_user: User
+    ):
+        """Test that a deactivated user is rejected on their next request."""
+        url = f"/tasks/{test_task.id}"
+        assert client.get(url, headers=auth_headers).status_code == 200
+        
+        test_user.is_active = False
+        db.commit()
+        
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Inactive user"
+    
+    def test_invalidation_during_load_not_cached(
+        self, db: Session, test_user: User, user_queries: list
+    ):
+        """Test that a principal read before a concurrent change isn't cached."""
+        def change_committed(conn, cursor, statement, parameters, context, executemany):
+            # Another transaction deactivates the user just after this read
+            invalidate_user(test_user.id, scope="user")
+        
+        engine = db.get_bind()
+        event.listen(engine, "after_cursor_execute", change_committed)
+        try:
+            principal = user_service.UserService(db).load_principal(test_user.id)
+        finally:
+            event.remove(engine, "after_cursor_execute", change_committed)
+        
+        assert principal.id == test_user.id
+        assert principal_cache.get(test_user.id, "", 0) is None
+        user_service.UserService(db).load_principal(test_user.id)
+        assert principal_cache.get(test_user.id, "", 0) is not None
+    
+    def test_relay_notification_invalidates(
+        self, client: TestClient, auth_headers: dict, test_task: Task, test_user: User
+    ):
+        """Test that a change notified by another worker drops the entry."""
+        client.get(f"/tasks/{test_task.id}", headers=auth_headers)
+        assert principal_cache.get(test_user.id, "", 0) is not None
+        
+        relay = PostgresNotifyRelay("postgresql://localhost/taskflow")
+        relay._on_user_notify(None, 0, USER_CHANGES_CHANNEL, str(test_user.id))
+        
+        assert principal_cache.get(test_user.id, "", 0) is None
+    
+    def test_notify_trigger_covers_principal(self):
+        """Test that the users trigger fires on every cached principal field."""
+        function, trigger = user_notify_ddl("postgresql")
+        
+        assert f"pg_notify('{USER_CHANGES_CHANNEL}'" in function
+        for field in Principal._fields[1:]:
+            assert field in trigger
+        assert "OR DELETE ON users" in trigger
+        assert user_notify_ddl("sqlite") == []
+    
+    def test_rollback_keeps_principal(
+        self, client: TestClient, auth_headers: dict, test_task: Task,
+        db: Session, test_user: User
+    ):
+        """Test that a rolled back change does not drop the entry."""
+        client.get(f"/tasks/{test_task.id}", headers=auth_headers)
+        
+        test_user.full_name = "Renamed"
+        db.flush()
+        db.rollback()
+        
+        assert principal_cache.get(test_user.id, "", 0) is not None
+    
+    def test_shared_backend_only(self):
+        """Test that with maxsize 0 entries and invalidations go through the backend."""
+        backend = MemoryBackend()
+        worker_a = ResultCache("test-principals", 0, backend, scope="user")
+        worker_b = ResultCache("test-principals", 0, backend, scope="user")
+        try:
+            worker_a.set(1, "", 0, (1, "a@example.com", None, True), ttl=60)
+            
+            assert worker_b.get(1, "", 0) == (1, "a@example.com", None, True)
+            assert worker_b.stats()["size"] == 0
+            invalidate_user(1)
+            assert worker_b.get(1, "", 0) is not None
+            invalidate_user(1, scope="user")
+            assert worker_b.get(1, "", 0) is None
+        finally:
+            caches.pop("test-principals")
+
+
+class TestTokenCache:
+    """Tests for the verified access token cache."""
+    
+    def test_repeat_presentation_is_cached(self, test_user: User):
+        """Test that a token is verified once and then served from the cache."""
+        token = create_access_token(subject=test_user.id)
+        hits = token_cache.hits
+        
+        first = decode_token(token)
+        second = decode_token(token)
+        
+        assert first == second
+        assert first["sub"] == str(test_user.id)
+        assert token_cache.hits == hits + 1
+        # Callers get their own copy of the claims
+        second["sub"] = "other"
+        assert decode_token(token)["sub"] == str(test_user.id)
+    
+    def test_tampered_and_refresh_tokens(self, test_user: User):
+        """Test that only verified access tokens are cached."""
+        token = create_access_token(subject=test_user.id)
+        decode_token(token)
+        refresh = create_refresh_token(subject=test_user.id)
+        
+        assert decode_token(token[:-2] + "xx") is None
+        assert decode_token(refresh)["type"] == "refresh"
+        assert token_cache.stats()["size"] == 1
+    
+    def test_cache_does_not_extend_expiry(self, test_user: User):
+        """Test that a cached token stops being accepted when it expires."""
+        token = create_access_token(subject=test_user.id, expires_delta=timedelta(seconds=1))
+        assert decode_token(token) is not None
+        
+        time.sleep(2.1)
+        
+        assert decode_token(token) is None
+    
+    def test_revoked_token_rejected(
+        self, client: TestClient, test_user: User, test_task: Task
+    ):
+        """Test that a revoked token is rejected while others keep working."""
+        token = create_access_token(subject=test_user.id)
+        other = create_access_token(subject=test_user.id, expires_delta=timedelta(minutes=5))
+        url = f"/tasks/{test_task.id}"
+        assert client.get(url, headers={"Authorization": f"Bearer {token}"}).status_code == 200
+        
+        revoke_token(token)
+        
+        assert client.get(url, headers={"Authorization": f"Bearer {token}"}).status_code == 401
+        assert client.get(url, headers={"Authorization": f"Bearer {other}"}).status_code == 200
+        assert token_cache.stats()["revoked"] == 1
+    
+    def test_logout_revokes_token(
+        self, client: TestClient, test_user: User, test_task: Task
+    ):
+        """Test that logging out rejects the token while others keep working."""
+        token = create_access_token(subject=test_user.id)
+        other = create_access_token(subject=test_user.id, expires_delta=timedelta(minutes=5))
+        url = f"/tasks/{test_task.id}"
+        headers = {"Authorization": f"Bearer {token}"}
+        assert client.get(url, headers=headers).status_code == 200
+        
+        response = client.post("/auth/logout", headers=headers)
+        
+        assert response.status_code == 204
+        assert client.get(url, headers=headers).status_code == 401
+        assert client.post("/auth/logout", headers=headers).status_code == 401
+        assert client.get(url, headers={"Authorization": f"Bearer {other}"}).status_code == 200
+    
+    def test_relayed_revocation(
+        self, client: TestClient, test_user: User, test_task: Task
+    ):
+        """Test that a revocation notified by another worker rejects the token."""
+        token = create_access_token(subject=test_user.id)
+        headers = {"Authorization": f"Bearer {token}"}
+        url = f"/tasks/{test_task.id}"
+        assert client.get(url, headers=headers).status_code == 200
+        expires_at = decode_token(token)["exp"]
+        
+        relay = PostgresNotifyRelay("postgresql://localhost/taskflow")
+        payload = f"{token_cache.digest(token).hex()}:{float(expires_at)}"
+        relay._on_revocation(None, 0, TOKEN_REVOCATIONS_CHANNEL, payload)
+        
+        assert client.get(url, headers=headers).status_code == 401
+    
+    def test_lru_bound(self):
+        """Test that the least recently used tokens are evicted."""
+        cache = VerifiedTokenCache(2)
+        exp = time.time() + 60
+        for key in (b"a", b"b"):
+            cache.set(key, {"sub": key.decode(), "exp": exp})
+        cache.get(b"a")
+        cache.set(b"c", {"sub": "c", "exp": exp})
+        
+        assert cache.get(b"b") is None
+        assert cache.get(b"a")["sub"] == "a"
+        assert cache.evictions == 1
+
+
+class TestPasswordHashing:
+    """Tests for the bounded password hashing executor."""
+    
+    def test_login_rehashes_outdated_cost(
+        self, client: TestClient, db: Session, test_user: User
+    ):
+        """Test that a hash of another bcrypt cost is replaced on login."""
+        cost = 4 if settings.BCRYPT_ROUNDS != 4 else 5
+        test_user.hashed_password = pwd_context.hash("testpassword123", rounds=cost)
+        db.commit()
+        
+        response = client.post(
+            "/auth/login",
+            json={"email": test_user.email, "password": "testpassword123"}
+        )
+        
+        assert response.status_code == 200
+        db.refresh(test_user)
+        assert test_user.hashed_password.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+        assert pwd_context.verify("testpassword123", test_user.hashed_password)
+    
+    def test_login_sheds_load_when_full(
+        self, client: TestClient, test_user: User, monkeypatch
+    ):
+        """Test that logins get 503 with Retry-After while the hasher is full."""
+        busy = PasswordHasher(workers=1, queue=0)
+        busy._pending = busy.capacity
+        monkeypatch.setattr(user_service, "password_hasher", busy)
+        
+        response = client.post(
+            "/auth/login",
+            json={"email": test_user.email, "password": "testpassword123"}
+        )
+        
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+    
+    def test_queue_limit(self):
+        """Test that calls beyond workers plus queue are rejected until one finishes."""
+        async def scenario():
+            hasher = PasswordHasher(workers=1, queue=1)
+            release = threading.Event()
+            running = [asyncio.ensure_future(hasher.run(release.wait)) for _ in range(2)]
+            await asyncio.sleep(0)
+            
+            with pytest.raises(ServiceUnavailableException):
+                await hasher.run(lambda: None)
+            release.set()
+            await asyncio.gather(*running)
+            return await hasher.run(lambda: "done")
+        
+        assert asyncio.run(scenario()) == "done"
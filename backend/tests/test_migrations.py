@@ -0,0 +1,157 @@
+"""Tests against a schema built by the Alembic migrations."""
+
+from datetime import datetime
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.models.task import Task, TaskDailyRollup, TaskStatus, TaskStatusEvent, UserTaskStats
+from app.models.user import User
+from app.schemas.task import TaskCreate, TaskUpdate
+from app.services.task_service import TaskService
+
+
+def complete_task(session: Session) -> None:
+    """Complete a task and check that completed_at and the derived tables follow."""
+    user = User(email="migrated@example.com", hashed_password="x", is_active=True)
+    session.add(user)
+    session.commit()
+    service = TaskService(session)
+    
+    task = service.create(TaskCreate(title="Ship it"), user.id)
+    assert task.completed_at is None
+    done = service.update(task.id, TaskUpdate(status=TaskStatus.DONE), user.id)
+    
+    assert done.completed_at is not None
+    stored = session.scalars(select(Task.status)).one()
+    assert stored == TaskStatus.DONE
+    stats = session.scalars(
+        select(UserTaskStats).where(UserTaskStats.task_count != 0)
+    ).all()
+    assert [(row.status, row.task_count) for row in stats] == [(TaskStatus.DONE, 1)]
+    rollup = session.scalars(select(TaskDailyRollup)).one()
+    assert (rollup.created_count, rollup.completed_count) == (1, 1)
+    events = session.scalars(
+        select(TaskStatusEvent.to_status).order_by(TaskStatusEvent.id)
+    ).all()
+    assert events == [TaskStatus.TODO, TaskStatus.DONE]
+
+
+class TestMigratedSchema:
+    """The migrated schema must accept what the ORM writes."""
+    
+    def test_complete_task(self, migrated_db: Session):
+        """Test that completing a task stamps completed_at and feeds the derived tables."""
+        complete_task(migrated_db)
+    
+    def test_completed_at_round_trip(self, migrated_db: Session, alembic_config):
+        """Test that 010's downgrade and backfill recognise done tasks."""
+        user = User(email="migrated@example.com", hashed_password="x", is_active=True)
+        migrated_db.add(user)
+        migrated_db.commit()
+        service = TaskService(migrated_db)
+        task = service.create(TaskCreate(title="Ship it"), user.id)
+        service.update(task.id, TaskUpdate(status=TaskStatus.DONE), user.id)
+        migrated_db.close()
+        
+        # Before 010 completions were counted on the updated_at day of done tasks,
+        # both by 010's downgrade and by 009's own backfill
+        for revision in ("009", "008"):
+            command.downgrade(alembic_config, revision)
+            command.upgrade(alembic_config, "009")
+            completed = migrated_db.execute(
+                text("SELECT sum(completed_count) FROM task_daily_rollup")
+            ).scalar()
+            assert completed == 1
+            migrated_db.close()
+        
+        command.upgrade(alembic_config, "head")
+        assert migrated_db.scalars(select(Task.completed_at)).one() is not None
+        rollup = migrated_db.scalars(select(TaskDailyRollup)).one()
+        assert rollup.completed_count == 1
+    
+    def test_done_index_matches_queries(self, alembic_config):
+        """Test that 008's partial index serves queries on the stored status."""
+        command.upgrade(alembic_config, "008")
+        engine = create_engine(settings.DATABASE_URL)
+        query = (
+            select(func.count()).select_from(Task.__table__)
+            .where(
+                Task.owner_id == 1,
+                Task.status == TaskStatus.DONE,
+                Task.updated_at >= datetime(2024, 1, 1),
+            )
+        )
+        statement = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+        with engine.connect() as connection:
+            plan = "\n".join(
+                row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}")
+            )
+        engine.dispose()
+        
+        assert "ix_tasks_owner_id_updated_at_done" in plan
+    
+    def test_triggers_match_create_all(self, db: Session, migrated_db: Session):
+        """Test that migrations and create_all build the same triggers."""
+        def triggers(session: Session) -> dict:
+            rows = session.execute(text(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' OR name = 'tasks_fts'"
+            ))
+            return {name: sql.replace(" IF NOT EXISTS", "") for name, sql in rows}
+        
+        created = triggers(db)
+        assert len(created) == 13
+        assert triggers(migrated_db) == created
+
+
+class TestPostgresMigrations:
+    """The migrations must apply on Postgres too (skipped elsewhere)."""
+    
+    def test_stats_triggers(self, postgres_alembic_config: Config):
+        """Test that 008's statement-level triggers install and count updates."""
+        command.upgrade(postgres_alembic_config, "008")
+        engine = create_engine(settings.DATABASE_URL)
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(
+                    "INSERT INTO users (id, email, hashed_password, is_active, created_at) "
+                    "VALUES (1, 'pg@example.com', 'x', true, now())"
+                ))
+                connection.execute(text(
+                    "INSERT INTO tasks (title, status, priority, created_at, updated_at, owner_id) "
+                    "VALUES ('a', 'TODO', 'MEDIUM', now(), now(), 1), "
+                    "('b', 'TODO', 'MEDIUM', now(), now(), 1)"
+                ))
+                connection.execute(text("UPDATE tasks SET status = 'DONE' WHERE title = 'a'"))
+                # Touches no counted column, so leaves the counts alone
+                connection.execute(text("UPDATE tasks SET description = 'notes'"))
+                counts = connection.execute(text(
+                    "SELECT status::text, task_count FROM user_task_stats "
+                    "WHERE task_count <> 0 ORDER BY 1"
+                )).all()
+        finally:
+            engine.dispose()
+        
+        assert counts == [("DONE", 1), ("TODO", 1)]
+    
+    def test_upgrade_head(self, postgres_alembic_config: Config):
+        """Test that every migration, including 010's rebuilt rollup triggers, applies."""
+        command.upgrade(postgres_alembic_config, "head")
+        # 010 rebuilds 009's rollup triggers; run both again
+        command.downgrade(postgres_alembic_config, "008")
+        command.upgrade(postgres_alembic_config, "head")
+        engine = create_engine(settings.DATABASE_URL)
+        session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        try:
+            complete_task(session)
+            # An edit leaving the rollup's columns alone leaves the rollup alone
+            task = session.scalars(select(Task)).one()
+            TaskService(session).update(task.id, TaskUpdate(description="notes"), task.owner_id)
+            rollup = session.scalars(select(TaskDailyRollup)).one()
+            assert (rollup.created_count, rollup.completed_count) == (1, 1)
+        finally:
+            session.close()
+            engine.dispose()
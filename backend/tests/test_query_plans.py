@@ -0,0 +1,193 @@
+"""EXPLAIN-based checks that the hot task queries are served by indexes."""
+
+import pytest
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.orm import Session
+
+from app.models.task import Task, TaskStatus, TaskPriority
+from app.models.user import User
+from app.services.analytics_service import AnalyticsService
+from app.services.task_service import TaskService
+
+
+def capture_statements(db: Session, func) -> List[Tuple[str, tuple]]:
+    """Run ``func`` and return every SELECT it sent to the database."""
+    statements = []
+    engine = db.get_bind()
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+    
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        func()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def explain(db: Session, statement: str, parameters: tuple) -> str:
+    """Return the query plan of a raw statement as a single string."""
+    connection = db.connection()
+    if connection.dialect.name == "postgresql":
+        rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        return "\n".join(row[0] for row in rows)
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return "\n".join(row[-1] for row in rows)
+
+
+def assert_uses_index(db: Session, plan: str) -> None:
+    """Assert that a plan reads ``tasks`` through a composite index without sorting."""
+    if db.get_bind().dialect.name == "postgresql":
+        assert "Seq Scan on tasks" not in plan, plan
+        return
+    assert "USE TEMP B-TREE" not in plan, plan
+    for line in plan.splitlines():
+        if "tasks" in line:
+            assert line.startswith("SEARCH tasks USING"), plan
+            assert "INDEX ix_tasks_owner_id_" in line, plan
+
+
+def seed(db: Session) -> User:
+    """Seed several users with enough tasks for the planner to prefer indexes."""
+    now = datetime.utcnow()
+    users = [
+        User(email=f"user{i}@example.com", hashed_password="x", is_active=True)
+        for i in range(20)
+    ]
+    db.add_all(users)
+    db.flush()
+    
+    statuses = list(TaskStatus)
+    priorities = list(TaskPriority)
+    rows = []
+    for user in users:
+        for i in range(250):
+            rows.append({
+                "title": f"Task {i}",
+                "description": "Seeded task description",
+                "status": statuses[i % 3],
+                "priority": priorities[i % 3],
+                "due_date": now + timedelta(days=(i % 30) - 15) if i % 2 else None,
+                "created_at": now - timedelta(minutes=i),
+                "updated_at": now - timedelta(minutes=i),
+                "owner_id": user.id,
+            })
+    db.execute(insert(Task), rows)
+    db.commit()
+    db.execute(text("ANALYZE"))
+    return users[0]
+
+
+@pytest.fixture
+def seeded_user(db: Session) -> User:
+    """Seeded tasks on the create_all schema."""
+    return seed(db)
+
+
+class TestQueryPlans:
+    """Hot queries must be answered through the composite task indexes."""
+    
+    @pytest.mark.parametrize("filters", [
+        {},
+        {"status": TaskStatus.TODO},
+        {"priority": TaskPriority.HIGH},
+        {"status": TaskStatus.IN_PROGRESS, "priority": TaskPriority.LOW},
+    ])
+    def test_task_list_queries(self, db: Session, seeded_user: User, filters: dict):
+        """Offset listing (count + page) uses indexes for every filter combination."""
+        service = TaskService(db)
+        statements = capture_statements(
+            db, lambda: service.get_tasks(seeded_user.id, page=3, **filters)
+        )
+        
+        assert statements
+        plans = [explain(db, statement, parameters) for statement, parameters in statements]
+        for plan in plans:
+            assert_uses_index(db, plan)
+    
+    @pytest.mark.parametrize("cursor_mode", [False, True])
+    def test_task_list_single_round_trip(
+        self, db: Session, seeded_user: User, cursor_mode: bool
+    ):
+        """The page and its exact total come back from one statement."""
+        service = TaskService(db)
+        user_id = seeded_user.id
+        cursor = service.get_tasks(user_id).next_cursor if cursor_mode else None
+        result = None
+        
+        def run():
+            nonlocal result
+            result = service.get_tasks(user_id, page=2, cursor=cursor)
+        
+        statements = capture_statements(db, run)
+        
+        assert len(statements) == 1
+        assert result.total == 250
+        assert_uses_index(db, explain(db, *statements[0]))
+    
+    def test_task_list_cursor_query(self, db: Session, seeded_user: User):
+        """Keyset pages seek through the (owner_id, created_at, id) index."""
+        service = TaskService(db)
+        first_page = service.get_tasks(seeded_user.id, page_size=20)
+        statements = capture_statements(
+            db,
+            lambda: service.get_tasks(
+                seeded_user.id, page_size=20, cursor=first_page.next_cursor
+            )
+        )
+        
+        for statement, parameters in statements:
+            plan = explain(db, statement, parameters)
+            assert_uses_index(db, plan)
+        assert "ix_tasks_owner_id_created_at" in explain(db, *statements[-1])
+    
+    def test_analytics_summary_queries(self, db: Session, seeded_user: User):
+        """
+        All analytics counts come from one statement: counters from the
+        user's stats rows, time-dependent counts through partial indexes.
+        """
+        service = AnalyticsService(db)
+        user_id = seeded_user.id
+        statements = capture_statements(db, lambda: service.get_summary(user_id))
+        
+        assert len(statements) == 1
+        plan = explain(db, *statements[0])
+        assert_uses_index(db, plan)
+        assert "ix_tasks_owner_id_due_date_open" in plan
+        assert "ix_tasks_owner_id_completed_at" in plan
+    
+    def test_change_feed_queries(self, db: Session, seeded_user: User):
+        """The change feed seeks through the change_seq indexes."""
+        service = TaskService(db)
+        user_id = seeded_user.id
+        statements = capture_statements(
+            db, lambda: service.get_changes(user_id, limit=50)
+        )
+        
+        plans = [explain(db, statement, parameters) for statement, parameters in statements]
+        assert len(plans) == 2
+        assert "ix_tasks_owner_id_change_seq" in plans[0]
+        assert "ix_task_tombstones_owner_id_change_seq" in plans[1]
+        for plan in plans:
+            assert "USE TEMP B-TREE" not in plan, plan
+
+
+class TestMigratedQueryPlans:
+    """The indexes the migrations create must serve the same queries."""
+    
+    def test_analytics_summary_queries(self, migrated_db: Session):
+        """Open-task counts use the partial index as the migrations define it."""
+        user_id = seed(migrated_db).id
+        statements = capture_statements(
+            migrated_db, lambda: AnalyticsService(migrated_db).get_summary(user_id)
+        )
+        
+        plan = explain(migrated_db, *statements[0])
+        assert_uses_index(migrated_db, plan)
+        assert "ix_tasks_owner_id_due_date_open" in plan
+        assert "ix_tasks_owner_id_completed_at" in plan
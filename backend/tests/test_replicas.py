@@ -0,0 +1,100 @@
+"""Tests for routing reads to read replicas (DATABASE_REPLICA_URLS)."""
+
+import pytest
+from typing import Generator
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base, RoutingSession, get_db, write_clock
+from app.core.security import create_access_token
+from app.main import app
+from app.models.task import Task
+from app.models.user import User
+from app.services.task_service import TaskService
+
+
+@pytest.fixture
+def replicated(tmp_path, monkeypatch: pytest.MonkeyPatch) -> Generator[dict, None, None]:
+    """
+    A primary and a replica database file holding the same user but
+    different tasks, so every response shows where it was read from.
+    """
+    monkeypatch.setattr(write_clock, "_writes", {})
+    engines = {}
+    for name in ("primary", "replica"):
+        engine = create_engine(f"sqlite:///{tmp_path / f'{name}.db'}")
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as session:
+            user = User(email="replica@example.com", hashed_password="x", is_active=True)
+            session.add(user)
+            session.flush()
+            session.add(Task(title=name, owner_id=user.id))
+            session.commit()
+            user_id = user.id
+        engines[name] = engine
+    
+    RoutedSession = sessionmaker(
+        bind=engines["primary"],
+        class_=RoutingSession,
+        info={"replicas": [engines["replica"]]}
+    )
+    
+    def override_get_db():
+        with RoutedSession() as session:
+            yield session
+    
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as client:
+        yield {
+            "client": client,
+            "headers": {"Authorization": f"Bearer {create_access_token(subject=user_id)}"},
+            "session_factory": RoutedSession,
+            "user_id": user_id,
+            **engines,
+        }
+    app.dependency_overrides.clear()
+    for engine in engines.values():
+        engine.dispose()
+
+
+def titles(response) -> list:
+    return sorted(task["title"] for task in response.json()["items"])
+
+
+def test_reads_go_to_replica(replicated: dict):
+    """Test that list, detail and analytics reads are served by the replica."""
+    client, headers = replicated["client"], replicated["headers"]
+    
+    assert titles(client.get("/tasks", headers=headers)) == ["replica"]
+    assert client.get("/tasks/1", headers=headers).json()["title"] == "replica"
+    assert client.get("/analytics/summary", headers=headers).json()["total_tasks"] == 1
+
+
+def test_reads_stick_to_primary_after_write(
+    replicated: dict, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that a user reads their own writes until the sticky window ends."""
+    client, headers = replicated["client"], replicated["headers"]
+    
+    client.post("/tasks", json={"title": "new"}, headers=headers)
+    
+    with Session(replicated["primary"]) as session:
+        assert session.scalar(select(Task.id).where(Task.title == "new")) is not None
+    assert titles(client.get("/tasks", headers=headers)) == ["new", "primary"]
+    
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", 0)
+    assert titles(client.get("/tasks", headers=headers)) == ["replica"]
+
+
+def test_transaction_that_wrote_reads_primary(replicated: dict):
+    """Test that reads after an uncommitted write see that write."""
+    with replicated["session_factory"]() as session:
+        user_id = replicated["user_id"]
+        session.add(Task(title="uncommitted", owner_id=user_id))
+        session.flush()
+        
+        page = TaskService(session).get_tasks(user_id)
+        
+        assert sorted(task.title for task in page.items) == ["primary", "uncommitted"]
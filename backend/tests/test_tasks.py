@@ -1,11 +1,41 @@
 """Tests for task endpoints."""
 
+import csv
+import io
+import json
+
 import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, List
+from fastapi import WebSocketDisconnect, status
 from fastapi.testclient import TestClient
+from sqlalchemy import delete, event, update
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.task import Task, TaskStatus, TaskPriority
 from app.models.user import User
+from app.schemas.task import TaskResponse, TaskUpdate
+from app.services.import_service import _copy_field
+from app.services.search_service import SearchBackend
+from app.services.task_service import TaskService
+from app.services.user_service import UserService
+
+
+@contextmanager
+def capture_statements(db: Session) -> Iterator[List[str]]:
+    """Collect every SQL statement sent to the database inside the block."""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+    
+    event.listen(db.get_bind(), "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", before_cursor_execute)
 
 
 class TestGetTasks:
@@ -75,6 +105,62 @@ class TestGetTasks:
         data = response.json()
         assert len(data["items"]) == 0
     
+    def test_get_tasks_search_ranked_by_relevance(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test that title matches rank above description-only matches."""
+        db.add_all([
+            Task(
+                title="Write notes",
+                description="Prepare the release checklist",
+                owner_id=test_user.id,
+                created_at=datetime(2024, 1, 2)
+            ),
+            Task(
+                title="Release v2.0",
+                description="Ship it",
+                owner_id=test_user.id,
+                created_at=datetime(2024, 1, 1)
+            ),
+            Task(title="Unrelated", owner_id=test_user.id),
+        ])
+        db.commit()
+        
+        response = client.get("/tasks?search=release", headers=auth_headers)
+        
+        assert response.status_code == 200
+        titles = [item["title"] for item in response.json()["items"]]
+        assert titles == ["Release v2.0", "Write notes"]
+    
+    def test_get_tasks_search_substring_and_short_terms(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test substring matches, short-term fallback and index maintenance."""
+        response = client.get("/tasks?search=est Ta", headers=auth_headers)
+        assert len(response.json()["items"]) == 1
+        
+        response = client.get("/tasks?search=Te", headers=auth_headers)
+        assert len(response.json()["items"]) == 1
+        
+        client.put(
+            f"/tasks/{test_task.id}",
+            headers=auth_headers,
+            json={"title": "Renamed", "description": "Nothing here"}
+        )
+        response = client.get("/tasks?search=Test", headers=auth_headers)
+        assert len(response.json()["items"]) == 0
+        
+        response = client.get("/tasks?search=Renamed", headers=auth_headers)
+        assert len(response.json()["items"]) == 1
+    
+    def test_search_backend_requires_apply(self):
+        """Test that a search backend without apply() fails when created."""
+        class RankOnly(SearchBackend):
+            name = "rank-only"
+        
+        with pytest.raises(TypeError):
+            RankOnly()
+    
     def test_get_tasks_pagination(
         self, client: TestClient, auth_headers: dict, db: Session, test_user: User
     ):
@@ -111,6 +197,103 @@ class TestGetTasks:
         
         data = response.json()
         assert len(data["items"]) == 5
+    
+    def test_get_tasks_total_mode_none(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test that total_mode=none reports has_more instead of totals."""
+        for i in range(15):
+            db.add(Task(title=f"Task {i}", owner_id=test_user.id))
+        db.commit()
+        
+        response = client.get(
+            "/tasks?page=1&page_size=10&total_mode=none",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) == 10
+        assert data["total"] is None
+        assert data["total_pages"] is None
+        assert data["has_more"] is True
+        
+        response = client.get(
+            "/tasks?page=2&page_size=10&total_mode=none",
+            headers=auth_headers
+        )
+        data = response.json()
+        assert len(data["items"]) == 5
+        assert data["has_more"] is False
+    
+    def test_get_tasks_total_modes_agree(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test exact and estimated totals, including past the last page."""
+        for i in range(15):
+            db.add(Task(title=f"Task {i}", owner_id=test_user.id))
+        db.commit()
+        
+        for query in (
+            "page=2&page_size=10&total_mode=exact",
+            "page=5&page_size=10&total_mode=exact",
+            "page=1&page_size=10&total_mode=estimated",
+        ):
+            response = client.get(f"/tasks?{query}", headers=auth_headers)
+            data = response.json()
+            assert data["total"] == 15
+            assert data["total_pages"] == 2
+    
+    def test_get_tasks_cursor_pagination(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test walking the task list with keyset cursors."""
+        # Identical timestamps force the id tie-breaker to be used
+        created_at = datetime(2024, 1, 1, 12, 0, 0)
+        for i in range(25):
+            task = Task(
+                title=f"Task {i}",
+                status=TaskStatus.TODO,
+                priority=TaskPriority.MEDIUM,
+                owner_id=test_user.id,
+                created_at=created_at if i < 15 else created_at + timedelta(hours=i)
+            )
+            db.add(task)
+        db.commit()
+        
+        response = client.get("/tasks?page_size=10", headers=auth_headers)
+        data = response.json()
+        seen = [item["id"] for item in data["items"]]
+        assert data["next_cursor"] is not None
+        
+        while data["next_cursor"]:
+            response = client.get(
+                f"/tasks?page_size=10&cursor={data['next_cursor']}",
+                headers=auth_headers
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert data["page"] is None
+            seen.extend(item["id"] for item in data["items"])
+        
+        assert len(seen) == 25
+        assert len(set(seen)) == 25
+        
+        # Cursor pages match the offset pages item for item
+        offset_ids = []
+        for page in (1, 2, 3):
+            response = client.get(
+                f"/tasks?page={page}&page_size=10",
+                headers=auth_headers
+            )
+            offset_ids.extend(item["id"] for item in response.json()["items"])
+        assert offset_ids == seen
+    
+    def test_get_tasks_invalid_cursor(self, client: TestClient, auth_headers: dict):
+        """Test that a malformed cursor is rejected."""
+        response = client.get("/tasks?cursor=not-a-cursor", headers=auth_headers)
+        
+        assert response.status_code == 400
 
 
 class TestCreateTask:
@@ -239,3 +422,1087 @@ class TestDeleteTask:
         
         assert response.status_code == 404
 
+
+class TestBulkTasks:
+    """Tests for the bulk create/update/delete endpoints."""
+    
+    def test_bulk_create(self, client: TestClient, auth_headers: dict):
+        """Test creating many tasks with a partially invalid batch."""
+        items = [{"title": f"Bulk {i}", "priority": "high"} for i in range(50)]
+        items.insert(10, {"title": ""})
+        items.insert(20, "not an object")
+        
+        response = client.post("/tasks/bulk", headers=auth_headers, json={"items": items})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["succeeded"] == 50
+        assert data["failed"] == 2
+        assert [r["index"] for r in data["results"]] == list(range(52))
+        assert data["results"][10]["status_code"] == 422
+        assert "title" in data["results"][10]["error"]
+        assert data["results"][20]["status_code"] == 422
+        assert data["results"][0]["task"]["title"] == "Bulk 0"
+        assert data["results"][51]["task"]["title"] == "Bulk 49"
+        
+        response = client.get("/tasks?priority=high", headers=auth_headers)
+        assert response.json()["total"] == 50
+    
+    def test_bulk_create_too_many_items(self, client: TestClient, auth_headers: dict):
+        """Test that batches above the configured limit are rejected."""
+        from app.core.config import settings
+        
+        items = [{"title": "x"}] * (settings.TASK_BULK_MAX_ITEMS + 1)
+        response = client.post("/tasks/bulk", headers=auth_headers, json={"items": items})
+        
+        assert response.status_code == 422
+    
+    def test_bulk_update(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        test_task: Task,
+        other_task: Task
+    ):
+        """Test updating many tasks with per-item outcomes."""
+        created = client.post(
+            "/tasks/bulk",
+            headers=auth_headers,
+            json={"items": [{"title": "A"}, {"title": "B"}]}
+        ).json()["results"]
+        first_id, second_id = created[0]["id"], created[1]["id"]
+        
+        response = client.patch(
+            "/tasks/bulk",
+            headers=auth_headers,
+            json={"items": [
+                {"id": first_id, "status": "done"},
+                {"id": second_id, "status": "in_progress", "title": "B2"},
+                {"id": test_task.id, "status": "done"},
+                {"id": other_task.id, "title": "Hijacked"},
+                {"id": 99999, "title": "Missing"},
+                {"id": first_id, "title": "Again"},
+                {"id": second_id - 1000, "priority": "urgent"},
+                {"title": "No id"},
+            ]}
+        )
+        
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["status_code"] for r in results] == [200, 200, 200, 403, 404, 422, 422, 422]
+        assert results[0]["task"]["status"] == "done"
+        assert results[0]["task"]["title"] == "A"
+        assert results[1]["task"]["title"] == "B2"
+        assert results[2]["task"]["description"] == test_task.description
+        
+        response = client.get(f"/tasks/{other_task.id}", headers=auth_headers)
+        assert response.status_code == 403
+    
+    def test_bulk_update_rejects_nulls(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that nulls for required fields fail per item, not the batch."""
+        response = client.patch(
+            "/tasks/bulk",
+            headers=auth_headers,
+            json={"items": [
+                {"id": test_task.id, "title": None},
+                {"id": test_task.id + 1000, "status": None},
+                {"id": test_task.id + 2000, "priority": None},
+                {"id": test_task.id, "description": None, "due_date": None},
+            ]}
+        )
+        
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["status_code"] for r in results] == [422, 422, 422, 200]
+        assert "title" in results[0]["error"]
+        assert results[3]["task"]["title"] == test_task.title
+    
+    def test_bulk_update_task_deleted_meanwhile(
+        self, client: TestClient, auth_headers: dict, test_task: Task, monkeypatch
+    ):
+        """Test that a task deleted after the ownership check is reported as 404."""
+        created = client.post(
+            "/tasks/bulk", headers=auth_headers, json={"items": [{"title": "Kept"}]}
+        ).json()["results"]
+        bump = UserService.bump_task_version
+        
+        def bump_then_concurrent_delete(self, user_id):
+            self.db.execute(delete(Task).where(Task.id == test_task.id))
+            return bump(self, user_id)
+        
+        monkeypatch.setattr(UserService, "bump_task_version", bump_then_concurrent_delete)
+        response = client.patch(
+            "/tasks/bulk",
+            headers=auth_headers,
+            json={"items": [
+                {"id": test_task.id, "title": "Gone"},
+                {"id": created[0]["id"], "title": "Renamed"},
+            ]}
+        )
+        
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["status_code"] for r in results] == [404, 200]
+        assert results[0]["id"] == test_task.id
+        assert response.json()["failed"] == 1
+    
+    def test_bulk_delete(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        test_task: Task,
+        other_task: Task
+    ):
+        """Test deleting many tasks with per-item outcomes."""
+        response = client.request(
+            "DELETE",
+            "/tasks/bulk",
+            headers=auth_headers,
+            json={"ids": [test_task.id, other_task.id, 99999, test_task.id]}
+        )
+        
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["status_code"] for r in results] == [204, 403, 404, 422]
+        
+        response = client.get("/tasks", headers=auth_headers)
+        assert response.json()["total"] == 0
+
+
+class TestExportTasks:
+    """Tests for the streaming export endpoint."""
+    
+    @pytest.fixture
+    def many_tasks(self, db: Session, test_user: User) -> None:
+        """Create enough tasks to span several streamed batches."""
+        for i in range(1200):
+            db.add(Task(
+                title=f"Task {i}",
+                description=f"Line one\nline, two {i}",
+                status=TaskStatus.DONE if i % 4 == 0 else TaskStatus.TODO,
+                owner_id=test_user.id
+            ))
+        db.commit()
+    
+    def test_export_ndjson(
+        self, client: TestClient, auth_headers: dict, many_tasks: None
+    ):
+        """Test streaming all tasks as NDJSON."""
+        response = client.get("/tasks/export?format=ndjson", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 1200
+        assert len({line["id"] for line in lines}) == 1200
+        assert set(lines[0]) == {
+            "id", "title", "description", "status", "priority",
+            "due_date", "created_at", "updated_at", "owner_id"
+        }
+    
+    def test_export_csv_with_filters(
+        self, client: TestClient, auth_headers: dict, many_tasks: None
+    ):
+        """Test streaming filtered tasks as CSV."""
+        response = client.get(
+            "/tasks/export?format=csv&status=done",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 300
+        assert {row["status"] for row in rows} == {"done"}
+        assert rows[0]["description"].startswith("Line one\nline, two")
+    
+    def test_export_only_own_tasks(
+        self, client: TestClient, auth_headers: dict, db: Session, test_task: Task
+    ):
+        """Test that the export never includes other users' tasks."""
+        title = test_task.title
+        other = User(email="other@example.com", hashed_password="x", is_active=True)
+        db.add(other)
+        db.flush()
+        db.add(Task(title="Not yours", owner_id=other.id))
+        db.commit()
+        
+        response = client.get("/tasks/export", headers=auth_headers)
+        
+        lines = response.text.splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["title"] == title
+
+
+class TestImportTasks:
+    """Tests for the streaming import endpoint."""
+    
+    def test_import_ndjson(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test importing NDJSON with invalid lines reported by line number."""
+        lines = [json.dumps({"title": f"Imported {i}", "priority": "high"}) for i in range(5)]
+        lines.insert(2, "{not json")
+        lines.insert(4, json.dumps({"title": "", "status": "done"}))
+        lines.append("")
+        body = "\n".join(lines) + "\n"
+        
+        response = client.post(
+            "/tasks/import?format=ndjson",
+            content=body.encode(),
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["imported"] == 5
+        assert data["failed"] == 2
+        assert [error["line"] for error in data["errors"]] == [3, 5]
+        assert data["errors_truncated"] is False
+        tasks = db.query(Task).filter(Task.owner_id == test_user.id).all()
+        assert len(tasks) == 5
+        assert {task.priority for task in tasks} == {TaskPriority.HIGH}
+    
+    def test_import_csv(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test importing CSV with quoted multi-line fields and empty cells."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["title", "description", "status", "priority", "due_date"])
+        writer.writerow(["First", "Line one\nline, two", "done", "", ""])
+        writer.writerow(["Second", "", "", "low", "2030-01-01T00:00:00"])
+        writer.writerow(["Bad", "", "unknown", "", ""])
+        
+        response = client.post(
+            "/tasks/import?format=csv",
+            content=buffer.getvalue().encode(),
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["imported"] == 2
+        assert data["failed"] == 1
+        assert data["errors"][0]["line"] == 5
+        assert "status" in data["errors"][0]["error"]
+        
+        first = db.query(Task).filter(Task.title == "First").one()
+        assert first.description == "Line one\nline, two"
+        assert first.status == TaskStatus.DONE
+        assert first.priority == TaskPriority.MEDIUM
+        second = db.query(Task).filter(Task.title == "Second").one()
+        assert second.description is None
+        assert second.due_date == datetime(2030, 1, 1)
+        assert first.owner_id == second.owner_id == test_user.id
+    
+    def test_import_in_chunks(
+        self, client: TestClient, auth_headers: dict, monkeypatch
+    ):
+        """Test that large imports are loaded chunk by chunk."""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "TASK_IMPORT_CHUNK_SIZE", 100)
+        body = "".join(json.dumps({"title": f"Task {i}"}) + "\n" for i in range(250))
+        
+        response = client.post("/tasks/import", content=body.encode(), headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.json()["imported"] == 250
+        assert response.json()["chunks"] == 3
+        listing = client.get("/tasks", headers=auth_headers).json()
+        assert listing["total"] == 250
+    
+    def test_import_rejects_non_utf8(self, client: TestClient, auth_headers: dict):
+        """Test that undecodable input is rejected."""
+        response = client.post(
+            "/tasks/import",
+            content='{"title": "café"}\n'.encode("latin-1"),
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 400
+    
+    def test_import_malformed_csv(
+        self, client: TestClient, auth_headers: dict, db: Session
+    ):
+        """Test that CSV syntax errors and NUL bytes are reported per row."""
+        body = (
+            "title,description\n"
+            "First,ok\n"
+            '"Bad"quote,x\n'
+            "Nul,a\x00b\n"
+            "Last,ok\n"
+            '"Unterminated,x\n'
+        )
+        
+        response = client.post(
+            "/tasks/import?format=csv", content=body.encode(), headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["imported"] == 2
+        assert [error["line"] for error in data["errors"]] == [3, 4, 6]
+        assert "NUL" in data["errors"][1]["error"]
+        assert {task.title for task in db.query(Task).all()} == {"First", "Last"}
+    
+    def test_import_non_utf8_after_loaded_chunks(
+        self, client: TestClient, auth_headers: dict, monkeypatch
+    ):
+        """Test that bad encoding late in a file is reported with the rows kept."""
+        monkeypatch.setattr(settings, "TASK_IMPORT_CHUNK_SIZE", 100)
+        body = "".join(json.dumps({"title": f"Task {i}"}) + "\n" for i in range(1000))
+        
+        response = client.post(
+            "/tasks/import",
+            content=body.encode() + '{"title": "café"}\n'.encode("latin-1"),
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["imported"] >= 100
+        assert data["failed"] == 1
+        assert "UTF-8" in data["errors"][0]["error"]
+        listing = client.get("/tasks", headers=auth_headers).json()
+        assert listing["total"] == data["imported"]
+    
+    def test_copy_fields_keep_text_and_null_apart(self):
+        """Test that only NULL is an unquoted empty field in the CSV sent to COPY."""
+        assert _copy_field(None) == ""
+        assert _copy_field("") == '""'
+        assert _copy_field("\\N") == '"\\N"'
+        assert _copy_field('say "hi"') == '"say ""hi"""'
+    
+    def test_import_unauthorized(self, client: TestClient):
+        """Test importing without authentication."""
+        response = client.post("/tasks/import", content=b"")
+        
+        assert response.status_code == 403
+
+
+class TestConditionalGet:
+    """Tests for ETag / If-None-Match support on task reads."""
+    
+    def test_list_not_modified(
+        self, client: TestClient, auth_headers: dict, db: Session, test_task: Task
+    ):
+        """Test that an unchanged task list answers 304 without touching tasks."""
+        first = client.get("/tasks", headers=auth_headers)
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+        
+        with capture_statements(db) as statements:
+            response = client.get(
+                "/tasks", headers={**auth_headers, "If-None-Match": etag}
+            )
+        
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+        assert not any("FROM tasks" in statement for statement in statements)
+    
+    def test_list_etag_changes_on_write(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that any task write invalidates the list ETag."""
+        etag = client.get("/tasks", headers=auth_headers).headers["etag"]
+        
+        client.put(
+            f"/tasks/{test_task.id}", json={"title": "Renamed"}, headers=auth_headers
+        )
+        response = client.get("/tasks", headers={**auth_headers, "If-None-Match": etag})
+        
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["items"][0]["title"] == "Renamed"
+    
+    def test_list_etag_depends_on_query(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that different filters or pages get different ETags."""
+        etag = client.get("/tasks?page=1", headers=auth_headers).headers["etag"]
+        
+        response = client.get(
+            "/tasks?page=1&status=done",
+            headers={**auth_headers, "If-None-Match": etag}
+        )
+        
+        assert response.status_code == 200
+    
+    def test_task_not_modified(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test conditional GET on a single task, including after deletion."""
+        first = client.get(f"/tasks/{test_task.id}", headers=auth_headers)
+        etag = first.headers["etag"]
+        
+        response = client.get(
+            f"/tasks/{test_task.id}",
+            headers={**auth_headers, "If-None-Match": f'"other", {etag}'}
+        )
+        assert response.status_code == 304
+        
+        client.delete(f"/tasks/{test_task.id}", headers=auth_headers)
+        response = client.get(
+            f"/tasks/{test_task.id}", headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 404
+    
+    def test_etag_is_per_user(
+        self, client: TestClient, auth_headers: dict, db: Session, test_task: Task
+    ):
+        """Test that another user's ETag never matches."""
+        from app.core.security import create_access_token
+        other = User(email="other@example.com", hashed_password="x", is_active=True)
+        db.add(other)
+        db.commit()
+        other_headers = {"Authorization": f"Bearer {create_access_token(subject=other.id)}"}
+        etag = client.get("/tasks", headers=other_headers).headers["etag"]
+        
+        response = client.get("/tasks", headers={**auth_headers, "If-None-Match": etag})
+        
+        assert response.status_code == 200
+        assert response.json()["total"] == 1
+
+
+class TestSparseFieldsets:
+    """Tests for the fields query parameter."""
+    
+    def test_list_fields(
+        self, client: TestClient, auth_headers: dict, db: Session, test_task: Task
+    ):
+        """Test that only the requested columns are selected and returned."""
+        with capture_statements(db) as statements:
+            response = client.get(
+                "/tasks?fields=title,status,priority,due_date", headers=auth_headers
+            )
+        
+        assert response.status_code == 200
+        assert "etag" in response.headers
+        data = response.json()
+        assert data["total"] == 1
+        assert set(data["items"][0]) == {"id", "title", "status", "priority", "due_date"}
+        task_selects = [s for s in statements if "FROM tasks" in s]
+        assert task_selects
+        assert not any("tasks.description" in s for s in task_selects)
+    
+    def test_list_fields_with_cursor(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test that keyset pagination still works with a trimmed selection."""
+        for i in range(3):
+            db.add(Task(title=f"Task {i}", owner_id=test_user.id))
+        db.commit()
+        
+        first = client.get("/tasks?fields=title&page_size=2", headers=auth_headers).json()
+        second = client.get(
+            f"/tasks?fields=title&page_size=2&cursor={first['next_cursor']}",
+            headers=auth_headers
+        ).json()
+        
+        titles = [item["title"] for item in first["items"] + second["items"]]
+        assert sorted(titles) == ["Task 0", "Task 1", "Task 2"]
+    
+    def test_get_task_fields(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test a sparse fieldset on the detail endpoint."""
+        response = client.get(
+            f"/tasks/{test_task.id}?fields=title", headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.json() == {"id": test_task.id, "title": test_task.title}
+    
+    def test_unknown_field(self, client: TestClient, auth_headers: dict):
+        """Test that unknown field names are rejected."""
+        response = client.get("/tasks?fields=title,secret", headers=auth_headers)
+        
+        assert response.status_code == 400
+        assert "secret" in response.json()["detail"]
+
+
+class TestWriteStatementCounts:
+    """Single-task writes need at most two statements besides authentication."""
+    
+    @staticmethod
+    def task_statements(statements: List[str]) -> List[str]:
+        """Drop the current-user lookup done by the auth dependency."""
+        return [
+            statement for statement in statements
+            if not (statement.lstrip().startswith("SELECT") and "FROM users" in statement)
+        ]
+    
+    def test_create(self, client: TestClient, auth_headers: dict, db: Session):
+        """Test that create is one INSERT ... RETURNING plus the version bump."""
+        with capture_statements(db) as statements:
+            response = client.post("/tasks", json={"title": "New"}, headers=auth_headers)
+        
+        assert response.status_code == 201
+        assert response.json()["title"] == "New"
+        assert len(self.task_statements(statements)) <= 2
+    
+    def test_update(
+        self, client: TestClient, auth_headers: dict, db: Session, test_task: Task
+    ):
+        """Test that update is one UPDATE ... RETURNING plus the version bump."""
+        task_id = test_task.id
+        with capture_statements(db) as statements:
+            response = client.put(
+                f"/tasks/{task_id}", json={"status": "done"}, headers=auth_headers
+            )
+        
+        assert response.status_code == 200
+        assert response.json()["status"] == "done"
+        assert response.json()["title"] == "Test Task"
+        assert len(self.task_statements(statements)) <= 2
+    
+    def test_delete(
+        self, client: TestClient, auth_headers: dict, db: Session, test_task: Task
+    ):
+        """Test that delete is one DELETE ... RETURNING plus the version bump."""
+        task_id = test_task.id
+        with capture_statements(db) as statements:
+            response = client.delete(f"/tasks/{task_id}", headers=auth_headers)
+        
+        assert response.status_code == 204
+        assert len(self.task_statements(statements)) <= 2
+    
+    @pytest.mark.parametrize("method", ["put", "delete"])
+    def test_miss_probes_once(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        other_task: Task,
+        method: str
+    ):
+        """Test that a miss costs one extra probe and keeps 403 / 404."""
+        other_id = other_task.id
+        kwargs = {"json": {"title": "Hijacked"}} if method == "put" else {}
+        
+        with capture_statements(db) as statements:
+            forbidden = getattr(client, method)(
+                f"/tasks/{other_id}", headers=auth_headers, **kwargs
+            )
+        missing = getattr(client, method)("/tasks/99999", headers=auth_headers, **kwargs)
+        
+        assert forbidden.status_code == 403
+        assert missing.status_code == 404
+        assert len(self.task_statements(statements)) <= 2
+
+
+class TestReadStatementCounts:
+    """Revalidating a task reads its version only."""
+    
+    task_statements = staticmethod(TestWriteStatementCounts.task_statements)
+    
+    def test_not_modified_reads_version_only(
+        self, client: TestClient, auth_headers: dict, db: Session, test_task: Task
+    ):
+        """Test that a 304 selects only id, owner_id and version."""
+        url = f"/tasks/{test_task.id}"
+        etag = client.get(url, headers=auth_headers).headers["etag"]
+        
+        with capture_statements(db) as statements:
+            response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        
+        assert response.status_code == 304
+        [statement] = self.task_statements(statements)
+        selected = statement.split("FROM")[0]
+        assert "tasks.version" in selected
+        assert "tasks.title" not in selected and "tasks.description" not in selected
+    
+    def test_changed_task_loaded_after_probe(
+        self, client: TestClient, auth_headers: dict, db: Session, test_task: Task
+    ):
+        """Test that a stale ETag costs the probe plus one full load."""
+        url = f"/tasks/{test_task.id}"
+        
+        with capture_statements(db) as statements:
+            response = client.get(url, headers={**auth_headers, "If-None-Match": '"0"'})
+        
+        assert response.status_code == 200
+        assert response.json()["title"] == "Test Task"
+        assert response.headers["etag"] == '"1"'
+        assert len(self.task_statements(statements)) == 2
+    
+    def test_unconditional_read_is_one_statement(
+        self, client: TestClient, auth_headers: dict, db: Session, test_task: Task
+    ):
+        """Test that a plain GET skips the version probe."""
+        with capture_statements(db) as statements:
+            response = client.get(f"/tasks/{test_task.id}", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert len(self.task_statements(statements)) == 1
+
+
+class TestFastSerialization:
+    """The row-based JSON path must match the TaskResponse schema output."""
+    
+    def test_list_and_detail_match_schema(
+        self, client: TestClient, auth_headers: dict, db: Session, test_user: User
+    ):
+        """Test that encoded rows equal TaskResponse serialization."""
+        task = Task(
+            title="Encoded",
+            description=None,
+            status=TaskStatus.IN_PROGRESS,
+            priority=TaskPriority.HIGH,
+            due_date=datetime(2030, 5, 17, 8, 30, 15, 123456),
+            owner_id=test_user.id
+        )
+        db.add(task)
+        db.commit()
+        expected = TaskResponse.model_validate(task).model_dump(mode="json")
+        
+        listing = client.get("/tasks", headers=auth_headers)
+        detail = client.get(f"/tasks/{task.id}", headers=auth_headers)
+        
+        assert listing.json()["items"] == [expected]
+        assert detail.json() == expected
+        assert detail.headers["content-type"] == "application/json"
+
+
+class TestTaskChanges:
+    """Tests for the incremental change feed."""
+    
+    def test_full_then_incremental_sync(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that only changes after the sync token are returned."""
+        first = client.get("/tasks/changes", headers=auth_headers).json()
+        assert [task["id"] for task in first["changes"]] == [test_task.id]
+        assert first["deleted"] == []
+        assert first["has_more"] is False
+        
+        empty = client.get(
+            f"/tasks/changes?since={first['next_since']}", headers=auth_headers
+        ).json()
+        assert empty["changes"] == []
+        assert empty["next_since"] == first["next_since"]
+        
+        created = client.post("/tasks", json={"title": "New"}, headers=auth_headers).json()
+        client.put(f"/tasks/{test_task.id}", json={"status": "done"}, headers=auth_headers)
+        
+        second = client.get(
+            f"/tasks/changes?since={first['next_since']}", headers=auth_headers
+        ).json()
+        assert [task["id"] for task in second["changes"]] == [created["id"], test_task.id]
+        assert second["changes"][1]["status"] == "done"
+    
+    def test_deletes_are_tombstoned(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that deleted tasks show up in deleted, including bulk deletes."""
+        since = client.get("/tasks/changes", headers=auth_headers).json()["next_since"]
+        ids = [
+            client.post("/tasks", json={"title": f"T{i}"}, headers=auth_headers).json()["id"]
+            for i in range(2)
+        ]
+        
+        client.delete(f"/tasks/{test_task.id}", headers=auth_headers)
+        client.request("DELETE", "/tasks/bulk", json={"ids": ids}, headers=auth_headers)
+        
+        result = client.get(f"/tasks/changes?since={since}", headers=auth_headers).json()
+        assert result["changes"] == []
+        assert sorted(result["deleted"]) == sorted([test_task.id, *ids])
+    
+    def test_paging_splits_bulk_writes(
+        self, client: TestClient, auth_headers: dict
+    ):
+        """Test that a page can end inside a batch sharing one change_seq."""
+        client.post(
+            "/tasks/bulk",
+            json={"items": [{"title": f"Task {i}"} for i in range(5)]},
+            headers=auth_headers
+        )
+        
+        seen = []
+        since = ""
+        while True:
+            page = client.get(
+                f"/tasks/changes?limit=2&since={since}", headers=auth_headers
+            ).json()
+            seen.extend(task["title"] for task in page["changes"])
+            since = page["next_since"]
+            if not page["has_more"]:
+                break
+        
+        assert seen == [f"Task {i}" for i in range(5)]
+    
+    def test_other_users_changes_excluded(
+        self, client: TestClient, auth_headers: dict, other_task: Task
+    ):
+        """Test that the feed is scoped to the current user."""
+        result = client.get("/tasks/changes", headers=auth_headers).json()
+        
+        assert result["changes"] == []
+    
+    def test_invalid_token(self, client: TestClient, auth_headers: dict):
+        """Test that a malformed sync token is rejected."""
+        response = client.get("/tasks/changes?since=garbage", headers=auth_headers)
+        
+        assert response.status_code == 400
+
+
+class TestTaskSync:
+    """Tests for pushing offline edits."""
+    
+    def base_seq(self, client: TestClient, auth_headers: dict, task_id: int) -> int:
+        changes = client.get("/tasks/changes", headers=auth_headers).json()["changes"]
+        return next(task["change_seq"] for task in changes if task["id"] == task_id)
+    
+    def test_push_mixed_batch(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that creates, updates and deletes are applied together."""
+        doomed = client.post("/tasks", json={"title": "Doomed"}, headers=auth_headers).json()
+        task_seq = self.base_seq(client, auth_headers, test_task.id)
+        doomed_seq = self.base_seq(client, auth_headers, doomed["id"])
+        
+        response = client.post(
+            "/tasks/sync",
+            json={"operations": [
+                {"op": "create", "client_id": "c1", "data": {"title": "Offline"}},
+                {
+                    "op": "update",
+                    "id": test_task.id,
+                    "base_seq": task_seq,
+                    "data": {"status": "done"},
+                },
+                {"op": "delete", "id": doomed["id"], "base_seq": doomed_seq},
+            ]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["applied"] == 3
+        assert data["conflicts"] == data["failed"] == 0
+        created, updated, deleted = data["results"]
+        assert created["client_id"] == "c1"
+        assert created["task"]["title"] == "Offline"
+        assert updated["task"]["status"] == "done"
+        assert updated["task"]["title"] == "Test Task"
+        assert updated["task"]["change_seq"] > task_seq
+        assert deleted["status"] == "applied"
+        
+        assert client.get(f"/tasks/{doomed['id']}", headers=auth_headers).status_code == 404
+    
+    def test_reject_conflict_returns_server_state(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that a stale edit is skipped under the reject policy."""
+        stale_seq = self.base_seq(client, auth_headers, test_task.id)
+        client.put(f"/tasks/{test_task.id}", json={"title": "Server"}, headers=auth_headers)
+        
+        data = client.post(
+            "/tasks/sync",
+            json={"operations": [{
+                "op": "update",
+                "id": test_task.id,
+                "base_seq": stale_seq,
+                "data": {"status": "done"},
+            }]},
+            headers=auth_headers
+        ).json()
+        
+        result = data["results"][0]
+        assert data["conflicts"] == 1
+        assert result["status"] == "conflict"
+        assert result["task"]["title"] == "Server"
+        assert result["task"]["status"] == "todo"
+    
+    def test_edits_to_different_fields_merge(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that client and server edits to different fields both apply."""
+        stale_seq = self.base_seq(client, auth_headers, test_task.id)
+        client.put(f"/tasks/{test_task.id}", json={"title": "Server"}, headers=auth_headers)
+        
+        data = client.post(
+            "/tasks/sync",
+            json={"operations": [{
+                "op": "update",
+                "id": test_task.id,
+                "base_seq": stale_seq,
+                "data": {"status": "done", "priority": "high"},
+                "base": {"status": "todo", "priority": "medium"},
+            }]},
+            headers=auth_headers
+        ).json()
+        
+        result = data["results"][0]
+        assert data["applied"] == 1
+        assert result["conflicts"] is None
+        assert result["task"]["title"] == "Server"
+        assert result["task"]["status"] == "done"
+        assert result["task"]["priority"] == "high"
+    
+    @pytest.mark.parametrize("policy", ["reject", "lww"])
+    def test_conflicting_field_keeps_server_value(
+        self, client: TestClient, auth_headers: dict, test_task: Task, policy: str
+    ):
+        """Test that only the field both sides changed is a conflict."""
+        stale_seq = self.base_seq(client, auth_headers, test_task.id)
+        client.put(f"/tasks/{test_task.id}", json={"title": "Server"}, headers=auth_headers)
+        
+        data = client.post(
+            "/tasks/sync",
+            json={"policy": policy, "operations": [{
+                "op": "update",
+                "id": test_task.id,
+                "base_seq": stale_seq,
+                "modified_at": "2000-01-01T00:00:00Z",
+                "data": {"title": "Client", "status": "done"},
+                "base": {"title": "Test Task", "status": "todo"},
+            }]},
+            headers=auth_headers
+        ).json()
+        
+        result = data["results"][0]
+        assert data["conflicts"] == 1
+        assert result["status"] == "conflict"
+        assert result["conflicts"] == {"title": "Server"}
+        assert result["task"]["title"] == "Server"
+        assert result["task"]["status"] == "done"
+    
+    def test_last_writer_wins_merges_fields(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that a later offline edit keeps the server's other fields."""
+        stale_seq = self.base_seq(client, auth_headers, test_task.id)
+        client.put(f"/tasks/{test_task.id}", json={"title": "Server"}, headers=auth_headers)
+        
+        data = client.post(
+            "/tasks/sync",
+            json={"policy": "lww", "operations": [{
+                "op": "update",
+                "id": test_task.id,
+                "base_seq": stale_seq,
+                "data": {"status": "done"},
+            }]},
+            headers=auth_headers
+        ).json()
+        
+        task = data["results"][0]["task"]
+        assert data["applied"] == 1
+        assert task["title"] == "Server"
+        assert task["status"] == "done"
+    
+    def test_last_writer_wins_keeps_newer_server_edit(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that an edit made before the server's last write conflicts."""
+        stale_seq = self.base_seq(client, auth_headers, test_task.id)
+        client.put(f"/tasks/{test_task.id}", json={"title": "Server"}, headers=auth_headers)
+        
+        data = client.post(
+            "/tasks/sync",
+            json={"policy": "lww", "operations": [{
+                "op": "delete",
+                "id": test_task.id,
+                "base_seq": stale_seq,
+                "modified_at": "2000-01-01T00:00:00Z",
+            }]},
+            headers=auth_headers
+        ).json()
+        
+        assert data["results"][0]["status"] == "conflict"
+        assert client.get(f"/tasks/{test_task.id}", headers=auth_headers).status_code == 200
+    
+    def test_invalid_and_foreign_operations(
+        self, client: TestClient, auth_headers: dict, other_task: Task
+    ):
+        """Test that invalid or foreign operations are reported per operation."""
+        data = client.post(
+            "/tasks/sync",
+            json={"operations": [
+                {"op": "create", "data": {"title": ""}},
+                {"op": "update", "id": other_task.id, "base_seq": 0, "data": {}},
+                {"op": "update", "id": 999999, "base_seq": 0, "data": {"title": "X"}},
+                {"op": "delete", "id": 999998, "base_seq": 0},
+                {"op": "rename"},
+            ]},
+            headers=auth_headers
+        ).json()
+        
+        statuses = [result["status"] for result in data["results"]]
+        assert statuses == ["error", "error", "conflict", "applied", "error"]
+        assert data["failed"] == 3
+
+
+class TestTaskStream:
+    """Tests for the real-time task change stream."""
+    
+    def test_burst_is_one_message(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        test_user_token: str,
+        monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test that writes within the coalescing window arrive together."""
+        monkeypatch.setattr(settings, "TASK_STREAM_COALESCE_SECONDS", 0.5)
+        
+        with client.websocket_connect(f"/tasks/stream?token={test_user_token}") as ws:
+            hello = ws.receive_json()
+            assert hello["type"] == "hello"
+            
+            for i in range(3):
+                client.post("/tasks", json={"title": f"T{i}"}, headers=auth_headers)
+            message = ws.receive_json()
+        
+        assert message == {
+            "type": "tasks_changed",
+            "change_seq": hello["change_seq"] + 3,
+            "changes": 3,
+        }
+    
+    def test_other_users_writes_not_pushed(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        test_user_token: str,
+        other_task: Task,
+        db: Session,
+        monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test that a stream only hears about its own user's tasks."""
+        monkeypatch.setattr(settings, "TASK_STREAM_COALESCE_SECONDS", 0)
+        other_id, other_owner_id = other_task.id, other_task.owner_id
+        
+        with client.websocket_connect(f"/tasks/stream?token={test_user_token}") as ws:
+            hello = ws.receive_json()
+            TaskService(db).update(other_id, TaskUpdate(title="Theirs"), other_owner_id)
+            client.post("/tasks", json={"title": "Mine"}, headers=auth_headers)
+            message = ws.receive_json()
+        
+        assert message["change_seq"] == hello["change_seq"] + 1
+        assert message["changes"] == 1
+    
+    def test_invalid_token(self, client: TestClient):
+        """Test that a stream with a bad token is refused."""
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect("/tasks/stream?token=garbage") as ws:
+                ws.receive_json()
+        
+        assert exc_info.value.code == status.WS_1008_POLICY_VIOLATION
+
+
+class TestOptimisticConcurrency:
+    """Tests for task versions and If-Match on PUT and DELETE."""
+    
+    def test_update_with_current_etag(
+        self, client: TestClient, auth_headers: dict, db: Session, test_task: Task
+    ):
+        """Test that a matching If-Match applies in one conditional UPDATE."""
+        task_id = test_task.id
+        etag = client.get(f"/tasks/{task_id}", headers=auth_headers).headers["etag"]
+        assert etag == '"1"'
+        
+        with capture_statements(db) as statements:
+            response = client.put(
+                f"/tasks/{task_id}",
+                json={"title": "Mine"},
+                headers={**auth_headers, "If-Match": etag}
+            )
+        
+        assert response.status_code == 200
+        assert response.json()["version"] == 2
+        assert response.headers["etag"] == '"2"'
+        assert len(TestWriteStatementCounts.task_statements(statements)) <= 2
+    
+    def test_stale_update_is_rejected(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that an edit based on an old version fails with 412."""
+        task_id = test_task.id
+        etag = client.get(f"/tasks/{task_id}", headers=auth_headers).headers["etag"]
+        client.put(f"/tasks/{task_id}", json={"title": "Other tab"}, headers=auth_headers)
+        
+        response = client.put(
+            f"/tasks/{task_id}",
+            json={"title": "Stale"},
+            headers={**auth_headers, "If-Match": etag}
+        )
+        
+        assert response.status_code == 412
+        assert client.get(f"/tasks/{task_id}", headers=auth_headers).json()["title"] == (
+            "Other tab"
+        )
+    
+    def test_delete_if_match(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that DELETE honours If-Match, including sparse fieldset ETags."""
+        task_id = test_task.id
+        etag = client.get(
+            f"/tasks/{task_id}?fields=title", headers=auth_headers
+        ).headers["etag"]
+        
+        stale = client.delete(
+            f"/tasks/{task_id}", headers={**auth_headers, "If-Match": '"7"'}
+        )
+        response = client.delete(
+            f"/tasks/{task_id}", headers={**auth_headers, "If-Match": etag}
+        )
+        
+        assert stale.status_code == 412
+        assert response.status_code == 204
+    
+    @pytest.mark.parametrize("method", ["put", "delete"])
+    def test_edit_racing_the_check_is_412(
+        self, client: TestClient, auth_headers: dict, test_task: Task, monkeypatch,
+        method: str
+    ):
+        """Test that an edit committed after the version check still yields 412."""
+        task_id = test_task.id
+        etag = client.get(f"/tasks/{task_id}", headers=auth_headers).headers["etag"]
+        claim = TaskService._claim_task_change
+        
+        def claim_then_concurrent_edit(self, *args, **kwargs):
+            change_seq = claim(self, *args, **kwargs)
+            self.db.execute(
+                update(Task).where(Task.id == task_id).values(version=Task.version + 1)
+            )
+            return change_seq
+        
+        monkeypatch.setattr(TaskService, "_claim_task_change", claim_then_concurrent_edit)
+        kwargs = {"json": {"title": "Stale"}} if method == "put" else {}
+        response = getattr(client, method)(
+            f"/tasks/{task_id}", headers={**auth_headers, "If-Match": etag}, **kwargs
+        )
+        
+        assert response.status_code == 412
+    
+    def test_weak_etag_never_matches(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that If-Match uses strong comparison."""
+        response = client.put(
+            f"/tasks/{test_task.id}",
+            json={"title": "X"},
+            headers={**auth_headers, "If-Match": 'W/"1"'}
+        )
+        
+        assert response.status_code == 412
+    
+    def test_task_etag_ignores_other_tasks(
+        self, client: TestClient, auth_headers: dict, test_task: Task
+    ):
+        """Test that writing another task leaves this task's ETag valid."""
+        task_id = test_task.id
+        etag = client.get(f"/tasks/{task_id}", headers=auth_headers).headers["etag"]
+        client.post("/tasks", json={"title": "Unrelated"}, headers=auth_headers)
+        
+        response = client.get(
+            f"/tasks/{task_id}", headers={**auth_headers, "If-None-Match": etag}
+        )
+        
+        assert response.status_code == 304
@@ -62,7 +62,7 @@ export function TaskForm({ task, onSuccess, onCancel }: TaskFormProps) {
 
     if (isEditing) {
       updateTask.mutate(
-        { id: task.id, data: payload },
+        { id: task.id, data: payload, version: task.version },
         { onSuccess }
       );
     } else {
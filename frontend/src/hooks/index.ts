@@ -1,4 +1,5 @@
 export { useLogin, useRegister, useLogout } from './useAuth';
 export { useTasks, useTask, useCreateTask, useUpdateTask, useDeleteTask } from './useTasks';
-export { useAnalytics } from './useAnalytics';
+export { useAnalytics, useAnalyticsDurations, useAnalyticsTimeseries } from './useAnalytics';
+export { useTaskStream } from './useTaskStream';
 
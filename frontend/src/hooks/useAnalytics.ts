@@ -1,5 +1,6 @@
-import { useQuery } from '@tanstack/react-query';
+import { useQueries, useQuery } from '@tanstack/react-query';
 import { analyticsService } from '@/services';
+import type { DurationMetric, TimeseriesGranularity, TimeseriesMetric } from '@/types';
 
 export function useAnalytics() {
   return useQuery({
@@ -9,3 +10,29 @@ export function useAnalytics() {
   });
 }
 
+
+/**
+ * Daily or weekly series of several metrics over the last 90 days.
+ * The server returns a point for every bucket, so the series line up.
+ */
+export function useAnalyticsTimeseries(
+  metrics: TimeseriesMetric[],
+  granularity: TimeseriesGranularity
+) {
+  return useQueries({
+    queries: metrics.map((metric) => ({
+      queryKey: ['analytics', 'timeseries', metric, granularity],
+      queryFn: () => analyticsService.getTimeseries(metric, granularity),
+      staleTime: 1000 * 60 * 2, // 2 minutes
+    })),
+  });
+}
+
+/** Lead or cycle time percentiles over the tasks completed in the last 90 days. */
+export function useAnalyticsDurations(metric: DurationMetric) {
+  return useQuery({
+    queryKey: ['analytics', 'durations', metric],
+    queryFn: () => analyticsService.getDurations(metric),
+    staleTime: 1000 * 60 * 2, // 2 minutes
+  });
+}
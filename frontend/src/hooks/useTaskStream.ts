@@ -0,0 +1,47 @@
+import { useEffect } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import { API_URL } from '@/services/api';
+import { useAuthStore } from '@/store/authStore';
+
+const RECONNECT_DELAY_MS = 5000;
+
+/**
+ * Refetch tasks and analytics when the server reports a change,
+ * instead of polling for them.
+ */
+export function useTaskStream() {
+  const queryClient = useQueryClient();
+  const accessToken = useAuthStore((state) => state.accessToken);
+
+  useEffect(() => {
+    if (!accessToken) return;
+
+    let socket: WebSocket | null = null;
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
+    let stopped = false;
+
+    const connect = () => {
+      const url = `${API_URL.replace(/^http/, 'ws')}/tasks/stream?token=${encodeURIComponent(accessToken)}`;
+      socket = new WebSocket(url);
+      socket.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        if (message.type === 'tasks_changed') {
+          queryClient.invalidateQueries({ queryKey: ['tasks'] });
+          queryClient.invalidateQueries({ queryKey: ['analytics'] });
+        }
+      };
+      socket.onclose = () => {
+        if (!stopped) {
+          reconnectTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+        }
+      };
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      clearTimeout(reconnectTimer);
+      socket?.close();
+    };
+  }, [accessToken, queryClient]);
+}
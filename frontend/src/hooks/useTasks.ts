@@ -1,4 +1,5 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { isAxiosError } from 'axios';
 import toast from 'react-hot-toast';
 import { taskService } from '@/services';
 import type { TaskCreate, TaskUpdate, TaskFilters } from '@/types';
@@ -40,14 +41,19 @@ export function useUpdateTask() {
   const queryClient = useQueryClient();
 
   return useMutation({
-    mutationFn: ({ id, data }: { id: number; data: TaskUpdate }) =>
-      taskService.updateTask(id, data),
+    mutationFn: ({ id, data, version }: { id: number; data: TaskUpdate; version?: number }) =>
+      taskService.updateTask(id, data, version),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: [TASKS_KEY] });
       queryClient.invalidateQueries({ queryKey: ['analytics'] });
       toast.success('Task updated successfully');
     },
-    onError: () => {
+    onError: (error) => {
+      if (isAxiosError(error) && error.response?.status === 412) {
+        queryClient.invalidateQueries({ queryKey: [TASKS_KEY] });
+        toast.error('Task was changed elsewhere, please review and retry');
+        return;
+      }
       toast.error('Failed to update task');
     },
   });
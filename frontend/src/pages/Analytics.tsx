@@ -6,8 +6,10 @@ import {
   ListTodo,
   Loader2,
   Target,
+  Timer,
   Zap,
 } from 'lucide-react';
+import { useState } from 'react';
 import {
   PieChart,
   Pie,
@@ -15,13 +17,23 @@ import {
   ResponsiveContainer,
   BarChart,
   Bar,
+  LineChart,
+  Line,
+  Legend,
   XAxis,
   YAxis,
   Tooltip,
 } from 'recharts';
 import { clsx } from 'clsx';
-import { useAnalytics } from '@/hooks';
+import { useAnalytics, useAnalyticsDurations, useAnalyticsTimeseries } from '@/hooks';
 import { LoadingScreen } from '@/components/ui';
+import type { TimeseriesGranularity, TimeseriesMetric } from '@/types';
+
+const TREND_METRICS: { metric: TimeseriesMetric; name: string; color: string }[] = [
+  { metric: 'created', name: 'Created', color: '#3b82f6' },
+  { metric: 'completed', name: 'Completed', color: '#22c55e' },
+  { metric: 'overdue', name: 'Overdue', color: '#ef4444' },
+];
 
 interface StatCardProps {
   title: string;
@@ -64,6 +76,137 @@ function StatCard({ title, value, icon: Icon, color, subtitle }: StatCardProps)
   );
 }
 
+/** Seconds as the largest whole unit that fits, e.g. 3.5h or 2.1d. */
+function formatDuration(seconds: number | null | undefined): string {
+  if (seconds == null) {
+    return '–';
+  }
+  if (seconds < 3600) {
+    return `${Math.round(seconds / 60)}m`;
+  }
+  if (seconds < 86400) {
+    return `${(seconds / 3600).toFixed(1)}h`;
+  }
+  return `${(seconds / 86400).toFixed(1)}d`;
+}
+
+function DurationStats() {
+  const { data: lead } = useAnalyticsDurations('lead_time');
+  const { data: cycle } = useAnalyticsDurations('cycle_time');
+
+  return (
+    <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-4 gap-6 mb-8">
+      <StatCard
+        title="Lead Time (median)"
+        value={formatDuration(lead?.p50)}
+        icon={Timer}
+        color="blue"
+        subtitle={lead ? `${lead.count} tasks, last ${lead.days} days` : undefined}
+      />
+      <StatCard
+        title="Lead Time (p90)"
+        value={formatDuration(lead?.p90)}
+        icon={Timer}
+        color="purple"
+      />
+      <StatCard
+        title="Cycle Time (median)"
+        value={formatDuration(cycle?.p50)}
+        icon={Timer}
+        color="green"
+        subtitle={cycle ? `${cycle.count} started tasks` : undefined}
+      />
+      <StatCard
+        title="Cycle Time (p90)"
+        value={formatDuration(cycle?.p90)}
+        icon={Timer}
+        color="yellow"
+      />
+    </div>
+  );
+}
+
+function TrendChart() {
+  const [granularity, setGranularity] = useState<TimeseriesGranularity>('day');
+  const results = useAnalyticsTimeseries(
+    TREND_METRICS.map(({ metric }) => metric),
+    granularity
+  );
+
+  // Every series has one point per bucket, so they merge by index
+  const series = results.map((result) => result.data?.points ?? []);
+  const trendData = (series[0] ?? []).map((point, index) => ({
+    date: point.date,
+    ...Object.fromEntries(
+      TREND_METRICS.map(({ metric }, i) => [metric, series[i][index]?.value ?? 0])
+    ),
+  }));
+
+  return (
+    <div className="card p-6 mt-6">
+      <div className="flex items-center justify-between mb-6">
+        <h2 className="text-lg font-semibold text-gray-900 dark:text-white">
+          Trends (last 90 days)
+        </h2>
+        <div className="flex gap-2">
+          {(['day', 'week'] as const).map((option) => (
+            <button
+              key={option}
+              onClick={() => setGranularity(option)}
+              className={clsx(
+                'px-3 py-1 rounded-lg text-sm',
+                granularity === option
+                  ? 'bg-primary-600 text-white'
+                  : 'text-gray-600 dark:text-gray-400'
+              )}
+            >
+              {option === 'day' ? 'Daily' : 'Weekly'}
+            </button>
+          ))}
+        </div>
+      </div>
+      <div className="h-72">
+        <ResponsiveContainer width="100%" height="100%">
+          <LineChart data={trendData}>
+            <XAxis
+              dataKey="date"
+              tick={{ fill: '#9ca3af', fontSize: 12 }}
+              axisLine={false}
+              tickLine={false}
+              minTickGap={24}
+            />
+            <YAxis
+              allowDecimals={false}
+              tick={{ fill: '#9ca3af', fontSize: 12 }}
+              axisLine={false}
+              tickLine={false}
+            />
+            <Tooltip
+              contentStyle={{
+                backgroundColor: 'var(--toast-bg)',
+                borderColor: 'transparent',
+                borderRadius: '12px',
+              }}
+            />
+            <Legend />
+            {TREND_METRICS.map(({ metric, name, color }) => (
+              <Line
+                key={metric}
+                type="monotone"
+                dataKey={metric}
+                name={name}
+                stroke={color}
+                strokeWidth={2}
+                dot={false}
+              />
+            ))}
+          </LineChart>
+        </ResponsiveContainer>
+      </div>
+    </div>
+  );
+}
+
 export function AnalyticsPage() {
   const { data, isLoading } = useAnalytics();
 
@@ -157,6 +300,9 @@ export function AnalyticsPage() {
         />
       </div>
 
+      {/* Flow times */}
+      <DurationStats />
+
       {/* Charts */}
       <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
         {/* Status Distribution */}
@@ -253,6 +399,8 @@ export function AnalyticsPage() {
           )}
         </div>
       </div>
+
+      <TrendChart />
     </div>
   );
 }
@@ -2,7 +2,7 @@ import { useState } from 'react';
 import { Plus } from 'lucide-react';
 import { Button, Modal } from '@/components/ui';
 import { TaskFilters, TaskList, TaskForm, Pagination } from '@/components/tasks';
-import { useTasks } from '@/hooks';
+import { useTasks, useTaskStream } from '@/hooks';
 import type { Task, TaskFilters as TaskFiltersType } from '@/types';
 
 export function DashboardPage() {
@@ -11,6 +11,7 @@ export function DashboardPage() {
   const [editingTask, setEditingTask] = useState<Task | undefined>();
 
   const { data, isLoading } = useTasks(filters);
+  useTaskStream();
 
   const handleEdit = (task: Task) => {
     setEditingTask(task);
@@ -66,10 +67,10 @@ export function DashboardPage() {
       />
 
       {/* Pagination */}
-      {data && data.total_pages > 1 && (
+      {data && data.total_pages !== null && data.total_pages > 1 && (
         <div className="mt-8">
           <Pagination
-            currentPage={data.page}
+            currentPage={data.page ?? filters.page ?? 1}
             totalPages={data.total_pages}
             onPageChange={handlePageChange}
           />
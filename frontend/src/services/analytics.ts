@@ -1,11 +1,34 @@
 import api from './api';
-import type { AnalyticsSummary } from '@/types';
+import type {
+  AnalyticsSummary,
+  AnalyticsTimeseries,
+  DurationMetric,
+  DurationPercentiles,
+  TimeseriesGranularity,
+  TimeseriesMetric,
+} from '@/types';
 
 export const analyticsService = {
   async getSummary(): Promise<AnalyticsSummary> {
     const response = await api.get<AnalyticsSummary>('/analytics/summary');
     return response.data;
   },
+
+  async getTimeseries(
+    metric: TimeseriesMetric,
+    granularity: TimeseriesGranularity = 'day'
+  ): Promise<AnalyticsTimeseries> {
+    const response = await api.get<AnalyticsTimeseries>('/analytics/timeseries', {
+      params: { metric, granularity },
+    });
+    return response.data;
+  },
+
+  async getDurations(metric: DurationMetric, days = 90): Promise<DurationPercentiles> {
+    const path = metric === 'lead_time' ? '/analytics/lead-time' : '/analytics/cycle-time';
+    const response = await api.get<DurationPercentiles>(path, { params: { days } });
+    return response.data;
+  },
 };
 
 export default analyticsService;
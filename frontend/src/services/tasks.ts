@@ -1,5 +1,15 @@
 import api from './api';
-import type { Task, TaskCreate, TaskUpdate, TaskFilters, TaskListResponse } from '@/types';
+import type {
+  Task,
+  TaskChangesResponse,
+  TaskCreate,
+  TaskUpdate,
+  TaskFilters,
+  TaskListResponse,
+  SyncPolicy,
+  TaskSyncOperation,
+  TaskSyncResponse,
+} from '@/types';
 
 export const taskService = {
   async getTasks(filters: TaskFilters = {}): Promise<TaskListResponse> {
@@ -10,11 +20,26 @@ export const taskService = {
     if (filters.search) params.append('search', filters.search);
     if (filters.page) params.append('page', filters.page.toString());
     if (filters.page_size) params.append('page_size', filters.page_size.toString());
+    if (filters.cursor) params.append('cursor', filters.cursor);
 
     const response = await api.get<TaskListResponse>('/tasks', { params });
     return response.data;
   },
 
+  async getChanges(since?: string): Promise<TaskChangesResponse> {
+    const params = since ? { since } : {};
+    const response = await api.get<TaskChangesResponse>('/tasks/changes', { params });
+    return response.data;
+  },
+
+  async pushChanges(
+    operations: TaskSyncOperation[],
+    policy: SyncPolicy = 'reject'
+  ): Promise<TaskSyncResponse> {
+    const response = await api.post<TaskSyncResponse>('/tasks/sync', { policy, operations });
+    return response.data;
+  },
+
   async getTask(id: number): Promise<Task> {
     const response = await api.get<Task>(`/tasks/${id}`);
     return response.data;
@@ -25,8 +50,10 @@ export const taskService = {
     return response.data;
   },
 
-  async updateTask(id: number, data: TaskUpdate): Promise<Task> {
-    const response = await api.put<Task>(`/tasks/${id}`, data);
+  async updateTask(id: number, data: TaskUpdate, version?: number): Promise<Task> {
+    // If-Match makes the server reject the update if someone else edited the task
+    const headers = version !== undefined ? { 'If-Match': `"${version}"` } : {};
+    const response = await api.put<Task>(`/tasks/${id}`, data, { headers });
     return response.data;
   },
 
@@ -37,7 +37,9 @@ export interface Task {
   due_date: string | null;
   created_at: string;
   updated_at: string;
+  completed_at: string | null;
   owner_id: number;
+  version: number;
 }
 
 export interface TaskCreate {
@@ -62,14 +64,56 @@ export interface TaskFilters {
   search?: string;
   page?: number;
   page_size?: number;
+  cursor?: string;
 }
 
 export interface TaskListResponse {
   items: Task[];
-  total: number;
-  page: number;
+  total: number | null;
+  page: number | null;
   page_size: number;
-  total_pages: number;
+  total_pages: number | null;
+  has_more: boolean;
+  next_cursor: string | null;
+}
+
+export interface TaskChange extends Task {
+  change_seq: number;
+}
+
+export interface TaskChangesResponse {
+  changes: TaskChange[];
+  deleted: number[];
+  next_since: string;
+  has_more: boolean;
+}
+
+export type SyncPolicy = 'reject' | 'lww';
+
+export interface TaskSyncOperation {
+  op: 'create' | 'update' | 'delete';
+  id?: number;
+  client_id?: string;
+  base_seq?: number;
+  modified_at?: string;
+  data?: TaskCreate | TaskUpdate;
+}
+
+export interface TaskSyncResult {
+  index: number;
+  op: TaskSyncOperation['op'] | null;
+  id: number | null;
+  client_id: string | null;
+  status: 'applied' | 'conflict' | 'error';
+  error: string | null;
+  task: TaskChange | null;
+}
+
+export interface TaskSyncResponse {
+  results: TaskSyncResult[];
+  applied: number;
+  conflicts: number;
+  failed: number;
 }
 
 // Analytics types
@@ -84,6 +128,34 @@ export interface AnalyticsSummary {
   completion_rate: number;
 }
 
+export type TimeseriesMetric = 'created' | 'completed' | 'overdue';
+export type TimeseriesGranularity = 'day' | 'week';
+
+export interface TimeseriesPoint {
+  date: string;
+  value: number;
+}
+
+export interface AnalyticsTimeseries {
+  metric: TimeseriesMetric;
+  granularity: TimeseriesGranularity;
+  start: string;
+  end: string;
+  points: TimeseriesPoint[];
+}
+
+export type DurationMetric = 'lead_time' | 'cycle_time';
+
+// Percentiles in seconds; null when no task was completed in the window
+export interface DurationPercentiles {
+  metric: DurationMetric;
+  days: number;
+  count: number;
+  p50: number | null;
+  p90: number | null;
+  p99: number | null;
+}
+
 // API Error
 export interface ApiError {
   detail: string;